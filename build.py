@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Site Build for Leading Powerful Conversations Website
+
+Runs the build scripts as one pipeline and writes the deployable site to
+dist/:
+1. Source steps, which update site/ itself: CSS validation, image
+   optimization and the sitemap
+2. Staging: a fresh copy of site/ in dist/
+3. Build steps, which transform dist/ in place: CSS bundle, minification,
+   asset fingerprinting, critical CSS and precompression
+
+Each task declares the files it reads. Their content hashes, together with
+the task's command, are recorded in .build-state.json after a successful
+run, and a task only runs again when they change, when one of its
+dependencies ran, or when its outputs are missing. Tasks whose dependencies
+are done run in parallel, each as its own process, with its output printed
+when it finishes. With --profile or --trace, the tasks and the steps inside
+them are timed (see build_profile.py).
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import shutil
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+import build_profile
+from build_profile import span, record, run_profiled
+
+# Configuration
+ROOT_DIR = Path(__file__).resolve().parent
+SITE_DIR = ROOT_DIR / "site"
+DIST_DIR = ROOT_DIR / "dist"
+STATE_PATH = ROOT_DIR / ".build-state.json"
+PROFILE_LOG = ROOT_DIR / ".build-profile.jsonl"
+# Steps listed in the profile summary
+SLOWEST_STEPS = 10
+PYTHON = sys.executable or "python3"
+
+class Task:
+    """A build step: a command (or function) with the files it reads and writes
+
+    inputs and outputs are glob patterns relative to the project directory.
+    An in-place task transforms the output of its dependency, so it can only
+    run again on a fresh copy: when it is stale, its dependencies are rerun
+    too.
+    """
+
+    def __init__(self, name, command, inputs=(), outputs=(), deps=(), env=(), in_place=False, description=''):
+        self.name = name
+        self.command = command
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.env = list(env)
+        self.in_place = in_place
+        self.description = description
+
+    def describe_command(self):
+        if callable(self.command):
+            return f"{self.command.__module__}.{self.command.__name__}"
+        return ' '.join(str(part) for part in self.command)
+
+def stage_site():
+    """Replace dist/ with a fresh copy of site/"""
+    if DIST_DIR.exists():
+        shutil.rmtree(DIST_DIR)
+    shutil.copytree(SITE_DIR, DIST_DIR, ignore=shutil.ignore_patterns("*.gz", "*.br"))
+
+def script(name, *args):
+    return [PYTHON, name, *args]
+
+TASKS = [
+    Task('validate-css', script('validate_css.py'),
+         # images writes site/css/placeholders.css, which is checked here
+         inputs=['site/css/**/*.css', 'validate_css.py', 'css_tools.py'], deps=['images'],
+         description="check the source stylesheets"),
+    Task('images', script('optimize_images.py'),
+         inputs=['site/images/**/*', 'site/**/*.html', 'optimize_images.py', 'html_tools.py'],
+         outputs=['site/css/placeholders.css'],
+         description="optimize images and update <picture> markup in site/"),
+    Task('sitemap', script('generate_sitemap.py'),
+         inputs=['site/**/*.html', 'site/**/*.pdf', 'site/**/*.pptx', 'generate_sitemap.py'],
+         outputs=['site/sitemap.xml', 'site/image-sitemap.xml'], deps=['images'], env=['GITHUB_PAGES_URL'],
+         description="regenerate site/sitemap.xml and site/image-sitemap.xml"),
+    Task('check-links', script('check_links.py'),
+         inputs=['site/**/*.html', 'site/**/*.css', 'site/site.webmanifest', 'site/images/**/*',
+                 'site/resources/**/*', 'site/js/**/*', 'check_links.py', 'css_tools.py', 'html_tools.py'],
+         deps=['images'],
+         description="check that every link and asset reference in site/ resolves"),
+    Task('stage', stage_site,
+         inputs=['site/**/*'], outputs=['dist/index.html'], deps=['validate-css', 'check-links', 'sitemap'],
+         description="copy site/ to dist/"),
+    Task('bundle-css', script('bundle_css.py', '--site-dir', 'dist', '--inline-vars'),
+         # bundle*.css: fingerprinting replaces bundle.css with bundle.<hash>.css
+         inputs=['bundle_css.py', 'css_tools.py', 'html_tools.py'], outputs=['dist/css/bundle*.css'],
+         deps=['stage'], in_place=True,
+         description="bundle the stylesheets in dist/"),
+    Task('minify', script('minify_site.py', '--site-dir', 'dist', '--in-place', '--merge-scripts'),
+         inputs=['minify_site.py', 'js_tools.py', 'css_tools.py', 'html_tools.py'],
+         deps=['bundle-css'], in_place=True,
+         description="minify the HTML and JavaScript in dist/"),
+    Task('fingerprint', script('fingerprint_assets.py', '--site-dir', 'dist'),
+         inputs=['fingerprint_assets.py', 'css_tools.py', 'html_tools.py'], outputs=['dist/asset-manifest.json'],
+         deps=['minify'], in_place=True,
+         description="fingerprint the assets in dist/"),
+    Task('resource-hints', script('resource_hints.py', '--site-dir', 'dist'),
+         inputs=['resource_hints.py', 'critical_css.py', 'html_tools.py'],
+         deps=['fingerprint'], in_place=True,
+         description="preload the LCP images and preconnect to third parties in dist/"),
+    Task('critical-css', script('critical_css.py', '--site-dir', 'dist'),
+         inputs=['critical_css.py', 'css_tools.py', 'html_tools.py'],
+         deps=['resource-hints'], in_place=True,
+         description="inline critical CSS in dist/"),
+    Task('service-worker', script('generate_service_worker.py', '--site-dir', 'dist', '--minify'),
+         inputs=['generate_service_worker.py', 'css_tools.py', 'html_tools.py', 'js_tools.py'],
+         outputs=['dist/sw.js'], deps=['critical-css'], in_place=True,
+         description="generate the service worker for dist/"),
+    Task('compress', script('compress_assets.py', '--site-dir', 'dist'),
+         inputs=['compress_assets.py'], outputs=['dist/index.html.gz'],
+         deps=['service-worker'], in_place=True,
+         description="precompress the text assets in dist/"),
+    Task('budgets', script('check_budgets.py', '--site-dir', 'dist'),
+         inputs=['check_budgets.py', 'responsive_design_tester.py', 'css_tools.py', 'html_tools.py'],
+         deps=['compress'],
+         description="check page weight budgets in dist/"),
+]
+TASKS_BY_NAME = {task.name: task for task in TASKS}
+
+def load_state(path=STATE_PATH):
+    if path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if isinstance(state, dict):
+                return {'files': state.get('files', {}), 'tasks': state.get('tasks', {})}
+        except (OSError, ValueError):
+            pass
+    return {'files': {}, 'tasks': {}}
+
+def save_state(state, path=STATE_PATH):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+class Fingerprinter:
+    """Content hashes of files, reusing the recorded hash while size and mtime are unchanged"""
+
+    def __init__(self, state):
+        self.files = state['files']
+
+    def file_hash(self, path):
+        relative = path.relative_to(ROOT_DIR).as_posix()
+        stat = path.stat()
+        recorded = self.files.get(relative)
+        if recorded and recorded[0] == stat.st_size and recorded[1] == stat.st_mtime_ns:
+            return recorded[2]
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        self.files[relative] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def matched_files(self, patterns):
+        paths = set()
+        for pattern in patterns:
+            for match in glob.glob(str(ROOT_DIR / pattern), recursive=True):
+                path = Path(match)
+                if path.is_file():
+                    paths.add(path)
+        return sorted(paths)
+
+    def task_fingerprint(self, task):
+        digest = hashlib.sha256(task.describe_command().encode('utf-8'))
+        for name in task.env:
+            digest.update(f"\0{name}={os.environ.get(name, '')}".encode('utf-8'))
+        for path in self.matched_files(task.inputs):
+            digest.update(f"\0{path.relative_to(ROOT_DIR).as_posix()}\0{self.file_hash(path)}".encode('utf-8'))
+        return digest.hexdigest()
+
+def outputs_exist(task):
+    return all(glob.glob(str(ROOT_DIR / pattern), recursive=True) for pattern in task.outputs)
+
+def select_tasks(only=None, skip=()):
+    """The tasks to consider, in declaration order; unknown names raise ValueError"""
+    for name in list(only or []) + list(skip):
+        if name not in TASKS_BY_NAME:
+            raise ValueError(f"unknown task '{name}' (tasks: {', '.join(TASKS_BY_NAME)})")
+    return [task for task in TASKS if (not only or task.name in only) and task.name not in skip]
+
+def run_command(task):
+    """Run one task; returns (succeeded, output, seconds)"""
+    start = time.perf_counter()
+    with span(task.name, 'task', cache='miss'):
+        if callable(task.command):
+            # Any error is this task's failure; letting it escape would end the
+            # build without recording the tasks that already finished
+            try:
+                task.command()
+                return True, '', time.perf_counter() - start
+            except Exception as error:
+                return False, f"❌ {type(error).__name__}: {error}\n", time.perf_counter() - start
+        env = dict(os.environ, PYTHONUNBUFFERED='1')
+        # Label the step "python3 script.py" rather than with the interpreter's full path
+        label = ' '.join(Path(part).name for part in task.command[:2])
+        try:
+            result = run_profiled(task.command, name=label, category='process',
+                                  cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+        except OSError as error:
+            return False, f"❌ {error}\n", time.perf_counter() - start
+    return result.returncode == 0, result.stdout + result.stderr, time.perf_counter() - start
+
+def build(only=None, skip=(), force=False, jobs=None, verbose=False):
+    """Run the stale tasks; returns True when every task succeeded"""
+    tasks = select_tasks(only, skip)
+    selected = {task.name for task in tasks}
+    state = load_state()
+    fingerprinter = Fingerprinter(state)
+    jobs = jobs or os.cpu_count() or 1
+
+    # In-place tasks whose own inputs changed need a fresh copy to work on
+    forced = set(selected) if force else set()
+    for task in reversed(tasks):
+        changed = (task.name in forced or not outputs_exist(task)
+                   or state['tasks'].get(task.name) != fingerprinter.task_fingerprint(task))
+        if task.in_place and changed:
+            forced.update(dep for dep in task.deps if dep in selected)
+
+    print(f"🏗️  Building {DIST_DIR.name}/ ({len(tasks)} task(s), up to {jobs} at a time)...")
+    done, ran, failed = set(), set(), set()
+    pending = list(tasks)
+    running = {}
+    build_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while pending or running:
+            # Start every task whose selected dependencies are finished
+            for task in list(pending):
+                deps = [dep for dep in task.deps if dep in selected]
+                if any(dep in failed for dep in deps):
+                    pending.remove(task)
+                    failed.add(task.name)
+                    print(f"  ⏭️  {task.name}: not run, a dependency failed")
+                    continue
+                if not all(dep in done for dep in deps):
+                    continue
+                pending.remove(task)
+                fingerprint = fingerprinter.task_fingerprint(task)
+                stale = (task.name in forced or any(dep in ran for dep in deps) or not outputs_exist(task)
+                         or state['tasks'].get(task.name) != fingerprint)
+                if not stale:
+                    done.add(task.name)
+                    record(task.name, 'task', cache='hit')
+                    print(f"  ✅ {task.name}: up to date")
+                    continue
+                print(f"  ▶️  {task.name}: {task.description}")
+                running[executor.submit(run_command, task)] = task
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                task = running.pop(future)
+                succeeded, output, seconds = future.result()
+                if not succeeded or verbose:
+                    for line in output.rstrip().splitlines():
+                        print(f"     │ {line}")
+                if succeeded:
+                    done.add(task.name)
+                    ran.add(task.name)
+                    # Recorded after the run, since source tasks update their own inputs
+                    state['tasks'][task.name] = fingerprinter.task_fingerprint(task)
+                    print(f"  ✅ {task.name}: done in {seconds:.1f}s")
+                else:
+                    failed.add(task.name)
+                    state['tasks'].pop(task.name, None)
+                    print(f"  ❌ {task.name}: failed after {seconds:.1f}s")
+                save_state(state)
+
+    print(f"\n📊 {len(ran)} task(s) run, {len(done) - len(ran)} up to date, {len(failed)} failed "
+          f"in {time.perf_counter() - build_start:.1f}s")
+    if failed:
+        print("❌ Build failed")
+        return False
+    print(f"✅ Build complete: {DIST_DIR.relative_to(ROOT_DIR)}/")
+    return True
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+def print_profile(events):
+    """Print the slowest steps and the time spent per kind of step"""
+    slowest, categories = build_profile.summarize(events, SLOWEST_STEPS)
+    print(f"\n⏱️  Slowest steps:")
+    for event in slowest:
+        sizes = ''
+        if event.get('bytes_in') or event.get('bytes_out'):
+            sizes = f"  {event.get('bytes_in', 0) / 1024:.1f} KB → {event.get('bytes_out', 0) / 1024:.1f} KB"
+        print(f"  {event['dur'] / 1e6:7.2f}s wall {event.get('cpu', 0) / 1e6:7.2f}s CPU  "
+              f"[{event['cat']}] {event['name'][:70]}{sizes}")
+    print("\n📊 Time per kind of step:")
+    for category, (count, wall, cpu, hits) in sorted(categories.items(), key=lambda item: -item[1][1]):
+        cached = f", {hits} cached" if hits else ''
+        print(f"  {category:<12} {count:>4} step(s){cached:<14} {wall / 1e6:7.2f}s wall {cpu / 1e6:7.2f}s CPU")
+
+def profiled_build(trace_path=None, **options):
+    """Run build() with every step logged; print a summary and optionally write a Chrome trace"""
+    PROFILE_LOG.unlink(missing_ok=True)
+    os.environ[build_profile.TRACE_ENV] = str(PROFILE_LOG)
+    try:
+        with span("build", 'build'):
+            ok = build(**options)
+    finally:
+        del os.environ[build_profile.TRACE_ENV]
+
+    events = build_profile.load_events(PROFILE_LOG) if PROFILE_LOG.exists() else []
+    print_profile(events)
+    print(f"\n📝 Step log: {PROFILE_LOG.relative_to(ROOT_DIR)}")
+    if trace_path:
+        metadata = {'commit': git_commit(), 'options': {key: value for key, value in options.items()
+                                                        if value not in (None, False, [], ())}}
+        with open(trace_path, 'w', encoding='utf-8') as f:
+            json.dump(build_profile.chrome_trace(events, metadata), f)
+        print(f"📝 Chrome trace: {trace_path} (open in ui.perfetto.dev or chrome://tracing)")
+    return ok
+
+def list_tasks():
+    for task in TASKS:
+        deps = f" (after {', '.join(task.deps)})" if task.deps else ''
+        print(f"  {task.name:<14} {task.description}{deps}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the deployable site into dist/, running only stale tasks")
+    parser.add_argument("--only", nargs="+", metavar="TASK",
+                        help="run only these tasks (their dependencies are assumed up to date)")
+    parser.add_argument("--skip", nargs="+", metavar="TASK", default=[],
+                        help="leave these tasks out, e.g. --skip images where the image tools are not installed")
+    parser.add_argument("--force", action="store_true",
+                        help=f"run every selected task, ignoring {STATE_PATH.name}")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="number of tasks to run in parallel (default: CPU count)")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                        help="print the output of every task, not just failed ones")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"time every step, log them to {PROFILE_LOG.name} and print the slowest")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="also write the timings as a Chrome trace / Perfetto JSON file (implies --profile)")
+    parser.add_argument("--list", action="store_true",
+                        help="list the tasks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        list_tasks()
+        sys.exit(0)
+    options = dict(only=args.only, skip=args.skip, force=args.force, jobs=args.jobs, verbose=args.verbose)
+    try:
+        if args.profile or args.trace:
+            ok = profiled_build(args.trace, **options)
+        else:
+            ok = build(**options)
+    except ValueError as error:
+        parser.error(str(error))
+    if not ok:
+        sys.exit(1)
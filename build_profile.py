@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Build Profiling for the Leading Powerful Conversations Website Build Scripts
+
+Records where build time goes. Recording is off unless BUILD_TRACE names a
+JSON Lines log; every process that imports this module then appends one
+event per step to it, so build.py and the scripts it runs share one log.
+- span: time a step (wall and CPU time); the step fills in bytes_in,
+  bytes_out and cache ('hit' or 'miss') on the yielded dict
+- record: log a step that did not run (e.g. a cache hit)
+- run_profiled: subprocess.run that also logs the child's wall and CPU time
+- chrome_trace: turn the log into Chrome trace / Perfetto JSON
+- summarize: the slowest steps and the totals per category
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+TRACE_ENV = "BUILD_TRACE"
+_lock = threading.Lock()
+
+def enabled():
+    return bool(os.environ.get(TRACE_ENV))
+
+def file_bytes(paths):
+    """Total size of the given files that exist"""
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+def _write(event):
+    path = os.environ.get(TRACE_ENV)
+    if not path:
+        return
+    line = (json.dumps(event, separators=(',', ':')) + '\n').encode('utf-8')
+    # One O_APPEND write per event keeps lines from different processes intact
+    with _lock:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+def _event(name, category, start_ns, duration_ns, cpu_ns, fields):
+    event = {
+        'name': name, 'cat': category,
+        'ts': start_ns // 1000, 'dur': duration_ns // 1000, 'cpu': cpu_ns // 1000,
+        'pid': os.getpid(), 'tid': threading.get_native_id(), 'process': Path(sys.argv[0]).name,
+    }
+    event.update({key: value for key, value in fields.items() if value is not None})
+    return event
+
+@contextmanager
+def span(name, category='step', **fields):
+    """Time the enclosed step; extra fields (bytes_in, bytes_out, cache, ...) go into the event"""
+    if not enabled():
+        yield fields
+        return
+    start_ns = time.time_ns()
+    start = time.perf_counter_ns()
+    cpu_start = time.thread_time_ns()
+    try:
+        yield fields
+    finally:
+        # A step that ran a child process reports the child's CPU time instead
+        cpu_ns = fields.pop('cpu_ns', None)
+        if cpu_ns is None:
+            cpu_ns = time.thread_time_ns() - cpu_start
+        _write(_event(name, category, start_ns, time.perf_counter_ns() - start, cpu_ns, fields))
+
+def record(name, category='step', **fields):
+    """Log a step that took no time, such as one satisfied from a cache"""
+    if enabled():
+        _write(_event(name, category, time.time_ns(), 0, 0, fields))
+
+def _children_cpu_ns():
+    """CPU time used so far by this process's reaped children"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return int((usage.ru_utime + usage.ru_stime) * 1e9)
+
+def run_profiled(command, name=None, category='subprocess', **kwargs):
+    """subprocess.run, logging the command's wall time and the CPU time it used
+
+    The CPU time is the growth of RUSAGE_CHILDREN while the command ran, so
+    children reaped by other threads in the meantime are counted as well.
+    """
+    if not enabled():
+        return subprocess.run(command, **kwargs)
+
+    label = name or (command if isinstance(command, str) else ' '.join(str(part) for part in command))
+    with span(label, category) as fields:
+        cpu_before = _children_cpu_ns()
+        try:
+            result = subprocess.run(command, **kwargs)
+        except subprocess.CalledProcessError as error:
+            fields['exit'] = error.returncode
+            raise
+        finally:
+            if cpu_before is not None:
+                fields['cpu_ns'] = _children_cpu_ns() - cpu_before
+        fields['exit'] = result.returncode
+    return result
+
+def load_events(path):
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue
+    return events
+
+def chrome_trace(events, metadata=None):
+    """Chrome trace event format, for chrome://tracing or ui.perfetto.dev"""
+    trace_events = []
+    for pid, process in sorted({(event['pid'], event['process']) for event in events}):
+        trace_events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': process}})
+    for event in sorted(events, key=lambda event: event['ts']):
+        args = {key: value for key, value in event.items()
+                if key not in ('name', 'cat', 'ts', 'dur', 'pid', 'tid', 'process')}
+        args['cpu_ms'] = round(args.pop('cpu', 0) / 1000, 3)
+        trace_events.append({'name': event['name'], 'cat': event['cat'], 'ph': 'X', 'ts': event['ts'],
+                             'dur': event['dur'], 'pid': event['pid'], 'tid': event['tid'], 'args': args})
+    return {'traceEvents': trace_events, 'displayTimeUnit': 'ms', 'otherData': metadata or {}}
+
+def summarize(events, top=10):
+    """(slowest steps, {category: (count, wall µs, cpu µs, cache hits)}) of a log"""
+    slowest = sorted((event for event in events if event['dur']), key=lambda event: event['dur'], reverse=True)
+    categories = {}
+    for event in events:
+        count, wall, cpu, hits = categories.get(event['cat'], (0, 0, 0, 0))
+        categories[event['cat']] = (count + 1, wall + event['dur'], cpu + event.get('cpu', 0),
+                                    hits + (event.get('cache') == 'hit'))
+    return slowest[:top], categories
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+CSS Bundler for Leading Powerful Conversations Website
+
+Every page links css/main.css, which @imports the other modules, so browsers
+only discover the modules after main.css arrives and fetch them in a serial
+waterfall. This script:
+1. Resolves the @import graph below css/main.css in the built dist/ tree
+2. Concatenates the modules in cascade order (imports with a media query are
+   wrapped in a matching @media block)
+3. Minifies the result into css/bundle.css
+4. Optionally inlines var(--...) references to design tokens that never change
+5. Rewrites the page <link> tags to load the bundle instead of main.css
+6. Deletes the stylesheets now inside the bundle that no page links and no
+   other stylesheet imports, so they are not fingerprinted or deployed
+
+It only works on a build directory and refuses the sources in site/, whose
+pages keep linking main.css.
+"""
+
+import os
+import argparse
+from pathlib import Path
+
+from css_tools import (flatten_stylesheet, minify_css, resolve_imports,
+                       constant_custom_properties, inline_custom_properties)
+from html_tools import TagRewriter, build_starttag
+
+# Configuration
+SITE_DIR = Path(__file__).resolve().parent / "site"
+DIST_DIR = Path(__file__).resolve().parent / "dist"
+ENTRY_STYLESHEET = "css/main.css"
+BUNDLE_STYLESHEET = "css/bundle.css"
+
+def build_bundle(site_dir=SITE_DIR, inline_vars=False):
+    """Flatten and minify the stylesheet graph; returns (css, modules, source bytes)"""
+    site_dir = Path(site_dir)
+    entry_path = site_dir / ENTRY_STYLESHEET
+    bundle_dir = (site_dir / BUNDLE_STYLESHEET).parent
+
+    css, files = flatten_stylesheet(entry_path, bundle_dir)
+    css = minify_css(css)
+
+    if inline_vars:
+        css = inline_custom_properties(css, constant_custom_properties(css, page_sources(site_dir)))
+
+    source_bytes = sum(path.stat().st_size for path in files)
+    return css, files, source_bytes
+
+def page_sources(site_dir):
+    """Markup and scripts that could refer to custom properties at runtime"""
+    texts = []
+    for pattern in ("**/*.html", "**/*.js"):
+        for path in Path(site_dir).glob(pattern):
+            texts.append(path.read_text(encoding='utf-8', errors='replace'))
+    return '\n'.join(texts)
+
+class StylesheetLinkRewriter(TagRewriter):
+    """Points <link rel="stylesheet"> tags for one stylesheet at another"""
+
+    def __init__(self, content, page_dir, old_path, new_path):
+        super().__init__(content)
+        self.page_dir = Path(page_dir)
+        self.old_path = Path(old_path).resolve()
+        self.new_href = os.path.relpath(new_path, page_dir).replace(os.sep, '/')
+        self.replaced = 0
+
+    def on_starttag(self, tag, attrs, raw, self_closing):
+        values = dict(attrs)
+        if tag != 'link' or 'stylesheet' not in (values.get('rel') or '').lower().split():
+            return None
+        href = values.get('href') or ''
+        if '://' in href or href.startswith('//'):
+            return None
+        if (self.page_dir / href.split('?')[0]).resolve() != self.old_path:
+            return None
+
+        self.replaced += 1
+        return build_starttag(tag, [(name, self.new_href if name == 'href' else value) for name, value in attrs],
+                              self_closing)
+
+class StylesheetLinkCollector(TagRewriter):
+    """Collects the local stylesheets a page links"""
+
+    def __init__(self, content, page_dir):
+        super().__init__(content)
+        self.page_dir = Path(page_dir)
+        self.linked = set()
+
+    def on_starttag(self, tag, attrs, raw, self_closing):
+        href = dict(attrs).get('href') or ''
+        if tag == 'link' and href.split('?')[0].endswith('.css') and '://' not in href and not href.startswith('//'):
+            self.linked.add((self.page_dir / href.split('?')[0]).resolve())
+        return None
+
+def remove_bundled_sources(site_dir, files):
+    """Delete the bundled stylesheets nothing links or imports any more; returns the removed paths"""
+    site_dir = Path(site_dir)
+    # The entry is not among the files when it holds nothing but @imports
+    bundled = {Path(path).resolve() for path in files} | {(site_dir / ENTRY_STYLESHEET).resolve()}
+    roots = set()
+    for html_file in sorted(site_dir.rglob("*.html")):
+        collector = StylesheetLinkCollector(html_file.read_text(encoding='utf-8'), html_file.parent)
+        collector.rewrite()
+        roots |= collector.linked
+    roots |= {path.resolve() for path in site_dir.rglob("*.css") if path.resolve() not in bundled}
+
+    # Everything a linked or unbundled stylesheet still pulls in
+    used = set()
+    for root in sorted(roots):
+        if root.exists():
+            used.add(root)
+            used |= {module.path for module in resolve_imports(root) if module.path is not None}
+
+    removed = []
+    for path in sorted(bundled - used):
+        if path.exists():
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+def update_page_links(site_dir=SITE_DIR, old_path=None, new_path=None, pages=None):
+    """Make pages load new_path (default: the bundle) instead of old_path (default: main.css)"""
+    site_dir = Path(site_dir)
+    old_path = old_path or site_dir / ENTRY_STYLESHEET
+    new_path = new_path or site_dir / BUNDLE_STYLESHEET
+    updated = 0
+    for html_file in pages or sorted(site_dir.rglob("*.html")):
+        content = html_file.read_text(encoding='utf-8')
+        rewriter = StylesheetLinkRewriter(content, html_file.parent, old_path, new_path)
+        updated_content = rewriter.rewrite()
+        if updated_content != content:
+            html_file.write_text(updated_content, encoding='utf-8')
+            print(f"  ✅ {html_file.relative_to(site_dir)}: now links {rewriter.new_href}")
+            updated += 1
+    return updated
+
+def bundle_css(site_dir=DIST_DIR, inline_vars=False, update_html=True):
+    """Write the bundle and optionally repoint the pages of a built site; returns True on success"""
+    site_dir = Path(site_dir).resolve()
+    if site_dir == SITE_DIR:
+        print(f"❌ Refusing to bundle the sources in {SITE_DIR} - run it on a build directory")
+        return False
+    if not site_dir.is_dir():
+        print(f"❌ {site_dir} does not exist - run build.py first")
+        return False
+    print("🎨 Bundling stylesheets...")
+
+    try:
+        css, files, source_bytes = build_bundle(site_dir, inline_vars)
+    except (OSError, ValueError) as error:
+        print(f"❌ {error}")
+        return False
+
+    bundle_path = site_dir / BUNDLE_STYLESHEET
+    if not bundle_path.exists() or bundle_path.read_text(encoding='utf-8') != css:
+        bundle_path.write_text(css, encoding='utf-8')
+
+    print(f"  📦 {len(files)} stylesheet(s) → {BUNDLE_STYLESHEET}")
+    print(f"  📉 {source_bytes / 1024:.1f} KB → {len(css.encode('utf-8')) / 1024:.1f} KB")
+    print(f"  🚀 {len(files)} request(s) on first load → 1")
+
+    if update_html:
+        print("\n🔄 Updating page links...")
+        if not update_page_links(site_dir):
+            print("  ℹ️  No page links needed updating")
+        try:
+            removed = remove_bundled_sources(site_dir, files)
+        except (OSError, ValueError) as error:
+            print(f"❌ {error}")
+            return False
+        if removed:
+            print(f"  🗑️  Removed {len(removed)} stylesheet(s) now inside the bundle")
+
+    print("\n✅ CSS bundle complete!")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bundle css/main.css and its @imports into one minified stylesheet")
+    parser.add_argument("--site-dir", type=Path, default=DIST_DIR,
+                        help="built site directory to bundle (default: dist/; site/ is refused)")
+    parser.add_argument("--inline-vars", action="store_true",
+                        help="replace var(--...) references to unchanging design tokens with their values")
+    parser.add_argument("--no-html", action="store_true",
+                        help="write the bundle without rewriting the page <link> tags")
+    args = parser.parse_args()
+
+    if not bundle_css(args.site_dir, inline_vars=args.inline_vars, update_html=not args.no_html):
+        exit(1)
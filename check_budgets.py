@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Page Weight Budgets for Leading Powerful Conversations Website
+
+Measures what a visitor actually downloads for each page, and fails when a
+page goes over budget. For every page and every viewport profile this script:
+1. Resolves the resources the page loads: its stylesheets and the full
+   @import tree below them (plus any url() they reference), scripts,
+   favicon, web manifest and the manifest icon
+2. Picks the image a browser with that viewport width, pixel density and
+   format support would download for each <img> and <picture>, using the
+   <source> type and media, srcset and sizes
+3. Totals the bytes, the compressed bytes (the .br or .gz sibling when
+   there is one, otherwise gzip in memory) and the number of requests
+4. Compares them with the budgets below
+
+Images with loading="lazy" are counted: a visitor who scrolls through the
+page downloads them. Requests to other hosts (analytics) are counted as
+requests but their size is unknown. Run it on the built site (dist/) to
+measure what is deployed.
+"""
+
+import re
+import json
+import argparse
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit, unquote
+
+from css_tools import resolve_imports, rewrite_urls
+from html_tools import parse_document, parse_srcset
+from compress_assets import COMPRESSIBLE_SUFFIXES, MIN_SIZE, compress_bytes
+from responsive_design_tester import ResponsiveDesignTester
+
+# Configuration
+SITE_DIR = Path(__file__).resolve().parent / "site"
+# Viewport width in CSS pixels, device pixel ratio and the image types the
+# browser accepts besides JPEG, PNG and GIF
+VIEWPORT_PROFILES = {
+    'mobile': {'width': 390, 'dpr': 3, 'image_types': {'image/avif', 'image/webp', 'image/svg+xml'}},
+    'tablet': {'width': 820, 'dpr': 2, 'image_types': {'image/avif', 'image/webp', 'image/svg+xml'}},
+    'desktop': {'width': 1440, 'dpr': 1, 'image_types': {'image/avif', 'image/webp', 'image/svg+xml'}},
+    # An older browser that gets the JPEG/PNG fallbacks
+    'legacy': {'width': 1280, 'dpr': 1, 'image_types': set()},
+}
+# Per page, for every profile; bytes are KB
+BUDGETS = {
+    'requests': 20,
+    'bytes': 800,
+    'compressed_bytes': 700,
+}
+# Limits that differ for a profile, e.g. {'mobile': {'compressed_bytes': 500}}
+PROFILE_BUDGETS = {}
+# em and rem lengths in media queries and sizes are relative to the default font size
+FONT_SIZE = 16
+# The launcher icon size in density-independent pixels, as in Chrome's manifest icon choice
+MANIFEST_ICON_DP = 48
+
+ALWAYS_SUPPORTED_TYPES = {'image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/x-icon',
+                          'image/vnd.microsoft.icon'}
+MEDIA_FEATURE_RE = re.compile(r'\(\s*(min-width|max-width)\s*:\s*([\d.]+)(px|em|rem)\s*\)', re.I)
+LENGTH_RE = re.compile(r'^([\d.]+)(px|vw|em|rem)$', re.I)
+
+def is_external(url):
+    return url.startswith(('http:', 'https:', '//'))
+
+def length_px(value, unit, viewport):
+    unit = unit.lower()
+    if unit == 'vw':
+        return viewport * value / 100
+    if unit in ('em', 'rem'):
+        return value * FONT_SIZE
+    return value
+
+def media_matches(media, viewport):
+    """Whether a media query list applies on a screen of the given width
+
+    Only width conditions are evaluated; a query with any other feature
+    (orientation, prefers-*, ...) is treated as not matching, and print
+    queries never match.
+    """
+    media = (media or '').strip()
+    if not media:
+        return True
+    for query in media.split(','):
+        query = query.strip().lower()
+        if query.startswith('not ') or query.startswith('print'):
+            continue
+        conditions = re.sub(r'^(only\s+)?(all|screen)\s*(and\s*)?', '', query)
+        features = MEDIA_FEATURE_RE.findall(conditions)
+        if re.sub(r'\band\b', '', MEDIA_FEATURE_RE.sub('', conditions)).strip():
+            continue
+        if all((viewport >= length_px(float(value), unit, viewport)) if name == 'min-width'
+               else (viewport <= length_px(float(value), unit, viewport))
+               for name, value, unit in features):
+            return True
+    return False
+
+def slot_width(sizes, viewport):
+    """The width in CSS pixels a sizes attribute gives an image (100vw without one)"""
+    for entry in (sizes or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        match = re.search(r'\s([\d.]+(?:px|vw|em|rem))$', ' ' + entry, re.I)
+        if not match:
+            # calc() and other lengths are not evaluated; assume the full viewport
+            return viewport
+        condition = entry[:len(entry) - len(match.group(1))].strip()
+        if not condition or media_matches(condition, viewport):
+            length = LENGTH_RE.match(match.group(1))
+            return length_px(float(length.group(1)), length.group(2), viewport)
+    return viewport
+
+def pick_candidate(srcset, src, sizes, profile):
+    """The URL a browser would download from a srcset (or src) for a profile
+
+    The smallest candidate at or above the device pixel ratio wins, or the
+    largest one when none is big enough.
+    """
+    candidates = []
+    for url, descriptor in parse_srcset(srcset or ''):
+        if descriptor.endswith('w'):
+            density = float(descriptor[:-1]) / max(slot_width(sizes, profile['width']), 1)
+        elif descriptor.endswith('x'):
+            density = float(descriptor[:-1])
+        else:
+            density = 1.0
+        candidates.append((density, url))
+    if src and not any(density == 1.0 for density, _ in candidates):
+        candidates.append((1.0, src))
+    if not candidates:
+        return None
+    candidates.sort()
+    return next((url for density, url in candidates if density >= profile['dpr']), candidates[-1][1])
+
+def type_supported(mime, profile):
+    mime = (mime or '').split(';')[0].strip().lower()
+    return not mime or mime in ALWAYS_SUPPORTED_TYPES or mime in profile['image_types']
+
+def picture_image(picture, img, profile):
+    """The URL a <picture> downloads: the first matching <source>, else its <img>"""
+    for source in picture.children:
+        if source.tag != 'source':
+            continue
+        attrs = source.attrs
+        if type_supported(attrs.get('type'), profile) and media_matches(attrs.get('media'), profile['width']):
+            return pick_candidate(attrs.get('srcset'), None, attrs.get('sizes'), profile)
+    return pick_candidate(img.attrs.get('srcset'), img.attrs.get('src'), img.attrs.get('sizes'), profile)
+
+def icon_size(icon):
+    """Largest size in a sizes attribute, or None for 'any' or no sizes"""
+    sizes = [int(size.split('x')[0]) for size in icon.get('sizes', '').lower().split()
+             if re.fullmatch(r'\d+x\d+', size)]
+    return max(sizes) if sizes else None
+
+def pick_icon(icons, ideal, profile):
+    """The icon a browser would fetch from a list of icon attribute dicts
+
+    A scalable SVG icon wins when SVG is supported; otherwise the smallest
+    icon at least the ideal size, the largest one, or one without sizes.
+    """
+    usable = [icon for icon in icons if type_supported(icon.get('type'), profile)]
+    for icon in usable:
+        if icon.get('type', '').lower() == 'image/svg+xml' or icon.get('sizes', '').lower() == 'any':
+            return icon
+    sized = sorted((icon_size(icon), index, icon) for index, icon in enumerate(usable) if icon_size(icon))
+    if sized:
+        return next((icon for size, _, icon in sized if size >= ideal), sized[-1][2])
+    return usable[-1] if usable else None
+
+class PageWeigher:
+    """Resolves the resources a page loads and what they cost"""
+
+    def __init__(self, site_dir):
+        self.site_dir = Path(site_dir).resolve()
+        self.compressed_sizes = {}
+
+    def local_path(self, url):
+        """File under the site for a root-relative URL path, or None"""
+        path = unquote(urlsplit(url).path).lstrip('/')
+        target = (self.site_dir / path).resolve()
+        if path.endswith('/') or target.is_dir():
+            target = target / 'index.html'
+        if self.site_dir not in target.parents or not target.is_file():
+            return None
+        return target
+
+    def compressed_size(self, path):
+        """Bytes on the wire: the smallest precompressed sibling, or gzip of compressible files"""
+        if path not in self.compressed_sizes:
+            size = path.stat().st_size
+            siblings = [path.with_name(path.name + suffix) for suffix in ('.br', '.gz')]
+            existing = [sibling.stat().st_size for sibling in siblings if sibling.exists()]
+            if existing:
+                size = min([size] + existing)
+            elif path.suffix.lower() in COMPRESSIBLE_SUFFIXES and size >= MIN_SIZE:
+                size = min(size, len(compress_bytes(path.read_bytes(), 'gz')))
+            self.compressed_sizes[path] = size
+        return self.compressed_sizes[path]
+
+    def stylesheet_urls(self, url):
+        """The stylesheet and everything it pulls in: @imports and url() references"""
+        path = self.local_path(url)
+        if path is None:
+            return [url]
+        urls = []
+        for module in resolve_imports(path):
+            if module.path is None:
+                # An @import of another host
+                match = re.search(r'''(?:url\(\s*)?["']?([^"')\s]+)''', module.css[len('@import'):])
+                urls.append(match.group(1) if match else module.css)
+                continue
+            module_url = '/' + module.path.relative_to(self.site_dir).as_posix()
+            if module_url not in urls:
+                urls.append(module_url)
+
+            def collect(reference, base=module_url):
+                if not reference.startswith(('data:', '#')) and not reference.lower().endswith('.css'):
+                    urls.append(urljoin(base, reference))
+
+            rewrite_urls(module.css, collect)
+        return urls
+
+    def manifest_urls(self, url, profile):
+        """The web manifest and the icon a browser fetches from it"""
+        path = self.local_path(url)
+        if path is None:
+            return [url]
+        try:
+            manifest = json.loads(path.read_text(encoding='utf-8'))
+        except ValueError:
+            return [url]
+        icon = pick_icon(manifest.get('icons', []), MANIFEST_ICON_DP * profile['dpr'], profile)
+        return [url] + ([urljoin(url, icon['src'])] if icon and icon.get('src') else [])
+
+    def page_urls(self, page, profile):
+        """Every URL the page loads for a profile, in document order, without duplicates"""
+        page_url = '/' + page
+        document = parse_document((self.site_dir / page).read_text(encoding='utf-8'))
+        urls = [page_url]
+        icons = []
+
+        def add(*references):
+            for reference in references:
+                if reference and not reference.startswith(('data:', '#', 'mailto:', 'tel:', 'javascript:')):
+                    urls.append(urljoin(page_url, reference))
+
+        for element in document.iter():
+            if element.inside('noscript') or element.inside('template'):
+                continue
+            attrs = element.attrs
+            if element.tag == 'link':
+                rel = attrs.get('rel', '').lower().split()
+                href = attrs.get('href')
+                if 'stylesheet' in rel or ('preload' in rel and attrs.get('as') == 'style'):
+                    add(*self.stylesheet_urls(urljoin(page_url, href)))
+                elif 'icon' in rel:
+                    icons.append(dict(attrs, href=urljoin(page_url, href)))
+                elif 'manifest' in rel:
+                    add(*self.manifest_urls(urljoin(page_url, href), profile))
+                elif 'preload' in rel or 'modulepreload' in rel:
+                    add(href)
+            elif element.tag == 'script':
+                add(attrs.get('src'))
+            elif element.tag == 'img':
+                picture = element.parent if element.parent.tag == 'picture' else None
+                if picture is not None:
+                    add(picture_image(picture, element, profile))
+                else:
+                    add(pick_candidate(attrs.get('srcset'), attrs.get('src'), attrs.get('sizes'), profile))
+            elif element.tag == 'video':
+                add(attrs.get('poster'))
+            elif element.tag in ('iframe', 'embed'):
+                add(attrs.get('src'))
+
+        icon = pick_icon(icons, 16 * profile['dpr'], profile)
+        # Without a declared icon, browsers still ask for /favicon.ico
+        add(icon['href'] if icon else '/favicon.ico')
+        return list(dict.fromkeys(urls))
+
+    def weigh(self, page, profile):
+        """Report dict for one page and profile"""
+        report = {'requests': 0, 'bytes': 0, 'compressed_bytes': 0, 'external': [], 'missing': [],
+                  'resources': []}
+        for url in self.page_urls(page, profile):
+            report['requests'] += 1
+            if is_external(url):
+                report['external'].append(url)
+                continue
+            path = self.local_path(url)
+            if path is None:
+                report['missing'].append(url)
+                continue
+            size, compressed = path.stat().st_size, self.compressed_size(path)
+            report['bytes'] += size
+            report['compressed_bytes'] += compressed
+            report['resources'].append({'url': url, 'bytes': size, 'compressed_bytes': compressed})
+        return report
+
+def budget_for(profile_name):
+    return dict(BUDGETS, **PROFILE_BUDGETS.get(profile_name, {}))
+
+def over_budget(report, budget):
+    """Messages for each limit a report exceeds"""
+    messages = []
+    for key, limit in budget.items():
+        value = report[key]
+        if key == 'requests':
+            if value > limit:
+                messages.append(f"{value} requests (budget {limit})")
+        elif value > limit * 1024:
+            messages.append(f"{value / 1024:.1f} KB {key.replace('_', ' ')} (budget {limit} KB)")
+    return messages
+
+def check_budgets(site_dir=SITE_DIR, pages=None, profiles=None, verbose=False, report_path=None):
+    """Weigh every page for every profile; returns False if any page is over budget"""
+    site_dir = Path(site_dir)
+    pages = pages or ResponsiveDesignTester(str(site_dir)).pages
+    profiles = profiles or list(VIEWPORT_PROFILES)
+    weigher = PageWeigher(site_dir)
+    results = {}
+    ok = True
+
+    print("⚖️  Checking page weight budgets...")
+    for page in pages:
+        if not (site_dir / page).is_file():
+            print(f"  ❌ {page}: not found")
+            ok = False
+            continue
+        print(f"\n📄 {page}")
+        results[page] = {}
+        for profile_name in profiles:
+            profile = VIEWPORT_PROFILES[profile_name]
+            try:
+                report = weigher.weigh(page, profile)
+            except (OSError, ValueError) as error:
+                print(f"  ❌ {profile_name}: {error}")
+                ok = False
+                continue
+            results[page][profile_name] = report
+
+            problems = over_budget(report, budget_for(profile_name))
+            if report['missing']:
+                problems.append(f"{len(report['missing'])} missing file(s): {', '.join(report['missing'])}")
+            external = f" ({len(report['external'])} to other hosts)" if report['external'] else ''
+            print(f"  {'❌' if problems else '✅'} {profile_name:<8} {report['requests']:>3} requests{external}, "
+                  f"{report['bytes'] / 1024:7.1f} KB, {report['compressed_bytes'] / 1024:7.1f} KB compressed")
+            for problem in problems:
+                print(f"      ⚠️  {problem}")
+            if verbose:
+                for resource in sorted(report['resources'], key=lambda item: -item['compressed_bytes']):
+                    print(f"      {resource['compressed_bytes'] / 1024:7.1f} KB  {resource['url']}")
+            ok = ok and not problems
+
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({'budgets': {name: budget_for(name) for name in profiles}, 'pages': results}, f, indent=2)
+        print(f"\n📝 Wrote {report_path}")
+
+    print("\n✅ Every page is within budget!" if ok else "\n❌ Some pages are over budget")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check each page's download size and request count against budgets")
+    parser.add_argument("pages", nargs="*",
+                        help="pages to check, relative to the site directory (default: the responsive test pages)")
+    parser.add_argument("--site-dir", type=Path, default=SITE_DIR,
+                        help="site directory to check (default: site/)")
+    parser.add_argument("--profile", action="append", choices=list(VIEWPORT_PROFILES),
+                        help="viewport profile to check (repeatable; default: all)")
+    parser.add_argument("--report", metavar="PATH",
+                        help="also write every page's resources and totals as JSON")
+    parser.add_argument("--verbose", action="store_true",
+                        help="list each page's resources, largest first")
+    args = parser.parse_args()
+
+    if not check_budgets(args.site_dir, args.pages, args.profile, args.verbose, args.report):
+        exit(1)
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Link and Asset Reference Checker for Leading Powerful Conversations Website
+
+A reference to a file that does not exist costs visitors a wasted 404 round
+trip, and nothing else notices it. This script:
+1. Parses every HTML page, stylesheet and the web manifest once, collecting
+   each href, src, srcset candidate, url() and @import, and the ids that
+   #fragments can point at
+2. Builds a reverse index from each local file to the files that reference
+   it (--index writes it as JSON, --who-uses queries it)
+3. Checks the local references against the filesystem in parallel,
+   including #fragments on pages
+4. With --external, checks links to other sites concurrently: one worker
+   per host over a reused connection (HEAD, falling back to GET), with the
+   results of successful checks cached in .link-cache.json for a day
+5. Reports images in images/ that nothing references
+
+Broken references fail the check; orphaned images are only reported.
+"""
+
+import os
+import json
+import time
+import argparse
+import http.client
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit, unquote
+
+from css_tools import rewrite_urls
+from html_tools import parse_srcset
+from fingerprint_assets import URL_ATTRIBUTES, SRCSET_ATTRIBUTES, load_manifest
+
+# Configuration
+ROOT_DIR = Path(__file__).resolve().parent
+SITE_DIR = ROOT_DIR / "site"
+IMAGES_DIR = "images"
+WEB_MANIFEST_NAME = "site.webmanifest"
+CACHE_PATH = ROOT_DIR / ".link-cache.json"
+CACHE_TTL_SECONDS = 24 * 60 * 60
+TIMEOUT_SECONDS = 10
+MAX_REDIRECTS = 5
+USER_AGENT = "Mozilla/5.0 (compatible; LPC link checker)"
+# Sites that refuse automated requests answer with these; the link may well be fine
+UNVERIFIABLE_STATUSES = {401, 403, 429, 999}
+SKIPPED_SCHEMES = ('mailto:', 'tel:', 'javascript:', 'data:', 'blob:')
+DERIVED_SUFFIXES = ('.gz', '.br')
+
+class Reference:
+    """One URL written in one file"""
+
+    def __init__(self, source, line, attribute, url):
+        self.source = source
+        self.line = line
+        self.attribute = attribute
+        self.url = url
+
+    def __str__(self):
+        return f"{self.source}:{self.line} {self.attribute}=\"{self.url}\""
+
+def css_references(source, css, attribute='url()'):
+    """References for every url() and @import in a stylesheet, with their line numbers"""
+    references = []
+    position = 0
+
+    def add(url):
+        nonlocal position
+        found = css.find(url, position)
+        if found != -1:
+            position = found
+        references.append(Reference(source, css.count('\n', 0, position) + 1, attribute, url.strip()))
+
+    rewrite_urls(css, add)
+    return references
+
+class ReferenceCollector(HTMLParser):
+    """Collects the URLs and the fragment targets (id and a name) of a page"""
+
+    def __init__(self, source):
+        super().__init__(convert_charrefs=True)
+        self.source = source
+        self.references = []
+        self.ids = set()
+        self.in_style = False
+
+    def add(self, attribute, url):
+        self.references.append(Reference(self.source, self.getpos()[0], attribute, url.strip()))
+
+    def add_css(self, attribute, css):
+        rewrite_urls(css, lambda url: self.add(attribute, url))
+
+    def handle_starttag(self, tag, attrs):
+        for name, value in attrs:
+            if not value:
+                continue
+            if name in URL_ATTRIBUTES:
+                self.add(name, value)
+            elif name in SRCSET_ATTRIBUTES:
+                for url, _ in parse_srcset(value):
+                    self.add(name, url)
+            elif name == 'style' and 'url(' in value:
+                self.add_css('style', value)
+            elif name == 'id' or (name == 'name' and tag == 'a'):
+                self.ids.add(value)
+        self.in_style = tag == 'style'
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        self.in_style = False
+
+    def handle_endtag(self, tag):
+        self.in_style = False
+
+    def handle_data(self, data):
+        if self.in_style and 'url(' in data:
+            self.add_css('<style>', data)
+
+class SiteIndex:
+    """Every reference in the site, and which files each local file is referenced from"""
+
+    def __init__(self, site_dir):
+        self.site_dir = Path(site_dir).resolve()
+        self.references = []
+        self.ids = {}
+        # Fingerprinted copy -> original, so a reference to either counts for the original
+        self.originals = {copy: original for original, copy in load_manifest(self.site_dir).items()}
+
+    def relative(self, path):
+        return path.relative_to(self.site_dir).as_posix()
+
+    def parse(self):
+        for path in sorted(self.site_dir.rglob("*.html")):
+            collector = ReferenceCollector(self.relative(path))
+            collector.feed(path.read_text(encoding='utf-8'))
+            collector.close()
+            self.references.extend(collector.references)
+            self.ids[collector.source] = collector.ids
+        for path in sorted(self.site_dir.rglob("*.css")):
+            self.references.extend(css_references(self.relative(path), path.read_text(encoding='utf-8')))
+        manifest = self.site_dir / WEB_MANIFEST_NAME
+        if manifest.exists():
+            for icon in json.loads(manifest.read_text(encoding='utf-8')).get('icons', []):
+                if icon.get('src'):
+                    self.references.append(Reference(WEB_MANIFEST_NAME, 1, 'icons[].src', icon['src']))
+        return self
+
+    def resolve(self, reference):
+        """('local', site-relative path, fragment), ('external', url, None) or None to skip"""
+        url = reference.url
+        if not url or url.startswith(SKIPPED_SCHEMES) or '${' in url:
+            return None
+        if url.startswith(('http:', 'https:', '//')):
+            return 'external', urljoin('https:', url), None
+        parts = urlsplit(url)
+        if parts.scheme:
+            return None
+        path = unquote(parts.path)
+        if not path:
+            # "#section" or "?query" on the same page
+            return 'local', reference.source, parts.fragment or None
+        if path.startswith('/'):
+            relative = posixpath.normpath(path.lstrip('/'))
+        else:
+            relative = posixpath.normpath(posixpath.join(posixpath.dirname(reference.source), path))
+        if path.endswith('/') or relative == '.':
+            relative = posixpath.join('' if relative == '.' else relative, 'index.html')
+        return 'local', relative, parts.fragment or None
+
+    def reverse_index(self):
+        """{site-relative file: sorted files that reference it}"""
+        index = {}
+        for reference in self.references:
+            resolved = self.resolve(reference)
+            if resolved and resolved[0] == 'local' and resolved[1] != reference.source:
+                target = self.originals.get(resolved[1], resolved[1])
+                index.setdefault(target, set()).add(reference.source)
+        return {target: sorted(sources) for target, sources in sorted(index.items())}
+
+    def orphaned_images(self, index):
+        """Images under images/ that nothing references"""
+        orphans = []
+        for path in sorted((self.site_dir / IMAGES_DIR).rglob("*")):
+            relative = self.relative(path)
+            if (path.is_file() and relative not in index and relative not in self.originals
+                    and not path.name.endswith(DERIVED_SUFFIXES)):
+                orphans.append(relative)
+        return orphans
+
+def target_exists(site_dir, relative):
+    path = (site_dir / relative).resolve()
+    if site_dir != path and site_dir not in path.parents:
+        return False
+    return path.is_file() or (path.is_dir() and (path / 'index.html').is_file())
+
+def check_local(index, jobs):
+    """(reference, problem) for every local reference that does not resolve"""
+    local = []
+    for reference in index.references:
+        resolved = index.resolve(reference)
+        if resolved and resolved[0] == 'local':
+            local.append((reference, resolved[1], resolved[2]))
+
+    targets = sorted({target for _, target, _ in local})
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        exists = dict(zip(targets, executor.map(lambda target: target_exists(index.site_dir, target), targets)))
+
+    problems = []
+    for reference, target, fragment in local:
+        if not exists[target]:
+            problems.append((reference, f"{target} not found"))
+        elif fragment and target.endswith('.html') and fragment not in index.ids.get(target, ()):
+            problems.append((reference, f"no id \"{fragment}\" in {target}"))
+    return problems
+
+class ExternalChecker:
+    """Checks external URLs, one worker per host reusing its connection, with a result cache"""
+
+    def __init__(self, cache_path=CACHE_PATH, use_cache=True):
+        self.cache_path = cache_path
+        self.cache = {}
+        if use_cache and cache_path.exists():
+            try:
+                self.cache = json.loads(cache_path.read_text(encoding='utf-8'))
+            except ValueError:
+                self.cache = {}
+
+    def cached(self, url):
+        entry = self.cache.get(url)
+        if entry and entry['ok'] and time.time() - entry['checked'] < CACHE_TTL_SECONDS:
+            return entry
+        return None
+
+    @staticmethod
+    def connect(scheme, host):
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return connection_class(host, timeout=TIMEOUT_SECONDS)
+
+    def request(self, connections, method, url):
+        """(status, location) for one request, over the host's open connection when there is one"""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        for attempt in range(2):
+            if key not in connections:
+                connections[key] = self.connect(*key)
+            connection = connections[key]
+            try:
+                connection.request(method, target, headers={'User-Agent': USER_AGENT, 'Accept': '*/*'})
+                response = connection.getresponse()
+                # Read the body so the connection can be reused
+                response.read()
+                if response.getheader('Connection', '').lower() == 'close':
+                    connection.close()
+                    del connections[key]
+                return response.status, response.getheader('Location')
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed an idle connection; retry once on a new one
+                connection.close()
+                del connections[key]
+                if attempt:
+                    raise
+
+    def check(self, url, connections):
+        """Result dict for one URL: ok, status, error, checked"""
+        try:
+            current = url
+            for _ in range(MAX_REDIRECTS + 1):
+                status, location = self.request(connections, 'HEAD', current)
+                if status in (403, 405, 501):
+                    # Some servers only answer GET
+                    status, location = self.request(connections, 'GET', current)
+                if status in (301, 302, 303, 307, 308) and location:
+                    current = urljoin(current, location)
+                    continue
+                break
+            else:
+                return {'ok': False, 'status': status, 'error': 'too many redirects', 'checked': time.time()}
+            return {'ok': status < 400, 'status': status, 'error': None, 'checked': time.time()}
+        except (OSError, http.client.HTTPException) as error:
+            return {'ok': False, 'status': None, 'error': str(error) or type(error).__name__, 'checked': time.time()}
+
+    def check_host(self, urls):
+        connections = {}
+        try:
+            return {url: self.check(url, connections) for url in urls}
+        finally:
+            for connection in connections.values():
+                connection.close()
+
+    def check_all(self, urls, jobs):
+        """{url: result} for every URL, checking the uncached ones concurrently"""
+        results = {url: self.cached(url) for url in urls}
+        by_host = {}
+        for url in sorted(url for url, result in results.items() if result is None):
+            by_host.setdefault(urlsplit(url).netloc, []).append(url)
+        if by_host:
+            with ThreadPoolExecutor(max_workers=min(jobs, len(by_host))) as executor:
+                for host_results in executor.map(self.check_host, by_host.values()):
+                    results.update(host_results)
+                    self.cache.update(host_results)
+            self.cache_path.write_text(json.dumps(self.cache, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+        return results, sum(len(urls) for urls in by_host.values())
+
+def check_links(site_dir=SITE_DIR, external=False, use_cache=True, jobs=None, index_path=None, who_uses=None):
+    """Check every reference in the site; returns True when none is broken"""
+    site_dir = Path(site_dir)
+    jobs = jobs or min(32, (os.cpu_count() or 1) * 4)
+    print("🔗 Checking links and asset references...")
+    try:
+        index = SiteIndex(site_dir).parse()
+    except (OSError, ValueError) as error:
+        print(f"❌ {error}")
+        return False
+    reverse = index.reverse_index()
+    print(f"  📄 {len(index.ids)} page(s), {len(index.references)} reference(s) to {len(reverse)} local file(s)")
+
+    if index_path:
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(reverse, f, indent=2)
+            f.write('\n')
+        print(f"  📝 Wrote the reverse index to {index_path}")
+    if who_uses:
+        target = who_uses.lstrip('/')
+        sources = reverse.get(index.originals.get(target, target), [])
+        print(f"\n🔎 {target} is referenced by {len(sources)} file(s)")
+        for source in sources:
+            print(f"  • {source}")
+
+    ok = True
+    problems = check_local(index, jobs)
+    if problems:
+        ok = False
+        print(f"\n❌ {len(problems)} broken local reference(s):")
+        for reference, problem in problems:
+            print(f"  ❌ {reference}: {problem}")
+    else:
+        print("  ✅ Every local reference resolves")
+
+    if external:
+        urls = sorted({resolved[1] for resolved in map(index.resolve, index.references)
+                       if resolved and resolved[0] == 'external'})
+        checker = ExternalChecker(use_cache=use_cache)
+        results, checked = checker.check_all(urls, jobs)
+        print(f"\n🌍 {len(urls)} external link(s), {checked} checked, {len(urls) - checked} from the cache")
+        sources = {}
+        for reference in index.references:
+            resolved = index.resolve(reference)
+            if resolved and resolved[0] == 'external':
+                sources.setdefault(resolved[1], []).append(reference.source)
+        for url, result in results.items():
+            if result['ok']:
+                continue
+            where = ', '.join(sorted(set(sources[url])))
+            if result['status'] in UNVERIFIABLE_STATUSES:
+                print(f"  ⚠️  {url}: HTTP {result['status']} (refuses automated checks) - in {where}")
+                continue
+            ok = False
+            problem = result['error'] or f"HTTP {result['status']}"
+            print(f"  ❌ {url}: {problem} - in {where}")
+
+    orphans = index.orphaned_images(reverse)
+    if orphans:
+        print(f"\n🗑️  {len(orphans)} image(s) in {IMAGES_DIR}/ that nothing references:")
+        for orphan in orphans:
+            size = (index.site_dir / orphan).stat().st_size
+            print(f"  • {orphan} ({size / 1024:.1f} KB)")
+
+    print("\n✅ No broken links!" if ok else "\n❌ Broken links found")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that every link and asset reference in the site resolves")
+    parser.add_argument("--site-dir", type=Path, default=SITE_DIR,
+                        help="site directory to check (default: site/)")
+    parser.add_argument("--external", action="store_true",
+                        help="also check links to other sites")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"recheck external links even if {CACHE_PATH.name} says they worked recently")
+    parser.add_argument("--jobs", type=int,
+                        help="number of parallel checks")
+    parser.add_argument("--index", metavar="PATH",
+                        help="write the reverse index (file -> files referencing it) as JSON")
+    parser.add_argument("--who-uses", metavar="FILE",
+                        help="list the files that reference FILE (e.g. images/FrameworkFull.png)")
+    args = parser.parse_args()
+
+    if not check_links(args.site_dir, args.external, not args.no_cache, args.jobs, args.index, args.who_uses):
+        exit(1)
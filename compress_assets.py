@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Asset Precompression for Leading Powerful Conversations Website
+
+Hosts that serve precompressed files (Netlify, Cloudflare, nginx with
+gzip_static/brotli_static) can send a .gz or .br sibling instead of
+compressing every response on the fly, at a level too slow to use per
+request. This script:
+1. Finds every compressible file in the built dist/ tree (HTML, CSS, JS,
+   XML including the sitemap, SVG, JSON, web manifest and text files)
+2. Writes a .gz (gzip level 9) and, when Brotli is available, a .br
+   (quality 11) sibling for each, in parallel
+3. Skips outputs already newer than their source, drops outputs that would
+   not be smaller, and removes outputs whose source is gone
+4. Reports the savings per file and in total
+
+Brotli comes from the brotli Python package or the brotli command line tool;
+without either only .gz files are written.
+"""
+
+import os
+import gzip
+import shutil
+import argparse
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from build_profile import span
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; the command line tool is used instead
+    brotli = None
+
+# Configuration
+# The built output from build.py; the source pages in site/ stay uncompressed
+DIST_DIR = Path(__file__).resolve().parent / "dist"
+COMPRESSIBLE_SUFFIXES = ('.html', '.css', '.js', '.mjs', '.xml', '.svg', '.json', '.webmanifest', '.txt')
+# Below this, the compressed response saves less than its own headers cost
+MIN_SIZE = 256
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+def brotli_backend():
+    """'module', 'tool' or None depending on how Brotli output can be produced"""
+    if brotli is not None:
+        return 'module'
+    if shutil.which('brotli'):
+        return 'tool'
+    return None
+
+def compressible_files(site_dir):
+    """Files under the site that are worth precompressing"""
+    return [path for path in sorted(Path(site_dir).rglob("*"))
+            if path.is_file() and path.suffix.lower() in COMPRESSIBLE_SUFFIXES and path.stat().st_size >= MIN_SIZE]
+
+def compress_bytes(data, encoding, backend=None):
+    if encoding == 'gz':
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if backend == 'module':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    result = subprocess.run(['brotli', '-c', f'-q{BROTLI_QUALITY}'], input=data, capture_output=True, check=True)
+    return result.stdout
+
+def is_up_to_date(source, output):
+    return output.exists() and output.stat().st_mtime >= source.stat().st_mtime
+
+def compress_file(path, encodings, backend=None, force=False):
+    """Write the compressed siblings of one file; returns (path, size, {encoding: size or None}, skipped)
+
+    A size of None means the output would not have been smaller and was
+    not kept.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    sizes = {}
+    skipped = True
+    data = None
+    with span(f"compress {path.name}", 'compress', bytes_in=size) as fields:
+        for encoding in encodings:
+            output = path.with_name(f"{path.name}.{encoding}")
+            if not force and is_up_to_date(path, output):
+                sizes[encoding] = output.stat().st_size
+                continue
+            skipped = False
+            if data is None:
+                data = path.read_bytes()
+            compressed = compress_bytes(data, encoding, backend)
+            if len(compressed) >= size:
+                if output.exists():
+                    os.remove(output)
+                sizes[encoding] = None
+                continue
+            output.write_bytes(compressed)
+            sizes[encoding] = len(compressed)
+        fields['bytes_out'] = sum(value for value in sizes.values() if value)
+        fields['cache'] = 'hit' if skipped else 'miss'
+    return path, size, sizes, skipped
+
+def remove_orphans(site_dir, encodings):
+    """Delete compressed files whose source no longer exists"""
+    removed = []
+    for encoding in encodings:
+        for output in Path(site_dir).rglob(f"*.{encoding}"):
+            source = output.with_suffix('')
+            if source.suffix.lower() in COMPRESSIBLE_SUFFIXES and not source.exists():
+                os.remove(output)
+                removed.append(output)
+    return removed
+
+def compress_assets(site_dir=DIST_DIR, jobs=None, use_brotli=True, force=False):
+    """Precompress the site's text assets; returns True on success"""
+    site_dir = Path(site_dir)
+    print("🗜️  Precompressing assets...")
+    if not site_dir.is_dir():
+        print(f"❌ {site_dir} does not exist - run build.py first")
+        return False
+
+    backend = brotli_backend() if use_brotli else None
+    encodings = ['gz'] + (['br'] if backend else [])
+    if use_brotli and not backend:
+        print("  ⚠️  Brotli not available (pip install brotli, or install the brotli tool) - writing .gz only")
+
+    files = compressible_files(site_dir)
+    jobs = jobs or os.cpu_count() or 1
+    try:
+        if jobs > 1 and len(files) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as executor:
+                results = list(executor.map(compress_file, files, [encodings] * len(files),
+                                            [backend] * len(files), [force] * len(files)))
+        else:
+            results = [compress_file(path, encodings, backend, force) for path in files]
+    except (OSError, subprocess.CalledProcessError) as error:
+        print(f"❌ {error}")
+        return False
+
+    totals = {encoding: [0, 0] for encoding in encodings}
+    skipped = 0
+    for path, size, sizes, was_skipped in results:
+        skipped += was_skipped
+        columns = []
+        for encoding in encodings:
+            compressed = sizes[encoding]
+            if compressed is None:
+                columns.append(f"{encoding}: not smaller")
+                continue
+            totals[encoding][0] += size
+            totals[encoding][1] += compressed
+            columns.append(f"{encoding}: {compressed / 1024:6.1f} KB ({1 - compressed / size:.0%} smaller)")
+        marker = '⏭️ ' if was_skipped else '✅'
+        print(f"  {marker} {str(path.relative_to(site_dir)):<45} {size / 1024:6.1f} KB  {'  '.join(columns)}")
+
+    for output in remove_orphans(site_dir, encodings):
+        print(f"  🗑️  Removed {output.relative_to(site_dir)} (source deleted)")
+
+    print("\n📊 Summary:")
+    print(f"  📁 {len(files)} file(s), {skipped} already up to date")
+    for encoding, (original, compressed) in totals.items():
+        if original:
+            print(f"  📉 .{encoding}: {original / 1024:.1f} KB → {compressed / 1024:.1f} KB "
+                  f"({(original - compressed) / 1024:.1f} KB saved, {1 - compressed / original:.0%})")
+
+    print("\n✅ Precompression complete!")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write .gz and .br siblings for the site's text assets")
+    parser.add_argument("--site-dir", type=Path, default=DIST_DIR,
+                        help="built site directory to compress (default: dist/)")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="number of files to compress in parallel (default: CPU count)")
+    parser.add_argument("--no-brotli", action="store_true",
+                        help="only write .gz files")
+    parser.add_argument("--force", action="store_true",
+                        help="recompress files even when their outputs are up to date")
+    args = parser.parse_args()
+
+    if not compress_assets(args.site_dir, jobs=args.jobs, use_brotli=not args.no_brotli, force=args.force):
+        exit(1)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Critical CSS Inliner for Leading Powerful Conversations Website
+
+Pages cannot render until their stylesheet has downloaded. This script
+inlines, in each page's <head>, just the rules needed to render the top of
+that page, and loads the full stylesheet without blocking rendering:
+1. Parses the page and the rules of its stylesheet (following @imports)
+2. Matches every rule against the elements above the fold - the page header
+   and the first block of <main> - keeping cascade order and @media blocks
+3. Inlines the matching rules in a <style data-critical> element
+4. Turns the stylesheet <link> into a preload that applies itself on load,
+   with a <noscript> fallback
+5. Reports the inlined bytes per page and whether the start of the page, up
+   to the end of the inlined CSS, fits in the first TCP round trip
+
+Running it again refreshes the inlined CSS. It rewrites the pages of a
+build directory (dist/ by default) and refuses to change the sources in
+site/; --dry-run can still report on them.
+"""
+
+import gzip
+import argparse
+from pathlib import Path
+
+from css_tools import flatten_stylesheet, parse_stylesheet, serialize_rules, select_rules, ElementIndex
+from html_tools import TagRewriter, parse_document, build_starttag
+
+# Configuration
+SITE_DIR = Path(__file__).resolve().parent / "site"
+DIST_DIR = Path(__file__).resolve().parent / "dist"
+# Roughly what a server can send before the first ACK (10 TCP segments)
+FIRST_ROUND_TRIP_BYTES = 14 * 1024
+# Marks the stylesheet <link> this script has made asynchronous
+ASYNC_ONLOAD = "this.onload=null;this.rel='stylesheet'"
+
+def is_local(href):
+    return bool(href) and '://' not in href and not href.startswith(('//', 'data:'))
+
+def page_stylesheets(document):
+    """Hrefs of the local stylesheets a page loads, in order"""
+    hrefs = []
+    for element in document.iter():
+        if element.tag != 'link' or element.inside('noscript'):
+            continue
+        rel = element.attrs.get('rel', '').lower().split()
+        href = element.attrs.get('href')
+        if not is_local(href):
+            continue
+        is_async = 'preload' in rel and element.attrs.get('onload') == ASYNC_ONLOAD
+        if ('stylesheet' in rel or is_async) and href not in hrefs:
+            hrefs.append(href)
+    return hrefs
+
+def above_the_fold(document, full_page=False):
+    """Elements of the page that are likely visible without scrolling
+
+    Everything up to and including the first element inside <main> (the hero
+    or introduction section), which covers <html>, <body>, the header and
+    navigation. With full_page, every element of the page.
+    """
+    elements = [element for element in document.iter() if not element.tag.startswith('#')]
+    main = next((element for element in elements if element.tag == 'main'), None)
+    if full_page or main is None or not main.children:
+        return elements
+    fold = max(element.index for element in main.children[0].iter())
+    return [element for element in elements if element.index <= fold]
+
+def critical_rules(rules, elements):
+    """The rules that apply to any of the elements, in stylesheet order"""
+    index = ElementIndex(None, elements=elements)
+    return select_rules(rules, index.matches, skip_print=True)
+
+class CriticalCssRewriter(TagRewriter):
+    """Inlines critical CSS before a page's stylesheet links and makes them asynchronous"""
+
+    def __init__(self, content, hrefs, css):
+        super().__init__(content)
+        self.hrefs = hrefs
+        self.css = css
+        self.inserted = False
+
+    def indent(self):
+        """Whitespace before the current tag on its line"""
+        start = self.line_starts[self.getpos()[0] - 1]
+        prefix = self.content[start:start + self.getpos()[1]]
+        return prefix if not prefix.strip() else ''
+
+    def on_starttag(self, tag, attrs, raw, self_closing):
+        values = dict(attrs)
+        if tag == 'style' and 'data-critical' in values:
+            # Inlined by an earlier run: refresh it in place
+            self.drop_content()
+            self.inserted = True
+            return f"<style data-critical>{self.css}</style>"
+        if tag != 'link' or self.inside('noscript') or values.get('href') not in self.hrefs:
+            return None
+
+        rel = (values.get('rel') or '').lower().split()
+        indent = self.indent()
+        prefix = ''
+        if not self.inserted:
+            prefix = f"<style data-critical>{self.css}</style>\n{indent}"
+            self.inserted = True
+        if 'preload' in rel:
+            return prefix + raw
+
+        preload = [(name, value) for name, value in attrs if name not in ('rel', 'href', 'onload', 'as')]
+        preload = [('rel', 'preload'), ('href', values['href']), ('as', 'style'), ('onload', ASYNC_ONLOAD)] + preload
+        return (f"{prefix}{build_starttag('link', preload, self_closing)}\n"
+                f"{indent}<noscript>{raw}</noscript>")
+
+def first_round_trip_bytes(content):
+    """Compressed size of the page up to the end of its inlined CSS"""
+    end = content.find('</style>', content.find('<style data-critical>'))
+    return len(gzip.compress(content[:end + len('</style>')].encode('utf-8'), mtime=0))
+
+def inline_critical_css(html_file, full_page=False, write=True):
+    """Inline the critical CSS of one page; returns a report dict or None"""
+    content = html_file.read_text(encoding='utf-8')
+    document = parse_document(content)
+    hrefs = page_stylesheets(document)
+    if not hrefs:
+        return None
+
+    rules = []
+    for href in hrefs:
+        css, _ = flatten_stylesheet(html_file.parent / href.split('?')[0], html_file.parent)
+        rules.extend(parse_stylesheet(css))
+    selected = critical_rules(rules, above_the_fold(document, full_page))
+    css = serialize_rules(selected)
+
+    updated = CriticalCssRewriter(content, hrefs, css).rewrite()
+    if write and updated != content:
+        html_file.write_text(updated, encoding='utf-8')
+    return {
+        'rules': len(selected),
+        'total_rules': sum(1 for rule in rules if rule.is_style),
+        'inlined_bytes': len(css.encode('utf-8')),
+        'first_round_trip': first_round_trip_bytes(updated),
+        'changed': updated != content,
+    }
+
+def inline_site(site_dir=DIST_DIR, full_page=False, write=True):
+    """Inline critical CSS in every page of a built site; returns False if a page fails"""
+    site_dir = Path(site_dir).resolve()
+    if write and site_dir == SITE_DIR:
+        print(f"❌ Refusing to inline critical CSS into the sources in {SITE_DIR} - run it on a build directory")
+        return False
+    if not site_dir.is_dir():
+        print(f"❌ {site_dir} does not exist - run build.py first")
+        return False
+    print("⚡ Inlining critical CSS...")
+    ok = True
+
+    for html_file in sorted(site_dir.rglob("*.html")):
+        name = html_file.relative_to(site_dir)
+        try:
+            report = inline_critical_css(html_file, full_page, write)
+        except (OSError, ValueError) as error:
+            print(f"  ❌ {name}: {error}")
+            ok = False
+            continue
+        if report is None:
+            print(f"  ℹ️  {name}: no local stylesheet")
+            continue
+
+        fits = report['first_round_trip'] <= FIRST_ROUND_TRIP_BYTES
+        print(f"  {'✅' if fits else '⚠️ '} {name}: {report['rules']}/{report['total_rules']} rules, "
+              f"{report['inlined_bytes'] / 1024:.1f} KB inlined, "
+              f"{report['first_round_trip'] / 1024:.1f} KB gzipped up to the end of the critical CSS"
+              f"{'' if fits else f' (over the {FIRST_ROUND_TRIP_BYTES // 1024} KB first round trip)'}")
+
+    print("\n✅ Critical CSS complete!" if ok else "\n❌ Critical CSS failed for some pages")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inline each page's critical CSS and load the rest without blocking")
+    parser.add_argument("--site-dir", type=Path, default=DIST_DIR,
+                        help="built site directory to process (default: dist/; site/ only with --dry-run)")
+    parser.add_argument("--full-page", action="store_true",
+                        help="inline the rules used anywhere on the page, not just above the fold")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report the critical CSS sizes without changing any page")
+    args = parser.parse_args()
+
+    if not inline_site(args.site_dir, full_page=args.full_page, write=not args.dry_run):
+        exit(1)
@@ -0,0 +1,716 @@
+#!/usr/bin/env python3
+"""
+CSS Tools for the Leading Powerful Conversations Website Build Scripts
+
+Helpers shared by the scripts that read or rewrite the stylesheets in site/css/:
+- tokenize: split CSS into comments, strings, whitespace and punctuation
+- resolve_imports: follow the @import graph from an entry stylesheet
+- rewrite_urls / rebase_urls: rewrite the url() and @import references
+- minify_css: drop comments and redundant whitespace without changing meaning
+- inline_custom_properties: replace var(--name) with values that never change
+- parse_stylesheet / serialize_rules: a flat rule list and back again
+- SelectorMatcher / selector_matches: match selectors against html_tools.Element trees
+"""
+
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+# Tokens, in priority order: a string or comment hides anything inside it.
+# An unclosed comment runs to the end of the file (as it does in browsers) and
+# any character that starts no other token, such as the quote of an unclosed
+# string, becomes an 'error' token.
+TOKEN_RE = re.compile(r'''
+    (?P<comment>/\*.*?(?:\*/|\Z))
+  | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<url>url\(\s*[^)"'\s]*\s*\))
+  | (?P<ws>\s+)
+  | (?P<punct>[{}();:,>~+])
+  | (?P<word>[^\s{}();:,>~+"'/]+|/)
+  | (?P<error>.)
+''', re.S | re.X | re.I)
+
+# @import url("file.css") media; or @import "file.css" media;
+IMPORT_RE = re.compile(r'''@import\s+(?:url\(\s*(?P<q1>["']?)(?P<url>[^"')]+)(?P=q1)\s*\)|(?P<q2>["'])(?P<bare>[^"']+)(?P=q2))\s*(?P<media>[^;]*);''', re.I)
+
+VAR_RE = re.compile(r'var\(\s*(--[\w-]+)\s*(?:,[^()]*)?\)')
+
+# Whitespace next to these characters never changes what the CSS means
+# (':' only after it - a space before ':' is a descendant combinator)
+SPACE_BEFORE = set('{};,>~)')
+SPACE_AFTER = set('{};,>~:(')
+
+def tokenize(css):
+    """Split CSS into (kind, text) tokens: comment, string, url, ws, punct, word or error"""
+    return [(match.lastgroup, match.group()) for match in TOKEN_RE.finditer(css)]
+
+def iter_tokens(css):
+    """Like tokenize(), but yields (kind, text, offset)"""
+    for match in TOKEN_RE.finditer(css):
+        yield match.lastgroup, match.group(), match.start()
+
+def strip_comments(css):
+    """Remove comments, leaving strings that happen to contain '/*' alone"""
+    return ''.join(text for kind, text in tokenize(css) if kind != 'comment')
+
+def is_external(url):
+    return url.startswith(('http:', 'https:', '//', 'data:'))
+
+def rewrite_urls(css, replace):
+    """Pass every url() and @import "..." reference through replace(url)
+
+    replace returns the new URL, or None to keep the reference as written.
+    Quoted and unquoted url() forms are handled; URLs inside comments and
+    unrelated strings are left alone.
+    """
+    tokens = tokenize(css)
+    output = []
+    index = 0
+
+    def next_significant(position):
+        while position < len(tokens) and tokens[position][0] in ('ws', 'comment'):
+            position += 1
+        return position
+
+    while index < len(tokens):
+        kind, text = tokens[index]
+        if kind == 'url':
+            url = text[4:-1].strip()
+            replacement = replace(url)
+            output.append(text if replacement is None else f'url("{replacement}")')
+            index += 1
+            continue
+        if kind == 'word' and text.lower() in ('url', '@import'):
+            # url( "..." ) or @import "..."
+            position = next_significant(index + 1)
+            if text.lower() == 'url':
+                if position < len(tokens) and tokens[position][1] == '(':
+                    position = next_significant(position + 1)
+                else:
+                    position = len(tokens)
+            if position < len(tokens) and tokens[position][0] == 'string':
+                string = tokens[position][1]
+                replacement = replace(string[1:-1])
+                output.extend(token for _, token in tokens[index:position])
+                output.append(string if replacement is None else f'"{replacement}"')
+                index = position + 1
+                continue
+        output.append(text)
+        index += 1
+    return ''.join(output)
+
+def rebase_urls(css, from_dir, to_dir):
+    """Rewrite relative url() references so they resolve from another directory"""
+    from_dir, to_dir = Path(from_dir), Path(to_dir)
+    if from_dir.resolve() == to_dir.resolve():
+        return css
+
+    def rebase(url):
+        if is_external(url) or url.startswith(('/', '#')):
+            return None
+        return os.path.relpath(from_dir / url, to_dir).replace(os.sep, '/')
+
+    return rewrite_urls(css, rebase)
+
+class CssModule:
+    """One stylesheet reached through the @import graph"""
+
+    def __init__(self, path, media, css):
+        self.path = path
+        self.media = media
+        self.css = css
+
+def resolve_imports(entry_path, media='', seen=None):
+    """Flatten the @import graph below a stylesheet into modules in cascade order
+
+    Each local @import is replaced by the modules it pulls in, depth first,
+    exactly where the browser would apply them. Imports of external URLs are
+    kept as CssModule(None, media, '@import ...;') entries so the caller can
+    hoist them. A module imported twice is only included once, at its first
+    position, and an import cycle raises ValueError.
+    """
+    entry_path = Path(entry_path).resolve()
+    seen = set() if seen is None else seen
+    if entry_path in seen:
+        return []
+    seen.add(entry_path)
+
+    css = strip_comments(entry_path.read_text(encoding='utf-8'))
+    modules = []
+    position = 0
+    for match in IMPORT_RE.finditer(css):
+        url = match.group('url') or match.group('bare')
+        import_media = match.group('media').strip()
+        if re.match(r'(layer|supports)\b', import_media, re.I):
+            raise ValueError(f"{entry_path.name}: @import with {import_media.split('(')[0]} is not supported")
+
+        modules.append(CssModule(entry_path, media, css[position:match.start()]))
+        position = match.end()
+
+        if is_external(url):
+            modules.append(CssModule(None, media, match.group()))
+            continue
+        combined = ' and '.join(part for part in (media, import_media) if part)
+        target = (entry_path.parent / url).resolve()
+        if not target.exists():
+            raise ValueError(f"{entry_path.name}: imported file {url} not found")
+        if target in seen and not any(module.path == target for module in modules):
+            raise ValueError(f"{entry_path.name}: import cycle through {url}")
+        modules.extend(resolve_imports(target, combined, seen))
+
+    modules.append(CssModule(entry_path, media, css[position:]))
+    return [module for module in modules if module.path is None or module.css.strip()]
+
+def minify_css(css):
+    """Drop comments and whitespace that do not affect how the CSS applies"""
+    output = []
+    pending_space = False
+    for kind, text in tokenize(css):
+        if kind == 'comment':
+            continue
+        if kind == 'ws':
+            pending_space = True
+            continue
+        if pending_space and output and output[-1][-1] not in SPACE_AFTER and text[0] not in SPACE_BEFORE:
+            output.append(' ')
+        pending_space = False
+        if text == '}' and output and output[-1] == ';':
+            # The last declaration of a block needs no semicolon
+            output.pop()
+        output.append(text)
+    return ''.join(output)
+
+def iter_rules(tokens):
+    """Yield (prelude, body tokens, block path) for each declaration block
+
+    block path is the list of enclosing at-rule preludes, e.g. ['@media print'].
+    """
+    stack = []
+    prelude = []
+    for index, (kind, text) in enumerate(tokens):
+        if kind == 'comment':
+            continue
+        if text == '{':
+            stack.append((' '.join(''.join(prelude).split()), index))
+            prelude = []
+        elif text == '}':
+            if stack:
+                name, start = stack.pop()
+                if not name.startswith('@'):
+                    yield name, tokens[start + 1:index], [outer for outer, _ in stack]
+            prelude = []
+        elif text == ';':
+            prelude = []
+        else:
+            prelude.append(text)
+
+def custom_property_definitions(css):
+    """Map each custom property to the list of (selector, block path, value) defining it"""
+    definitions = {}
+    for selector, body, path in iter_rules(tokenize(css)):
+        declaration = ''.join(text for kind, text in body if kind != 'comment')
+        for match in re.finditer(r'(--[\w-]+)\s*:\s*([^;]*)', declaration):
+            definitions.setdefault(match.group(1), []).append((selector, path, match.group(2).strip()))
+    return definitions
+
+def constant_custom_properties(css, external_text=''):
+    """Custom properties whose value is the same wherever they are used
+
+    A property qualifies when it is declared once, at the top level in a
+    :root rule, with a value that does not itself use var(), and it is not
+    mentioned in external_text (page markup and scripts, which could set or
+    override it at runtime).
+    """
+    constants = {}
+    for name, definitions in custom_property_definitions(css).items():
+        if len(definitions) != 1:
+            continue
+        selector, path, value = definitions[0]
+        if selector != ':root' or path or not value or 'var(' in value or '!important' in value:
+            continue
+        if re.search(rf'{re.escape(name)}(?![\w-])', external_text):
+            continue
+        constants[name] = value
+    return constants
+
+def inline_custom_properties(css, constants):
+    """Replace var() references to constant properties and drop their declarations
+
+    Expects minified CSS (see minify_css), so declarations have no padding.
+    """
+    def inline(match):
+        return constants.get(match.group(1), match.group())
+
+    # Substitute outside strings only
+    css = ''.join(VAR_RE.sub(inline, part) if index % 2 == 0 else part
+                  for index, part in enumerate(re.split(r'''("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')''', css)))
+
+    # Declarations of inlined properties are no longer needed
+    names = '|'.join(re.escape(name) for name in sorted(constants, key=len, reverse=True))
+    if names:
+        declaration = rf'(?:{names}):[^;{{}}]*'
+        # "name:value;" anywhere, then a last "name:value" before "}" with its leading ";"
+        css = re.sub(rf'(?<=[{{;]){declaration};', '', css)
+        css = re.sub(rf';{declaration}(?=}})|(?<={{){declaration}(?=}})', '', css)
+        css = css.replace(':root{}', '')
+    return css
+
+def flatten_stylesheet(entry_path, output_dir=None):
+    """The stylesheet below entry_path with its local @imports inlined, in cascade order
+
+    url() references are rebased to output_dir (default: the entry's directory),
+    imports with a media query are wrapped in @media, and external imports are
+    hoisted to the top. Returns (css, list of files read).
+    """
+    entry_path = Path(entry_path)
+    output_dir = Path(output_dir) if output_dir else entry_path.parent
+    modules = resolve_imports(entry_path)
+
+    # External imports and @charset have to come before any rule
+    hoisted = [module.css for module in modules if module.path is None]
+    parts = []
+    for module in modules:
+        if module.path is None:
+            continue
+        css = rebase_urls(module.css, module.path.parent, output_dir)
+        css = '\n'.join(line for line in css.splitlines() if not line.strip().lower().startswith('@charset'))
+        parts.append(f"@media {module.media}{{{css}}}" if module.media else css)
+
+    files = []
+    for module in modules:
+        if module.path is not None and module.path not in files:
+            files.append(module.path)
+    return '\n'.join(hoisted + parts), files
+
+# At-rules whose blocks contain further rules rather than declarations
+GROUPING_AT_RULES = ('@media', '@supports', '@layer', '@container', '@document')
+
+class CssRule:
+    """A rule of a parsed stylesheet
+
+    For a style rule, prelude is its selector list and body its declarations;
+    for other at-rules (@font-face, @keyframes, @import ...) prelude is the
+    at-rule itself and body its raw block (None for statements like @import).
+    conditions holds the preludes of the enclosing grouping rules, outermost
+    first, e.g. ('@media (max-width:768px)',).
+    """
+
+    def __init__(self, prelude, body, conditions=(), line=1):
+        self.prelude = prelude
+        self.body = body
+        self.conditions = tuple(conditions)
+        self.line = line
+
+    @property
+    def is_style(self):
+        return not self.prelude.startswith('@')
+
+    @property
+    def selectors(self):
+        return split_top_level(self.prelude, ',') if self.is_style else []
+
+def split_top_level(text, separator):
+    """Split on a separator that is not inside brackets, parentheses or strings"""
+    parts = []
+    depth = 0
+    quote = None
+    current = []
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    parts.append(''.join(current).strip())
+    return [part for part in parts if part]
+
+def parse_stylesheet(css):
+    """Parse CSS into a flat list of CssRule in source order"""
+    tokens = []
+    rules = []
+
+    # Line numbers of each token, for rule positions
+    lines = []
+    line = 1
+    for kind, text in tokenize(css):
+        if kind != 'comment':
+            tokens.append((kind, text))
+            lines.append(line)
+        line += text.count('\n')
+
+    def parse_block(index, conditions):
+        prelude = []
+        start_line = None
+        while index < len(tokens):
+            kind, text = tokens[index]
+            if text == '}' and kind == 'punct':
+                return index + 1
+            if text == ';' and kind == 'punct':
+                statement = ''.join(prelude).strip()
+                if statement:
+                    rules.append(CssRule(' '.join(statement.split()), None, conditions, start_line or lines[index]))
+                prelude, start_line = [], None
+                index += 1
+                continue
+            if text == '{' and kind == 'punct':
+                header = ' '.join(''.join(prelude).split())
+                rule_line = start_line or lines[index]
+                prelude, start_line = [], None
+                if header.lower().startswith(GROUPING_AT_RULES):
+                    index = parse_block(index + 1, conditions + (header,))
+                    continue
+                # Collect the raw block, including any nested blocks (@keyframes)
+                depth = 1
+                end = index + 1
+                while end < len(tokens) and depth:
+                    if tokens[end][0] == 'punct':
+                        depth += {'{': 1, '}': -1}.get(tokens[end][1], 0)
+                    end += 1
+                body = ''.join(text for _, text in tokens[index + 1:end - 1])
+                rules.append(CssRule(header, body.strip(), conditions, rule_line))
+                index = end
+                continue
+            if kind != 'ws' and start_line is None:
+                start_line = lines[index]
+            prelude.append(text)
+            index += 1
+        return index
+
+    parse_block(0, ())
+    return rules
+
+def serialize_rules(rules):
+    """Minified CSS for a list of CssRule, re-opening their grouping rules as needed"""
+    output = []
+    open_conditions = ()
+    for rule in rules:
+        # Close the groups this rule is not in, then open the ones it needs
+        common = 0
+        while (common < len(open_conditions) and common < len(rule.conditions)
+               and open_conditions[common] == rule.conditions[common]):
+            common += 1
+        output.append('}' * (len(open_conditions) - common))
+        output.extend(f"{condition}{{" for condition in rule.conditions[common:])
+        open_conditions = rule.conditions
+        output.append(f"{rule.prelude};" if rule.body is None else f"{rule.prelude}{{{rule.body}}}")
+    output.append('}' * len(open_conditions))
+    return minify_css(''.join(output))
+
+# Compound selector parts: tag, #id, .class, [attribute], :pseudo(arguments), ::pseudo-element
+SIMPLE_SELECTOR_RE = re.compile(r'''
+    (?P<tag>\*|[a-zA-Z][\w-]*)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<cls>[\w-]+)
+  | \[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[~|^$*]?=)\s*(?P<value>"[^"]*"|'[^']*'|[^\]\s]+)\s*(?P<flag>[iIsS])?\s*)?\]
+  | ::?(?P<pseudo>[\w-]+)(?:\((?P<args>(?:[^()]|\([^()]*\))*)\))?
+''', re.X)
+
+# Pseudo-classes that depend on user interaction or form state: the element
+# could match at some point, so treat the condition as satisfied
+STATE_PSEUDO_CLASSES = {
+    'hover', 'focus', 'active', 'visited', 'link', 'any-link', 'focus-within', 'focus-visible',
+    'target', 'checked', 'disabled', 'enabled', 'valid', 'invalid', 'required', 'optional',
+    'placeholder-shown', 'default', 'indeterminate', 'in-range', 'out-of-range',
+    'read-only', 'read-write', 'user-invalid', 'user-valid', 'autofill', 'open', 'closed',
+    'fullscreen', 'modal', 'popover-open', 'playing', 'paused',
+}
+
+# Pseudo-elements, including the legacy single-colon forms
+PSEUDO_ELEMENTS = {'before', 'after', 'first-line', 'first-letter', 'marker', 'placeholder',
+                   'selection', 'backdrop', 'file-selector-button'}
+
+@lru_cache(maxsize=4096)
+def parse_selector(selector):
+    """Split a complex selector into [(combinator, compound)], leftmost first
+
+    The first combinator is '' and the others are ' ', '>', '+' or '~'.
+    Each compound is a list of (kind, name, operator, value) tuples.
+    """
+    parts = []
+    combinator = ''
+    index = 0
+    selector = selector.strip()
+    while index < len(selector):
+        char = selector[index]
+        if char.isspace() or char in '>+~':
+            # Whitespace alone is the descendant combinator
+            while index < len(selector) and (selector[index].isspace() or selector[index] in '>+~'):
+                if not selector[index].isspace():
+                    combinator = selector[index]
+                elif not combinator:
+                    combinator = ' '
+                index += 1
+            continue
+        compound = []
+        while index < len(selector) and not selector[index].isspace() and selector[index] not in '>+~':
+            match = SIMPLE_SELECTOR_RE.match(selector, index)
+            if not match:
+                raise ValueError(f"cannot parse selector {selector!r}")
+            if match.group('tag'):
+                compound.append(('tag', match.group('tag').lower(), None, None))
+            elif match.group('id'):
+                compound.append(('id', match.group('id'), None, None))
+            elif match.group('cls'):
+                compound.append(('class', match.group('cls'), None, None))
+            elif match.group('attr'):
+                value = match.group('value')
+                if value and value[0] in '"\'':
+                    value = value[1:-1]
+                operator = match.group('op')
+                if match.group('flag') and match.group('flag').lower() == 'i':
+                    operator = f"{operator}i"
+                compound.append(('attr', match.group('attr').lower(), operator, value))
+            else:
+                compound.append(('pseudo', match.group('pseudo').lower(), None, match.group('args')))
+            index = match.end()
+        parts.append((combinator or ('' if not parts else ' '), compound))
+        combinator = ''
+    return parts
+
+def nth_matches(expression, position):
+    """Whether a 1-based position satisfies an an+b expression"""
+    expression = expression.split(' of ')[0].replace(' ', '').lower()
+    if expression == 'odd':
+        return position % 2 == 1
+    if expression == 'even':
+        return position % 2 == 0
+    match = re.fullmatch(r'([+-]?\d*)n([+-]\d+)?|([+-]?\d+)', expression)
+    if not match:
+        return True
+    if match.group(3) is not None:
+        return position == int(match.group(3))
+    a = match.group(1)
+    a = -1 if a == '-' else 1 if a in ('', '+') else int(a)
+    b = int(match.group(2) or 0)
+    if a == 0:
+        return position == b
+    return (position - b) % a == 0 and (position - b) // a >= 0
+
+def attribute_matches(element, name, operator, expected):
+    if name not in element.attrs:
+        return False
+    if operator is None:
+        return True
+    actual = element.attrs[name]
+    if operator.endswith('i'):
+        operator = operator[:-1]
+        actual, expected = actual.lower(), expected.lower()
+    if operator == '=':
+        return actual == expected
+    if operator == '~=':
+        return expected in actual.split()
+    if operator == '|=':
+        return actual == expected or actual.startswith(f"{expected}-")
+    if operator == '^=':
+        return bool(expected) and actual.startswith(expected)
+    if operator == '$=':
+        return bool(expected) and actual.endswith(expected)
+    if operator == '*=':
+        return bool(expected) and expected in actual
+    return True
+
+def element_siblings(element):
+    siblings = element.parent.children if element.parent is not None else [element]
+    return [sibling for sibling in siblings if not sibling.tag.startswith('#')]
+
+class SelectorMatcher:
+    """Matches selectors against html_tools.Element trees
+
+    By default it answers "could this selector ever match the element?":
+    interaction and form-state pseudo-classes (:hover, :focus, :checked ...),
+    pseudo-elements and anything not understood are assumed to match, as are
+    class names and attributes that scripts add at runtime (dynamic_classes,
+    dynamic_attributes). Inside :not() the question flips to "does the
+    selector certainly match?", so negations stay on the safe side too.
+    """
+
+    def __init__(self, dynamic_classes=(), dynamic_attributes=()):
+        self.dynamic_classes = frozenset(dynamic_classes)
+        self.dynamic_attributes = frozenset(dynamic_attributes)
+
+    def matches(self, selector, element, possible=True):
+        """Whether a (complex) selector could (or, with possible=False, certainly does) match"""
+        try:
+            parts = parse_selector(selector)
+        except ValueError:
+            return possible
+        return self.parts_match(parts, len(parts) - 1, element, possible)
+
+    def parts_match(self, parts, index, element, possible):
+        combinator, compound = parts[index]
+        if element.tag.startswith('#') or not self.compound_matches(compound, element, possible):
+            return False
+        if index == 0:
+            return True
+
+        if combinator in (' ', '>'):
+            for ancestor in element.ancestors():
+                if self.parts_match(parts, index - 1, ancestor, possible):
+                    return True
+                if combinator == '>':
+                    break
+            return False
+
+        siblings = element_siblings(element)
+        position = siblings.index(element)
+        candidates = siblings[position - 1:position] if combinator == '+' else siblings[:position]
+        return any(self.parts_match(parts, index - 1, sibling, possible) for sibling in reversed(candidates))
+
+    def compound_matches(self, compound, element, possible):
+        for kind, name, operator, value in compound:
+            if kind == 'tag':
+                if name != '*' and element.tag != name:
+                    return False
+            elif kind == 'id':
+                if element.id != name:
+                    return False
+            elif kind == 'class':
+                if name not in element.classes and not (possible and name in self.dynamic_classes):
+                    return False
+            elif kind == 'attr':
+                if not attribute_matches(element, name, operator, value) and not (possible and name in self.dynamic_attributes):
+                    return False
+            elif not self.pseudo_matches(element, name, value, possible):
+                return False
+        return True
+
+    def pseudo_matches(self, element, name, args, possible):
+        if name in PSEUDO_ELEMENTS or name.startswith('-'):
+            return True
+        if name in STATE_PSEUDO_CLASSES:
+            return possible
+        if name == 'root':
+            return element.tag == 'html'
+        if name == 'empty':
+            return not element.children
+        if name == 'not':
+            return not any(self.matches(selector, element, not possible)
+                           for selector in split_top_level(args or '', ','))
+        if name in ('is', 'where', 'matches'):
+            return any(self.matches(selector, element, possible)
+                       for selector in split_top_level(args or '', ','))
+
+        siblings = element_siblings(element)
+        if name.endswith('of-type'):
+            siblings = [sibling for sibling in siblings if sibling.tag == element.tag]
+        position = siblings.index(element) + 1 if element in siblings else 1
+        from_end = len(siblings) - position + 1
+        if name in ('first-child', 'first-of-type'):
+            return position == 1
+        if name in ('last-child', 'last-of-type'):
+            return from_end == 1
+        if name in ('only-child', 'only-of-type'):
+            return len(siblings) == 1
+        if name in ('nth-child', 'nth-of-type'):
+            return nth_matches(args or '', position)
+        if name in ('nth-last-child', 'nth-last-of-type'):
+            return nth_matches(args or '', from_end)
+
+        # :has(), :lang() and anything unrecognised
+        return possible
+
+STATIC_MATCHER = SelectorMatcher()
+
+def selector_matches(selector, element):
+    """Whether a selector could match an html_tools.Element (see SelectorMatcher)"""
+    return STATIC_MATCHER.matches(selector, element)
+
+class ElementIndex:
+    """Elements of a page indexed by tag, class and id, for fast selector lookups
+
+    Only elements that carry the key (id, class or tag) of a selector's last
+    compound are tried against it, and results are memoised per selector.
+    """
+
+    def __init__(self, document, matcher=STATIC_MATCHER, elements=None):
+        self.matcher = matcher
+        self.elements = elements if elements is not None else [
+            element for element in document.iter() if not element.tag.startswith('#')]
+        self.by_tag = {}
+        self.by_class = {}
+        self.by_id = {}
+        for element in self.elements:
+            self.by_tag.setdefault(element.tag, []).append(element)
+            for name in element.classes:
+                self.by_class.setdefault(name, []).append(element)
+            if element.id:
+                self.by_id.setdefault(element.id, []).append(element)
+        self.results = {}
+
+    @property
+    def tags(self):
+        return set(self.by_tag)
+
+    @property
+    def classes(self):
+        return set(self.by_class)
+
+    @property
+    def ids(self):
+        return set(self.by_id)
+
+    def candidates(self, selector):
+        try:
+            compound = parse_selector(selector)[-1][1]
+        except (ValueError, IndexError):
+            return self.elements
+        for kind, name, _, _ in compound:
+            if kind == 'id':
+                return self.by_id.get(name, [])
+        for kind, name, _, _ in compound:
+            if kind == 'class' and name not in self.matcher.dynamic_classes:
+                return self.by_class.get(name, [])
+        for kind, name, _, _ in compound:
+            if kind == 'tag' and name != '*':
+                return self.by_tag.get(name, [])
+        return self.elements
+
+    def matches(self, selector):
+        """Whether the selector could match any indexed element"""
+        if selector not in self.results:
+            self.results[selector] = any(self.matcher.matches(selector, element)
+                                         for element in self.candidates(selector))
+        return self.results[selector]
+
+def select_rules(rules, keep_selector, prune_selectors=False, skip_print=False):
+    """The rules a page needs, given a predicate for the selectors it uses
+
+    Style rules are kept when any of their selectors is (with prune_selectors,
+    only those selectors are kept). @font-face and other at-rules are kept,
+    and @keyframes only when a kept rule animates with them. With skip_print,
+    rules inside @media print are left out.
+    """
+    selected = {}
+    animations = set()
+    for index, rule in enumerate(rules):
+        if skip_print and any(condition.lower().startswith('@media print') for condition in rule.conditions):
+            continue
+        if not rule.is_style:
+            if not rule.prelude.lower().startswith(('@keyframes', '@-webkit-keyframes')):
+                selected[index] = rule
+            continue
+        used = [selector for selector in rule.selectors if keep_selector(selector)]
+        if not used:
+            continue
+        if prune_selectors and len(used) < len(rule.selectors):
+            rule = CssRule(','.join(used), rule.body, rule.conditions, rule.line)
+        selected[index] = rule
+        for value in re.findall(r'animation(?:-name)?\s*:([^;]*)', rule.body or ''):
+            animations.update(re.split(r'[\s,]+', value.strip()))
+
+    # Keep the @keyframes that the selected rules animate with
+    for index, rule in enumerate(rules):
+        if rule.prelude.lower().startswith(('@keyframes', '@-webkit-keyframes')):
+            if rule.prelude.split()[-1] in animations:
+                selected[index] = rule
+    return [selected[index] for index in sorted(selected)]
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Asset Fingerprinting for Leading Powerful Conversations Website
+
+Assets referenced by stable names (css/main.css, js/common.js, images/...)
+cannot be cached for long without risking stale content after a deploy.
+This script:
+1. Content-hashes every file under css/, js/ and images/ of the built
+   dist/ tree and writes a fingerprinted copy next to it (e.g.
+   css/main.3f9a1c2b.css)
+2. Rewrites the references to them in every HTML page (href, src, srcset,
+   inline style url()s), in the stylesheets' url()s and @imports, and in
+   site.webmanifest
+3. Writes asset-manifest.json mapping each original path to its
+   fingerprinted copy, and a _headers file marking the copies immutable for
+   hosts that support it (Netlify, Cloudflare Pages)
+4. Deletes each original once nothing in the site mentions it any more
+
+A stylesheet's hash covers the fingerprinted names it references, so
+changing an image also changes the name of the CSS that uses it. An
+original is kept while something still names it outside a reference this
+script rewrites (og:image meta tags, the image sitemap). It only works on
+a build directory and refuses the sources in site/. Run it after
+bundle_css.py and before critical_css.py, so the inlined critical CSS
+already points at fingerprinted assets.
+"""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import argparse
+import posixpath
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from css_tools import rewrite_urls, is_external, strip_comments
+from html_tools import TagRewriter, build_starttag, parse_srcset
+
+# Configuration
+SITE_DIR = Path(__file__).resolve().parent / "site"
+DIST_DIR = Path(__file__).resolve().parent / "dist"
+ASSET_DIRS = ("css", "js", "images")
+MANIFEST_NAME = "asset-manifest.json"
+HEADERS_NAME = "_headers"
+WEB_MANIFEST_NAME = "site.webmanifest"
+HASH_LENGTH = 8
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Attributes of HTML tags that hold a single URL, or a srcset list
+URL_ATTRIBUTES = ('href', 'src', 'poster', 'data-src')
+SRCSET_ATTRIBUTES = ('srcset', 'data-srcset')
+
+# Outputs of this script and of the compression stage, which are not assets themselves
+FINGERPRINT_RE = re.compile(rf'\.[0-9a-f]{{{HASH_LENGTH}}}\.[^./]+$')
+DERIVED_SUFFIXES = ('.gz', '.br')
+# Files searched for leftover mentions of an original before it is deleted
+TEXT_SUFFIXES = ('.html', '.css', '.js', '.mjs', '.xml', '.json', '.webmanifest', '.txt')
+
+def load_manifest(site_dir):
+    path = Path(site_dir) / MANIFEST_NAME
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+class AssetFingerprinter:
+    """Assigns fingerprinted names to the assets of a site and rewrites references to them"""
+
+    def __init__(self, site_dir, previous_manifest=None):
+        self.site_dir = Path(site_dir).resolve()
+        previous_manifest = previous_manifest or {}
+        # Fingerprinted names from an earlier run still point at their original
+        self.aliases = {fingerprinted: original for original, fingerprinted in previous_manifest.items()}
+        self.assets = set()
+        for directory in ASSET_DIRS:
+            for path in sorted((self.site_dir / directory).rglob("*")):
+                relative = path.relative_to(self.site_dir).as_posix()
+                if (path.is_file() and relative not in self.aliases and not FINGERPRINT_RE.search(path.name)
+                        and not path.name.endswith(DERIVED_SUFFIXES)):
+                    self.assets.add(relative)
+        self.manifest = {}
+        # Originals an earlier run already replaced with their copy
+        for original, fingerprinted in previous_manifest.items():
+            if not (self.site_dir / original).exists() and (self.site_dir / fingerprinted).exists():
+                self.assets.add(original)
+                self.manifest[original] = fingerprinted
+        self.in_progress = set()
+
+    def resolve(self, url, base_dir):
+        """Site-relative path of the asset a URL refers to, or None"""
+        if not url or is_external(url) or url.startswith('#'):
+            return None
+        path = urlsplit(url).path
+        if not path:
+            return None
+        if path.startswith('/'):
+            relative = posixpath.normpath(path.lstrip('/'))
+        else:
+            base = Path(base_dir).resolve().relative_to(self.site_dir).as_posix()
+            relative = posixpath.normpath(posixpath.join(base, path))
+        relative = self.aliases.get(relative, relative)
+        return relative if relative in self.assets else None
+
+    def reference(self, url, base_dir):
+        """The URL rewritten to the fingerprinted asset, in the same (relative or root) form"""
+        relative = self.resolve(url, base_dir)
+        if relative is None:
+            return None
+        fingerprinted = self.fingerprint(relative)
+        parts = urlsplit(url)
+        if parts.path.startswith('/'):
+            new_path = '/' + fingerprinted
+        else:
+            base = Path(base_dir).resolve().relative_to(self.site_dir).as_posix()
+            new_path = posixpath.relpath(fingerprinted, base)
+        new_url = new_path + (f"?{parts.query}" if parts.query else '') + (f"#{parts.fragment}" if parts.fragment else '')
+        return None if new_url == url else new_url
+
+    def fingerprint(self, relative):
+        """Write the fingerprinted copy of an asset (once) and return its site-relative path"""
+        if relative in self.manifest:
+            return self.manifest[relative]
+        if relative in self.in_progress:
+            raise ValueError(f"reference cycle through {relative}")
+        self.in_progress.add(relative)
+
+        path = self.site_dir / relative
+        if path.suffix == '.css':
+            # References first, so the hash covers the names this stylesheet points at
+            css = rewrite_urls(path.read_text(encoding='utf-8'), lambda url: self.reference(url, path.parent))
+            content = css.encode('utf-8')
+        else:
+            content = path.read_bytes()
+
+        digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+        output = path.with_name(f"{path.stem}.{digest}{path.suffix}")
+        if not output.exists() or output.stat().st_size != len(content):
+            if path.suffix == '.css':
+                output.write_bytes(content)
+            else:
+                shutil.copyfile(path, output)
+
+        self.in_progress.discard(relative)
+        self.manifest[relative] = output.relative_to(self.site_dir).as_posix()
+        return self.manifest[relative]
+
+class AssetReferenceRewriter(TagRewriter):
+    """Points the URL attributes of a page's tags at fingerprinted assets"""
+
+    def __init__(self, content, fingerprinter, page_dir):
+        super().__init__(content)
+        self.fingerprinter = fingerprinter
+        self.page_dir = page_dir
+        self.references = 0
+
+    def rewrite_value(self, name, value):
+        if name in URL_ATTRIBUTES:
+            return self.fingerprinter.reference(value, self.page_dir)
+        if name in SRCSET_ATTRIBUTES:
+            candidates = [(self.fingerprinter.reference(url, self.page_dir) or url, descriptor)
+                          for url, descriptor in parse_srcset(value)]
+            rewritten = ', '.join(f"{url} {descriptor}".strip() for url, descriptor in candidates)
+            return rewritten if candidates != parse_srcset(value) else None
+        if name == 'style' and 'url(' in value:
+            rewritten = rewrite_urls(value, lambda url: self.fingerprinter.reference(url, self.page_dir))
+            return rewritten if rewritten != value else None
+        return None
+
+    def on_starttag(self, tag, attrs, raw, self_closing):
+        changed = False
+        rewritten = []
+        for name, value in attrs:
+            new_value = self.rewrite_value(name, value) if value else None
+            if new_value is not None:
+                changed = True
+                self.references += 1
+            rewritten.append((name, value if new_value is None else new_value))
+        return build_starttag(tag, rewritten, self_closing) if changed else None
+
+def rewrite_web_manifest(fingerprinter, site_dir):
+    """Point the icons of site.webmanifest at their fingerprinted copies"""
+    path = Path(site_dir) / WEB_MANIFEST_NAME
+    if not path.exists():
+        return 0
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    references = 0
+    for key in ('icons', 'screenshots'):
+        for entry in manifest.get(key, []):
+            new_url = fingerprinter.reference(entry.get('src', ''), path.parent)
+            if new_url:
+                entry['src'] = new_url
+                references += 1
+    if references:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+            f.write('\n')
+    return references
+
+def write_headers(site_dir, manifest):
+    """_headers rules giving every fingerprinted asset a year-long immutable lifetime"""
+    lines = ["# Generated by fingerprint_assets.py - fingerprinted assets never change"]
+    for fingerprinted in sorted(manifest.values()):
+        lines.append(f"/{fingerprinted}")
+        lines.append(f"  Cache-Control: {IMMUTABLE_CACHE_CONTROL}")
+    (Path(site_dir) / HEADERS_NAME).write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+def still_mentioned(site_dir, manifest):
+    """Originals whose file name still appears in a text file that stays in the site
+
+    Originals that are about to be deleted are not searched, except for the
+    ones found to be still needed, so main.css importing "base.css" does not
+    keep base.css alive.
+    """
+    site_dir = Path(site_dir)
+    names = {posixpath.basename(original) for original in manifest}
+    pattern = re.compile(r'(?<![\w.-])(' + '|'.join(re.escape(name) for name in sorted(names)) + r')(?![\w.-])')
+    mentions = {}
+    for path in sorted(site_dir.rglob("*")):
+        if path.is_file() and path.suffix.lower() in TEXT_SUFFIXES and path.name != MANIFEST_NAME:
+            text = unquote(path.read_text(encoding='utf-8', errors='replace'))
+            if path.suffix.lower() == '.css':
+                text = strip_comments(text)
+            mentions[path.relative_to(site_dir).as_posix()] = set(pattern.findall(text))
+
+    kept = set()
+    searched = [relative for relative in mentions if relative not in manifest]
+    while searched:
+        found = set().union(*(mentions[relative] for relative in searched))
+        newly_kept = {original for original in manifest
+                      if posixpath.basename(original) in found and original not in kept}
+        kept |= newly_kept
+        searched = [original for original in newly_kept if original in mentions]
+    return kept
+
+def remove_originals(site_dir, manifest):
+    """Delete the originals nothing refers to any more; returns (removed, kept)"""
+    if not manifest:
+        return [], []
+    kept = still_mentioned(site_dir, manifest)
+    removed = []
+    for original in sorted(manifest):
+        path = Path(site_dir) / original
+        if original not in kept and path.exists():
+            os.remove(path)
+            removed.append(original)
+    return removed, sorted(original for original in kept if (Path(site_dir) / original).exists())
+
+def fingerprint_assets(site_dir=DIST_DIR):
+    """Fingerprint the assets of a built site and rewrite references; returns True on success"""
+    site_dir = Path(site_dir).resolve()
+    if site_dir == SITE_DIR:
+        print(f"❌ Refusing to fingerprint the sources in {SITE_DIR} - run it on a build directory")
+        return False
+    if not site_dir.is_dir():
+        print(f"❌ {site_dir} does not exist - run build.py first")
+        return False
+    print("🔖 Fingerprinting assets...")
+
+    previous = load_manifest(site_dir)
+    fingerprinter = AssetFingerprinter(site_dir, previous)
+    try:
+        for relative in sorted(fingerprinter.assets):
+            fingerprinter.fingerprint(relative)
+    except (OSError, ValueError) as error:
+        print(f"❌ {error}")
+        return False
+    print(f"  📦 {len(fingerprinter.manifest)} asset(s) fingerprinted")
+
+    print("\n🔄 Rewriting references...")
+    for html_file in sorted(site_dir.rglob("*.html")):
+        content = html_file.read_text(encoding='utf-8')
+        rewriter = AssetReferenceRewriter(content, fingerprinter, html_file.parent)
+        updated = rewriter.rewrite()
+        if updated != content:
+            html_file.write_text(updated, encoding='utf-8')
+            print(f"  ✅ {html_file.relative_to(site_dir)}: {rewriter.references} reference(s)")
+    references = rewrite_web_manifest(fingerprinter, site_dir)
+    if references:
+        print(f"  ✅ {WEB_MANIFEST_NAME}: {references} reference(s)")
+
+    # Copies from earlier runs whose content has since changed
+    for original, fingerprinted in previous.items():
+        if fingerprinter.manifest.get(original) != fingerprinted:
+            stale = site_dir / fingerprinted
+            if stale.exists():
+                os.remove(stale)
+                print(f"  🗑️  Removed stale {fingerprinted}")
+
+    with open(site_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(fingerprinter.manifest.items())), f, indent=2)
+        f.write('\n')
+    write_headers(site_dir, fingerprinter.manifest)
+    print(f"\n📝 Wrote {MANIFEST_NAME} and {HEADERS_NAME}")
+
+    removed, kept = remove_originals(site_dir, fingerprinter.manifest)
+    print(f"\n🗑️  Removed {len(removed)} original(s) replaced by their fingerprinted copy")
+    for original in kept:
+        print(f"  📌 Kept {original} (still named outside a rewritable reference)")
+
+    print("\n✅ Asset fingerprinting complete!")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fingerprint CSS, JS and image assets and rewrite references to them")
+    parser.add_argument("--site-dir", type=Path, default=DIST_DIR,
+                        help="built site directory to process (default: dist/; site/ is refused)")
+    args = parser.parse_args()
+
+    if not fingerprint_assets(args.site_dir):
+        exit(1)
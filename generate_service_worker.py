@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Service Worker Generator for Leading Powerful Conversations Website
+
+Without a service worker every repeat visit revalidates each stylesheet,
+script and image over the network, and nothing works offline. This script:
+1. Collects the precache list: the pages, the stylesheets they link with the
+   @import tree below them, their scripts, icons and web manifest, and the
+   WebP/AVIF responsive variants in their <picture> sources
+2. Hashes every entry; the cache version is a hash of all of them, so the
+   service worker changes exactly when a precached file does
+3. Writes sw.js at the site root, which:
+   - precaches the list on install, copying entries whose hash has not
+     changed from the previous version's cache instead of downloading them
+   - deletes the previous version's caches when it activates
+   - serves pages stale-while-revalidate, precached assets from the cache
+     and other same-origin images (e.g. the PNG/JPEG fallbacks) from a
+     runtime cache it refreshes in the background and caps at
+     RUNTIME_MAX_ENTRIES; downloads such as the PDFs and Range requests go
+     straight to the network
+
+common.js registers sw.js. Run it on the built site (dist/ by default; the
+sources in site/ are refused) after fingerprint_assets.py and
+critical_css.py, so the list has the final names and page contents.
+"""
+
+import re
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit, unquote
+
+from css_tools import resolve_imports, rewrite_urls, is_external
+from html_tools import parse_document, parse_srcset
+from js_tools import minify_js
+
+# Configuration
+SITE_DIR = Path(__file__).resolve().parent / "site"
+DIST_DIR = Path(__file__).resolve().parent / "dist"
+SERVICE_WORKER_NAME = "sw.js"
+HEADERS_NAME = "_headers"
+# Pages that are not part of the site visitors browse
+EXCLUDED_PAGES = ("google-verification-placeholder.html",)
+# <picture> source types whose srcset variants are precached
+PRECACHED_IMAGE_TYPES = ("image/webp", "image/avif")
+CACHE_PREFIX = "lpc-"
+# Pages and images kept in the runtime cache; the oldest are evicted first
+RUNTIME_MAX_ENTRIES = 60
+HASH_LENGTH = 8
+
+SERVICE_WORKER_TEMPLATE = """\
+// Generated by generate_service_worker.py - do not edit
+const CACHE_PREFIX = "__CACHE_PREFIX__";
+const VERSION = "__VERSION__";
+const PRECACHE = `${CACHE_PREFIX}precache-${VERSION}`;
+const RUNTIME = `${CACHE_PREFIX}runtime-${VERSION}`;
+const RUNTIME_MAX_ENTRIES = __RUNTIME_MAX_ENTRIES__;
+const PRECACHE_ENTRIES = __ENTRIES__;
+
+// Each entry is cached under its URL plus its revision, so an unchanged file
+// can be copied from the previous version's cache instead of downloaded again
+const precacheKeys = new Map();
+for (const [url, revision] of PRECACHE_ENTRIES) {
+  const absolute = new URL(url, self.registration.scope);
+  const key = new URL(absolute);
+  key.searchParams.set("__rev", revision);
+  precacheKeys.set(absolute.href, key.href);
+}
+const scopeURL = new URL(self.registration.scope);
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches.open(PRECACHE).then((cache) =>
+      Promise.all(
+        Array.from(precacheKeys.values(), (key) =>
+          caches.match(key).then((cached) => (cached ? cache.put(key, cached) : cache.add(new Request(key, { cache: "reload" }))))
+        )
+      )
+    )
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches
+      .keys()
+      .then((names) => Promise.all(names.filter((name) => name.startsWith(CACHE_PREFIX) && name !== PRECACHE && name !== RUNTIME).map((name) => caches.delete(name))))
+      .then(() => self.clients.claim())
+  );
+});
+
+// The precache key for a request URL; "/" and "/about" also find "/index.html" and "/about.html"
+function precacheKey(url) {
+  const address = new URL(url);
+  address.hash = "";
+  address.search = "";
+  const candidates = [address.href];
+  if (address.pathname.endsWith("/")) {
+    candidates.push(address.href + "index.html");
+  } else if (!address.pathname.split("/").pop().includes(".")) {
+    candidates.push(address.href + ".html");
+  }
+  return candidates.map((candidate) => precacheKeys.get(candidate)).find(Boolean);
+}
+
+// Drop the oldest runtime entries (keys are in insertion order) beyond the cap
+async function trimRuntime(runtime) {
+  const keys = await runtime.keys();
+  await Promise.all(keys.slice(0, Math.max(0, keys.length - RUNTIME_MAX_ENTRIES)).map((key) => runtime.delete(key)));
+}
+
+// Answer from the cache at once and refresh the runtime copy from the network
+async function staleWhileRevalidate(event, key) {
+  const runtime = await caches.open(RUNTIME);
+  const cached = (await runtime.match(event.request)) || (key && (await caches.match(key, { cacheName: PRECACHE })));
+  const network = fetch(event.request).then((response) => {
+    // Only complete responses: Cache.put rejects a 206 partial response
+    if (response.status === 200 && response.type === "basic") {
+      return runtime
+        .put(event.request, response.clone())
+        .then(() => trimRuntime(runtime))
+        .then(() => response);
+    }
+    return response;
+  });
+  if (cached) {
+    event.waitUntil(network.catch(() => undefined));
+    return cached;
+  }
+  return network;
+}
+
+async function cacheFirst(event, key) {
+  const cached = await caches.match(key, { cacheName: PRECACHE });
+  return cached || fetch(event.request);
+}
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  // Range requests (media, PDF viewers) go straight to the network
+  if (request.method !== "GET" || request.headers.has("Range") || url.origin !== scopeURL.origin || !url.pathname.startsWith(scopeURL.pathname)) {
+    return;
+  }
+  const key = precacheKey(request.url);
+  const isPage = request.mode === "navigate" || (request.headers.get("Accept") || "").includes("text/html");
+  if (isPage) {
+    event.respondWith(staleWhileRevalidate(event, key));
+  } else if (key) {
+    event.respondWith(cacheFirst(event, key));
+  } else if (request.destination === "image") {
+    event.respondWith(staleWhileRevalidate(event, null));
+  }
+});
+"""
+
+def file_hash(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:HASH_LENGTH]
+
+class PrecacheCollector:
+    """Collects the site-relative paths of the files the pages need"""
+
+    def __init__(self, site_dir):
+        self.site_dir = Path(site_dir).resolve()
+        self.paths = {}
+        self.missing = []
+
+    def add(self, url, base):
+        """Add a reference made from base (a site-relative URL); returns the file or None"""
+        if not url or is_external(url) or url.startswith(('#', 'mailto:', 'tel:', 'javascript:')):
+            return None
+        path = unquote(urlsplit(urljoin(base, url)).path).lstrip('/')
+        target = (self.site_dir / path).resolve()
+        if self.site_dir not in target.parents or not target.is_file():
+            self.missing.append(f"{url} (from {base.lstrip('/')})")
+            return None
+        self.paths.setdefault(target.relative_to(self.site_dir).as_posix(), target)
+        return target
+
+    def add_stylesheet(self, href, base):
+        """A stylesheet, the modules it @imports and the files they reference"""
+        target = self.add(href, base)
+        if target is None:
+            return
+        for module in resolve_imports(target):
+            if module.path is None:
+                continue
+            relative = module.path.relative_to(self.site_dir).as_posix()
+            self.paths.setdefault(relative, module.path)
+
+            def collect(url, base='/' + relative):
+                # @imports are already covered by resolve_imports
+                if not url.lower().endswith('.css') and not url.startswith('data:'):
+                    self.add(url, base)
+
+            rewrite_urls(module.css, collect)
+
+    def add_web_manifest(self, href, base):
+        """The web manifest and its icons"""
+        target = self.add(href, base)
+        if target is None:
+            return
+        manifest_url = '/' + target.relative_to(self.site_dir).as_posix()
+        manifest = json.loads(target.read_text(encoding='utf-8'))
+        for icon in manifest.get('icons', []):
+            self.add(icon.get('src'), manifest_url)
+
+    def add_page(self, page):
+        page_url = '/' + page
+        self.add(page, '/')
+        document = parse_document((self.site_dir / page).read_text(encoding='utf-8'))
+        for element in document.iter():
+            if element.inside('template'):
+                continue
+            attrs = element.attrs
+            if element.tag == 'link':
+                rel = attrs.get('rel', '').lower().split()
+                if 'stylesheet' in rel or ('preload' in rel and attrs.get('as') == 'style'):
+                    self.add_stylesheet(attrs.get('href'), page_url)
+                elif 'manifest' in rel:
+                    self.add_web_manifest(attrs.get('href'), page_url)
+                elif 'icon' in rel or 'apple-touch-icon' in rel:
+                    self.add(attrs.get('href'), page_url)
+            elif element.tag == 'script':
+                self.add(attrs.get('src'), page_url)
+            elif element.tag == 'source' and element.inside('picture'):
+                if attrs.get('type', '').lower() in PRECACHED_IMAGE_TYPES:
+                    for url, _ in parse_srcset(attrs.get('srcset', '')):
+                        self.add(url, page_url)
+
+def collect_pages(site_dir):
+    """The pages to precache, relative to the site"""
+    return [path.relative_to(site_dir).as_posix() for path in sorted(Path(site_dir).glob("*.html"))
+            if path.name not in EXCLUDED_PAGES]
+
+def render_service_worker(entries, version):
+    lines = ',\n'.join(f"  {json.dumps([url, revision])}" for url, revision in entries)
+    return (SERVICE_WORKER_TEMPLATE
+            .replace('__CACHE_PREFIX__', CACHE_PREFIX)
+            .replace('__VERSION__', version)
+            .replace('__RUNTIME_MAX_ENTRIES__', str(RUNTIME_MAX_ENTRIES))
+            .replace('__ENTRIES__', f"[\n{lines}\n]"))
+
+def add_header_rule(site_dir):
+    """Make hosts that read _headers revalidate sw.js on every load"""
+    path = Path(site_dir) / HEADERS_NAME
+    if not path.exists():
+        return
+    content = path.read_text(encoding='utf-8')
+    if not re.search(rf'^/{re.escape(SERVICE_WORKER_NAME)}$', content, re.M):
+        path.write_text(content.rstrip('\n') + f"\n/{SERVICE_WORKER_NAME}\n  Cache-Control: no-cache\n",
+                        encoding='utf-8')
+
+def generate_service_worker(site_dir=DIST_DIR, minify=False):
+    """Write sw.js with the precache list of a built site; returns True on success"""
+    site_dir = Path(site_dir).resolve()
+    if site_dir == SITE_DIR:
+        print(f"❌ Refusing to write {SERVICE_WORKER_NAME} into the sources in {SITE_DIR} - run it on a build directory")
+        return False
+    if not site_dir.is_dir():
+        print(f"❌ {site_dir} does not exist - run build.py first")
+        return False
+    print("📴 Generating service worker...")
+
+    collector = PrecacheCollector(site_dir)
+    try:
+        for page in collect_pages(site_dir):
+            collector.add_page(page)
+    except (OSError, ValueError) as error:
+        print(f"❌ {error}")
+        return False
+    for reference in collector.missing:
+        print(f"  ⚠️  Not found, not precached: {reference}")
+
+    entries = [(relative, file_hash(path)) for relative, path in sorted(collector.paths.items())]
+    version = hashlib.sha256(json.dumps(entries).encode('utf-8')).hexdigest()[:HASH_LENGTH]
+    script = render_service_worker(entries, version)
+    if minify:
+        script = minify_js(script)
+    (site_dir / SERVICE_WORKER_NAME).write_text(script, encoding='utf-8')
+    add_header_rule(site_dir)
+
+    total = sum(path.stat().st_size for path in collector.paths.values())
+    kinds = {}
+    for relative in collector.paths:
+        kind = Path(relative).suffix.lstrip('.') or 'other'
+        kinds[kind] = kinds.get(kind, 0) + 1
+    print(f"  📦 {len(entries)} file(s) precached, {total / 1024:.1f} KB: "
+          + ', '.join(f"{count} {kind}" for kind, count in sorted(kinds.items())))
+    print(f"  🔖 Cache version {version}")
+    print(f"\n✅ Wrote {SERVICE_WORKER_NAME}")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a service worker that precaches the site's pages and assets")
+    parser.add_argument("--site-dir", type=Path, default=DIST_DIR,
+                        help="built site directory to process (default: dist/; site/ is refused)")
+    parser.add_argument("--minify", action="store_true",
+                        help="minify the generated service worker")
+    args = parser.parse_args()
+
+    if not generate_service_worker(args.site_dir, minify=args.minify):
+        exit(1)
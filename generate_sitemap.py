@@ -2,21 +2,48 @@
 """
 Dynamic Sitemap Generator for Leading Powerful Conversations Website
 
-This script generates a sitemap.xml file based on the HTML files found in the site directory.
-It automatically sets priorities and last modified dates based on file statistics and page types.
+This script generates a sitemap.xml file based on the pages and documents found in the site directory.
+It automatically sets priorities based on page types and last modified dates based on when
+each page's content last changed.
 """
 
 import os
+import re
+import gzip
+import json
+import filecmp
+import hashlib
+import argparse
 import datetime
+import tempfile
+import subprocess
+from functools import lru_cache
+from html.parser import HTMLParser
 from pathlib import Path
+from urllib.parse import quote, urljoin
+
+from build_profile import span, run_profiled, file_bytes
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from xml.sax.saxutils import escape
 
 # Configuration
 SITE_DIR = "site"
 # Base URL - will be set by environment variable in GitHub Actions, empty for local dev
 BASE_URL = os.environ.get('GITHUB_PAGES_URL', '')  
 SITEMAP_PATH = os.path.join(SITE_DIR, "sitemap.xml")
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+# Image sitemap (referenced from robots.txt)
+IMAGE_SITEMAP_NAME = "image-sitemap"
+IMAGE_NS = 'http://www.google.com/schemas/sitemap-image/1.1'
+# Content hashes and last-modified dates from previous runs
+STATE_PATH = ".sitemap-state.json"
+
+# Sitemap protocol limits per file (uncompressed size)
+MAX_URLS_PER_SITEMAP = 50000
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+# File types that are listed in the sitemap
+INDEXABLE_EXTENSIONS = ('.html', '.pdf', '.pptx')
 
 # Priority mapping for different page types
 PAGE_PRIORITIES = {
@@ -36,15 +63,198 @@ CHANGE_FREQUENCIES = {
     '404.html': 'yearly',
 }
 
-def get_file_last_modified(file_path):
-    """Get the last modified date of a file in ISO format."""
-    timestamp = os.path.getmtime(file_path)
-    return datetime.datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+def get_file_hash(file_path):
+    """Get the SHA-256 hash of a file's content."""
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def run_git(*args):
+    """Run a git command and return its output, or None if it failed."""
+    result = run_profiled(['git', *args], category='git', capture_output=True, text=True)
+    return result.stdout if result.returncode == 0 else None
+
+@lru_cache(maxsize=1)
+def get_git_history():
+    """Last commit date and uncommitted status of every file under the site directory.
+
+    Two git commands cover the whole site: one `git log --name-only` for the
+    dates and one `git status --porcelain` for the dirty files. Returns
+    (dates by absolute path, set of absolute paths with uncommitted changes),
+    or None outside a git checkout or in a shallow clone (where every file
+    would appear to date from the latest commit). Nothing is run until a
+    page actually needs a date.
+    """
+    try:
+        shallow = run_git('rev-parse', '--is-shallow-repository')
+        if shallow is None or shallow.strip() != 'false':
+            return None
+        top = run_git('rev-parse', '--show-toplevel').strip()
+        log = run_git('-c', 'core.quotepath=off', 'log', '--format=%x00%cs', '--name-only', '--', SITE_DIR)
+        status = run_git('status', '--porcelain', '-z', '--untracked-files=all', '--', SITE_DIR)
+    except (OSError, AttributeError):
+        return None
+    if log is None or status is None:
+        return None
+    
+    dates = {}
+    for commit in log.split('\0')[1:]:
+        date, *names = commit.strip('\n').split('\n')
+        for name in names:
+            # Commits are listed newest first, so the first date seen is the latest
+            if name:
+                dates.setdefault(os.path.normpath(os.path.join(top, name)), date)
+    
+    dirty = set()
+    entries = iter(status.split('\0'))
+    for entry in entries:
+        if not entry:
+            continue
+        dirty.add(os.path.normpath(os.path.join(top, entry[3:])))
+        if entry[0] in 'RC':
+            # Renames and copies are followed by the original path
+            next(entries, None)
+    return dates, dirty
+
+def get_git_last_modified(file_path):
+    """Get the date of the last commit that touched a file, if git can tell.
+
+    Returns None outside a git checkout, in a shallow clone or when the file
+    has uncommitted changes.
+    """
+    history = get_git_history()
+    if history is None:
+        return None
+    dates, dirty = history
+    path = os.path.abspath(file_path)
+    if path in dirty:
+        return None
+    return dates.get(path)
+
+def load_state():
+    """Load the content hashes and dates recorded by the previous run."""
+    try:
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state):
+    """Save content hashes and dates, only rewriting the file if they changed."""
+    content = json.dumps(state, indent=2, sort_keys=True) + '\n'
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return
+    with open(STATE_PATH, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+class PageParser(HTMLParser):
+    """Collects the image references and robots directives of an HTML page."""
+
+    def __init__(self):
+        super().__init__()
+        self.images = []
+        self.noindex = False
+
+    def _add_image(self, url):
+        url = (url or '').strip()
+        if url and not url.startswith('data:') and url not in self.images:
+            self.images.append(url)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'img':
+            self._add_image(attrs.get('src'))
+        if tag in ('img', 'source') and attrs.get('srcset'):
+            # Each candidate is "url [descriptor]", separated by commas
+            for candidate in attrs['srcset'].split(','):
+                if candidate.strip():
+                    self._add_image(candidate.split()[0])
+        if tag == 'meta' and (attrs.get('name') or '').lower() == 'robots':
+            self.noindex = 'noindex' in (attrs.get('content') or '').lower()
+
+class ParsedPage:
+    """A site file read once: its content hash and, for HTML, what it references."""
+
+    def __init__(self, content_hash, images=(), noindex=False):
+        self.content_hash = content_hash
+        self.images = list(images)
+        self.noindex = noindex
+
+@lru_cache(maxsize=1024)
+def parse_page(rel_path):
+    """Read and parse a site file once, shared by the page and image sitemap passes.
+
+    The cache is bounded: both passes ask for a page while walking the same
+    file, so older entries are never needed again.
+    """
+    with open(os.path.join(SITE_DIR, rel_path), 'rb') as f:
+        data = f.read()
+    content_hash = hashlib.sha256(data).hexdigest()
+    
+    if not rel_path.endswith('.html'):
+        return ParsedPage(content_hash)
+    
+    parser = PageParser()
+    parser.feed(data.decode('utf-8', errors='replace'))
+    parser.close()
+    return ParsedPage(content_hash, parser.images, parser.noindex)
+
+def get_image_url(page_rel_path, src):
+    """Resolve an image reference on a page to the URL crawlers should fetch."""
+    if re.match(r'^[a-z][a-z0-9+.-]*:|^//', src, re.IGNORECASE):
+        return src
+    page_url = 'https://site.invalid/' + quote(page_rel_path)
+    path = urljoin(page_url, src).split('https://site.invalid', 1)[1]
+    return BASE_URL + path
+
+def get_file_last_modified(file_path, state, content_hash=None):
+    """Get the date a file's content last changed in ISO format.
+
+    File modification times are reset by every fresh checkout, so the date is
+    tied to the content instead: while a file's hash matches the one recorded
+    in the state file, the recorded date is kept. Otherwise the date of the
+    last commit touching the file is used, falling back to today.
+    """
+    key = Path(file_path).as_posix()
+    content_hash = content_hash or get_file_hash(file_path)
+    entry = state.get(key)
+    
+    if entry and entry.get('sha256') == content_hash:
+        return entry['lastmod']
+    
+    lastmod = get_git_last_modified(file_path) or datetime.date.today().isoformat()
+    state[key] = {'sha256': content_hash, 'lastmod': lastmod}
+    return lastmod
+
+def write_if_changed(path, content):
+    """Write a file only if its content differs, so unchanged files keep their timestamps."""
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+def write_gzip_copy(path):
+    """Write a gzip-compressed copy of a file next to it; returns the copy's path."""
+    with open(path, 'rb') as f:
+        # A fixed timestamp keeps the output identical when nothing changed
+        data = gzip.compress(f.read(), mtime=0)
+    gz_path = path + '.gz'
+    if os.path.exists(gz_path):
+        with open(gz_path, 'rb') as f:
+            if f.read() == data:
+                return gz_path
+    with open(gz_path, 'wb') as f:
+        f.write(data)
+    return gz_path
 
 def should_include_file(filename):
     """Determine if a file should be included in the sitemap."""
-    # Include HTML files but exclude certain patterns
-    if not filename.endswith('.html'):
+    # Include pages and downloadable documents but exclude certain patterns
+    if not filename.endswith(INDEXABLE_EXTENSIONS):
         return False
     
     # Exclude files that shouldn't be indexed
@@ -54,14 +264,179 @@ def should_include_file(filename):
     
     return True
 
+def iter_site_files():
+    """Yield the relative paths of every indexable file under the site directory.
+
+    The tree is walked recursively in sorted order so the output is stable,
+    without ever holding the full file list in memory. Hidden directories are
+    skipped.
+    """
+    for root, dirs, files in os.walk(SITE_DIR):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for filename in sorted(files):
+            if should_include_file(filename):
+                yield Path(os.path.relpath(os.path.join(root, filename), SITE_DIR)).as_posix()
+
 def get_url_path(filename):
-    """Convert filename to URL path."""
+    """Convert a path relative to the site directory to a URL path."""
     if filename == 'index.html':
         return '/'
-    return f'/{filename}'
+    if filename.endswith('/index.html'):
+        filename = filename[:-len('index.html')]
+    return '/' + quote(filename)
+
+class SitemapWriter:
+    """Streams <url> entries to disk, starting a new file at the protocol limits.
+
+    Entries are written to temporary part files as they arrive, so memory use
+    does not grow with the number of URLs. The part files live next to the
+    site directory rather than in it, so an interrupted run never leaves them
+    in the published tree. Each part holds at most MAX_URLS_PER_SITEMAP
+    entries and MAX_SITEMAP_BYTES of uncompressed XML. `name` is the base
+    file name and `namespaces` any extra xmlns declarations (such as the
+    image extension).
+    """
 
-def generate_sitemap():
-    """Generate the sitemap.xml file."""
+    FOOTER = '</urlset>\n'
+
+    def __init__(self, compress=False, name='sitemap', namespaces=''):
+        self.compress = compress
+        self.name = name
+        self.header = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                       f'<urlset xmlns="{SITEMAP_NS}"{namespaces}>\n')
+        self.parts = []  # (temporary path, latest lastmod) for each finished part
+        self.file = None
+        self.url_count = 0
+        self.total_urls = 0
+        self.byte_count = 0
+        self.lastmod = ''
+
+    def _open_part(self):
+        # Same filesystem as the site, so the finished part can be moved into place
+        parent = os.path.dirname(os.path.abspath(SITE_DIR))
+        fd, path = tempfile.mkstemp(prefix=f".{self.name}-part-{len(self.parts) + 1}-", suffix='.tmp', dir=parent)
+        self.file = os.fdopen(fd, 'wb')
+        self.path = path
+        self.url_count = 0
+        self.byte_count = 0
+        self.lastmod = ''
+        self._write(self.header)
+
+    def _write(self, text):
+        data = text.encode('utf-8')
+        self.file.write(data)
+        self.byte_count += len(data)
+
+    def _close_part(self):
+        self._write(self.FOOTER)
+        self.file.close()
+        self.parts.append((self.path, self.lastmod))
+        self.file = None
+
+    def add(self, loc, lastmod, changefreq, priority):
+        """Write one <url> entry for a page."""
+        self.add_entry(f'  <url>\n'
+                       f'    <loc>{escape(loc)}</loc>\n'
+                       f'    <lastmod>{lastmod}</lastmod>\n'
+                       f'    <changefreq>{changefreq}</changefreq>\n'
+                       f'    <priority>{priority}</priority>\n'
+                       f'  </url>\n', lastmod)
+
+    def add_entry(self, entry, lastmod):
+        """Write a complete <url> element, rolling over to a new part when it would not fit."""
+        entry_bytes = len(entry.encode('utf-8'))
+        
+        if self.file is not None and (
+                self.url_count >= MAX_URLS_PER_SITEMAP
+                or self.byte_count + entry_bytes + len(self.FOOTER) > MAX_SITEMAP_BYTES):
+            self._close_part()
+        if self.file is None:
+            self._open_part()
+        
+        self._write(entry)
+        self.url_count += 1
+        self.total_urls += 1
+        self.lastmod = max(self.lastmod, lastmod)
+
+    def abort(self):
+        """Delete the part files of a run that did not finish."""
+        if self.file is not None:
+            self.file.close()
+            self.parts.append((self.path, self.lastmod))
+            self.file = None
+        for part_path, _ in self.parts:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+    def finish(self):
+        """Move the parts into place and return the path of the sitemap to submit.
+
+        A single part becomes sitemap.xml; several become sitemap-1.xml,
+        sitemap-2.xml, ... listed by sitemap-index.xml (using the writer's
+        name in place of "sitemap"). When compressing, each part also gets
+        a .xml.gz copy, which the index lists instead; the plain files are
+        kept so robots.txt can point at sitemap.xml either way. Outputs whose
+        content is unchanged are left untouched, and outputs from earlier
+        runs that are no longer produced are removed.
+        """
+        if self.file is None:
+            self._open_part()
+        self._close_part()
+        
+        suffix = '.xml.gz' if self.compress else '.xml'
+        produced = []
+        
+        def place(part_path, name):
+            final_path = os.path.join(SITE_DIR, name)
+            self._replace_if_changed(part_path, final_path)
+            produced.append(final_path)
+            if self.compress:
+                produced.append(write_gzip_copy(final_path))
+        
+        if len(self.parts) == 1:
+            place(self.parts[0][0], self.name + '.xml')
+            entry_point = produced[0]
+        else:
+            index_lines = [
+                '<?xml version="1.0" encoding="UTF-8"?>',
+                '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+            ]
+            for number, (part_path, lastmod) in enumerate(self.parts, start=1):
+                place(part_path, f"{self.name}-{number}.xml")
+                name = f"{self.name}-{number}{suffix}"
+                index_lines.extend([
+                    '  <sitemap>',
+                    f'    <loc>{escape(BASE_URL + "/" + name)}</loc>',
+                    f'    <lastmod>{lastmod}</lastmod>',
+                    '  </sitemap>',
+                ])
+            index_lines.append('</sitemapindex>')
+            
+            entry_point = os.path.join(SITE_DIR, f"{self.name}-index.xml")
+            write_if_changed(entry_point, '\n'.join(index_lines) + '\n')
+            produced.append(entry_point)
+        
+        # Remove sitemaps left over from runs with more parts or another format
+        for name in os.listdir(SITE_DIR):
+            path = os.path.join(SITE_DIR, name)
+            if re.fullmatch(re.escape(self.name) + r'(-\d+|-index)?\.xml(\.gz)?', name) and path not in produced:
+                os.remove(path)
+        
+        return entry_point
+
+    @staticmethod
+    def _replace_if_changed(temp_path, final_path):
+        if os.path.exists(final_path) and filecmp.cmp(temp_path, final_path, shallow=False):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, final_path)
+
+def generate_sitemap(compress=False):
+    """Generate the page and image sitemaps, splitting them and adding an index for large sites.
+
+    Returns the paths of the page and image sitemaps (or sitemap indexes) to
+    submit to crawlers.
+    """
     print("Generating sitemap.xml...")
     
     if BASE_URL:
@@ -69,84 +444,111 @@ def generate_sitemap():
     else:
         print("Using relative URLs (no base URL set)")
     
-    # Create the root element
-    urlset = ET.Element('urlset')
-    urlset.set('xmlns', 'http://www.sitemaps.org/schemas/sitemap/0.9')
-    
-    # Get all HTML files in the site directory
-    site_path = Path(SITE_DIR)
-    html_files = []
-    
-    for file_path in site_path.glob('*.html'):
-        if should_include_file(file_path.name):
-            html_files.append(file_path)
+    state = load_state()
+    writer = SitemapWriter(compress)
+    image_writer = SitemapWriter(compress, IMAGE_SITEMAP_NAME, f' xmlns:image="{IMAGE_NS}"')
+    image_count = 0
     
-    # Sort files for consistent output
-    html_files.sort(key=lambda x: x.name)
-    
-    # Add each page to the sitemap
-    for file_path in html_files:
-        filename = file_path.name
-        
-        # Create URL element
-        url_elem = ET.SubElement(urlset, 'url')
-        
-        # Add location
-        loc = ET.SubElement(url_elem, 'loc')
-        loc.text = BASE_URL + get_url_path(filename)
-        
-        # Add last modified date
-        lastmod = ET.SubElement(url_elem, 'lastmod')
-        lastmod.text = get_file_last_modified(file_path)
-        
-        # Add change frequency
-        changefreq = ET.SubElement(url_elem, 'changefreq')
-        changefreq.text = CHANGE_FREQUENCIES.get(filename, 'monthly')
-        
-        # Add priority
-        priority = ET.SubElement(url_elem, 'priority')
-        priority.text = PAGE_PRIORITIES.get(filename, '0.5')
-        
-        print(f"  Added: {get_url_path(filename)} (priority: {PAGE_PRIORITIES.get(filename, '0.5')})")
-    
-    # Create the XML tree
-    tree = ET.ElementTree(urlset)
+    # Add each page to both sitemaps as the site tree is walked; each file
+    # is read and parsed once and the result shared by the two passes
+    try:
+        with span("sitemap: walk pages", 'sitemap') as fields:
+            for rel_path in iter_site_files():
+                page = parse_page(rel_path)
+                if page.noindex:
+                    print(f"  Skipped: {get_url_path(rel_path)} (noindex)")
+                    continue
+                
+                file_path = os.path.join(SITE_DIR, rel_path)
+                priority = PAGE_PRIORITIES.get(rel_path, '0.5')
+                lastmod = get_file_last_modified(file_path, state, page.content_hash)
+                loc = BASE_URL + get_url_path(rel_path)
+                
+                writer.add(loc, lastmod, CHANGE_FREQUENCIES.get(rel_path, 'monthly'), priority)
+                
+                print(f"  Added: {get_url_path(rel_path)} (priority: {priority})")
+                
+                add_page_images(image_writer, rel_path, loc, lastmod)
+                image_count += len(page.images)
+                fields['bytes_in'] = fields.get('bytes_in', 0) + file_bytes([file_path])
+    except BaseException:
+        # Do not leave part files behind when a page fails or the run is interrupted
+        writer.abort()
+        image_writer.abort()
+        raise
     
-    # Pretty format the XML
-    rough_string = ET.tostring(urlset, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    pretty_xml = reparsed.toprettyxml(indent='  ')
+    save_state(state)
     
-    # Remove empty lines and fix formatting
-    lines = [line for line in pretty_xml.split('\n') if line.strip()]
-    pretty_xml = '\n'.join(lines)
+    with span("sitemap: write sitemap", 'sitemap') as fields:
+        entry_point = writer.finish()
+        fields['bytes_out'] = file_bytes([entry_point])
+    if len(writer.parts) > 1:
+        print(f"Split into {len(writer.parts)} sitemaps listed in {entry_point}")
+        print("Remember to point robots.txt at the sitemap index.")
+    print(f"Sitemap generated: {entry_point}")
+    print(f"Total URLs: {writer.total_urls}")
     
-    # Write to file
-    with open(SITEMAP_PATH, 'w', encoding='utf-8') as f:
-        f.write(pretty_xml)
+    with span("sitemap: write image sitemap", 'sitemap') as fields:
+        image_entry_point = image_writer.finish()
+        fields['bytes_out'] = file_bytes([image_entry_point])
+    print(f"Image sitemap generated: {image_entry_point}")
+    print(f"Total images: {image_count} on {image_writer.total_urls} pages")
+    return entry_point, image_entry_point
+
+def add_page_images(image_writer, rel_path, loc, lastmod):
+    """Write a page's <image:image> entries to the image sitemap, if it has any."""
+    page = parse_page(rel_path)
+    if not page.images:
+        return
     
-    print(f"Sitemap generated successfully: {SITEMAP_PATH}")
-    print(f"Total URLs: {len(html_files)}")
+    images = ''.join(
+        f'    <image:image>\n'
+        f'      <image:loc>{escape(get_image_url(rel_path, src))}</image:loc>\n'
+        f'    </image:image>\n'
+        for src in page.images
+    )
+    image_writer.add_entry(f'  <url>\n    <loc>{escape(loc)}</loc>\n{images}  </url>\n', lastmod)
 
-def validate_sitemap():
-    """Basic validation of the generated sitemap."""
+def open_sitemap(path):
+    """Open a sitemap for reading, transparently decompressing .gz files."""
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+def validate_sitemap(path=SITEMAP_PATH):
+    """Basic streaming validation of a generated sitemap or sitemap index."""
     try:
-        tree = ET.parse(SITEMAP_PATH)
-        root = tree.getroot()
-        
-        if root.tag != '{http://www.sitemaps.org/schemas/sitemap/0.9}urlset':
-            print("Warning: Invalid root element in sitemap")
-            return False
+        with open_sitemap(path) as f:
+            events = ET.iterparse(f, events=('start',))
+            _, root = next(events)
+            
+            if root.tag == f'{{{SITEMAP_NS}}}sitemapindex':
+                parts = [os.path.join(SITE_DIR, os.path.basename(elem.text or ''))
+                         for _, elem in events if elem.tag == f'{{{SITEMAP_NS}}}loc']
+                print(f"Sitemap index lists {len(parts)} sitemaps")
+                return all(validate_sitemap(part) for part in parts)
+            
+            if root.tag != f'{{{SITEMAP_NS}}}urlset':
+                print("Warning: Invalid root element in sitemap")
+                return False
+            
+            url_count = 0
+            for _, elem in events:
+                if elem.tag == f'{{{SITEMAP_NS}}}url':
+                    url_count += 1
+                root.clear()  # Keep memory flat while streaming
         
-        url_count = len(root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url'))
-        print(f"Sitemap validation passed: {url_count} URLs found")
+        print(f"Sitemap validation passed: {os.path.basename(path)} has {url_count} URLs")
         return True
         
-    except ET.ParseError as e:
+    except (ET.ParseError, OSError, StopIteration) as e:
         print(f"Sitemap validation failed: {e}")
         return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the sitemap for the site directory")
+    parser.add_argument("--gzip", action="store_true",
+                        help="also write gzip-compressed copies (sitemap.xml.gz)")
+    args = parser.parse_args()
+    
     # Change to the project directory
     script_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(script_dir)
@@ -156,11 +558,14 @@ if __name__ == "__main__":
         print(f"Error: {SITE_DIR} directory not found!")
         exit(1)
     
-    # Generate sitemap
-    generate_sitemap()
+    # Generate sitemaps
+    entry_point, image_entry_point = generate_sitemap(compress=args.gzip)
     
-    # Validate the generated sitemap
-    validate_sitemap()
+    # Validate the generated sitemaps
+    with span("sitemap: validate", 'sitemap'):
+        valid = validate_sitemap(entry_point) and validate_sitemap(image_entry_point)
+    if not valid:
+        exit(1)
     
     print("\nTo update the sitemap in the future, simply run this script again.")
-    print("Consider adding this to your deployment process for automatic updates.")
\ No newline at end of file
+    print("Consider adding this to your deployment process for automatic updates.")
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+HTML Tools for the Leading Powerful Conversations Website Build Scripts
+
+Helpers shared by the scripts that read or rewrite the pages in site/:
+- TagRewriter: a single-pass, tokenizer-based rewriter that visits every tag
+  once and splices replacements into the original text, leaving everything
+  else (whitespace, comments, inline scripts) byte-for-byte unchanged
+- build_starttag: serialise a start tag from a tag name and attributes
+- add_attributes: append attributes to a start tag, keeping its original text
+- replace_attributes: change or remove attributes of a start tag, keeping
+  the rest of its original text
+- parse_srcset: split a srcset attribute into its candidates
+"""
+
+import re
+from html import escape
+from html.parser import HTMLParser
+
+# Elements that never have an end tag, so they are not pushed on the open-element stack
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+
+# One attribute of a start tag: leading whitespace, name and optional value
+ATTRIBUTE_RE = re.compile(r'''(\s+)([^\s"'>/=]+)(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'=<>`]+))?''')
+
+def format_attribute(name, value):
+    """Serialise one attribute, quoting and escaping its value"""
+    if value is None:
+        return name
+    # Values are double-quoted, so single quotes (e.g. in inline handlers) can stay as they are
+    escaped = escape(value, quote=False).replace('"', '&quot;')
+    return f'{name}="{escaped}"'
+
+def build_starttag(tag, attrs, self_closing=False):
+    """Serialise a start tag from a list of (name, value) attribute pairs"""
+    parts = [tag] + [format_attribute(name, value) for name, value in attrs]
+    return f"<{' '.join(parts)}{' /' if self_closing else ''}>"
+
+def add_attributes(raw, attrs):
+    """Append (name, value) attributes to the original text of a start tag
+
+    Everything already in the tag, including its formatting and any
+    trailing '/>', is kept as written.
+    """
+    end = len(raw) - 2 if raw.endswith('/>') else len(raw) - 1
+    head = raw[:end].rstrip()
+    added = ''.join(f' {format_attribute(name, value)}' for name, value in attrs)
+    return head + added + raw[len(head):]
+
+def replace_attributes(raw, values):
+    """Change attributes in the original text of a start tag
+
+    `values` maps attribute names to their new value, or to None to remove
+    the attribute. Other attributes, their order and the tag's formatting
+    are kept as written; names that are not in the tag are ignored.
+    """
+    if not values:
+        return raw
+    start = re.match(r'<[^\s/>]+', raw).end()
+
+    def replace(match):
+        name = match.group(2).lower()
+        if name not in values:
+            return match.group(0)
+        if values[name] is None:
+            return ''
+        return match.group(1) + format_attribute(name, values[name])
+
+    return raw[:start] + ATTRIBUTE_RE.sub(replace, raw[start:])
+
+def parse_srcset(srcset):
+    """Split a srcset attribute into (url, descriptor) pairs"""
+    candidates = []
+    for candidate in srcset.split(','):
+        parts = candidate.split()
+        if parts:
+            candidates.append((parts[0], parts[1] if len(parts) > 1 else ''))
+    return candidates
+
+class TagRewriter(HTMLParser):
+    """Visits each tag of a document once and splices in replacements
+
+    Subclasses override on_starttag() and/or on_endtag(); returning a string
+    replaces the tag's original text, returning None keeps it. The stack of
+    currently open elements is available as self.stack, so handlers can tell
+    for example whether an <img> is already inside a <picture>. Rewriting is
+    linear in the size of the document: the text is tokenized once and the
+    output is assembled from the untouched spans and the replacements.
+    """
+
+    def __init__(self, content):
+        super().__init__(convert_charrefs=True)
+        self.content = content
+        self.stack = []
+        self.replacements = []
+        self.dropping = None
+
+        # Offsets of line starts, to turn getpos() into an index into content
+        self.line_starts = [0]
+        for index, char in enumerate(content):
+            if char == '\n':
+                self.line_starts.append(index + 1)
+
+    def _offset(self):
+        line, column = self.getpos()
+        return self.line_starts[line - 1] + column
+
+    def inside(self, tag):
+        """Whether an element with the given tag name is currently open"""
+        return tag in self.stack
+
+    def drop_content(self):
+        """Called from on_starttag: also remove the element's content and end tag
+
+        Tags inside the dropped element are not passed to the handlers.
+        """
+        self.dropping = (len(self.stack), self._tag_end)
+
+    def on_starttag(self, tag, attrs, raw, self_closing):
+        """Return replacement text for a start tag, or None to keep it"""
+        return None
+
+    def on_endtag(self, tag, raw):
+        """Return replacement text for an end tag, or None to keep it"""
+        return None
+
+    def _replace(self, start, raw, replacement):
+        if replacement is not None and replacement != raw:
+            self.replacements.append((start, start + len(raw), replacement))
+
+    def handle_starttag(self, tag, attrs):
+        start = self._offset()
+        raw = self.get_starttag_text()
+        self._tag_end = start + len(raw)
+        if self.dropping is None:
+            self._replace(start, raw, self.on_starttag(tag, attrs, raw, False))
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        start = self._offset()
+        raw = self.get_starttag_text()
+        self._tag_end = start + len(raw)
+        if self.dropping is None:
+            self._replace(start, raw, self.on_starttag(tag, attrs, raw, True))
+            # A self-closing tag has no content to drop
+            self.dropping = None
+
+    def handle_endtag(self, tag):
+        start = self._offset()
+        raw = self.content[start:self.content.index('>', start) + 1]
+        if tag in self.stack:
+            # Close the element along with any it implicitly closes (e.g. <p>, <li>)
+            while self.stack.pop() != tag:
+                pass
+        if self.dropping is not None:
+            depth, content_start = self.dropping
+            if len(self.stack) == depth:
+                self.replacements.append((content_start, start + len(raw), ''))
+                self.dropping = None
+            return
+        self._replace(start, raw, self.on_endtag(tag, raw))
+
+    def rewrite(self):
+        """Tokenize the document once and return the rewritten text"""
+        self.feed(self.content)
+        self.close()
+
+        output = []
+        position = 0
+        for start, end, replacement in self.replacements:
+            output.append(self.content[position:start])
+            output.append(replacement)
+            position = end
+        output.append(self.content[position:])
+        return ''.join(output)
+
+class Element:
+    """An element of a parsed page, with just enough structure for selector matching"""
+
+    def __init__(self, tag, attrs, parent=None):
+        self.tag = tag
+        self.attrs = {name: '' if value is None else value for name, value in attrs}
+        self.parent = parent
+        self.children = []
+        self.index = 0
+
+    @property
+    def id(self):
+        return self.attrs.get('id')
+
+    @property
+    def classes(self):
+        return self.attrs.get('class', '').split()
+
+    def iter(self):
+        """This element and all its descendants, in document order"""
+        yield self
+        for child in self.children:
+            yield from child.iter()
+
+    def ancestors(self):
+        parent = self.parent
+        while parent is not None:
+            yield parent
+            parent = parent.parent
+
+    def inside(self, tag):
+        return any(ancestor.tag == tag for ancestor in self.ancestors())
+
+class DocumentBuilder(HTMLParser):
+    """Builds an Element tree from a page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element('#document', [])
+        self.stack = [self.root]
+        self.count = 0
+
+    def handle_starttag(self, tag, attrs):
+        element = Element(tag, attrs, self.stack[-1])
+        self.count += 1
+        element.index = self.count
+        self.stack[-1].children.append(element)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        if any(element.tag == tag for element in self.stack[1:]):
+            # Close the element along with any it implicitly closes (e.g. <p>, <li>)
+            while self.stack.pop().tag != tag:
+                pass
+
+def parse_document(content):
+    """Parse a page into an Element tree; returns the '#document' root"""
+    builder = DocumentBuilder()
+    builder.feed(content)
+    builder.close()
+    return builder.root
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+JavaScript Tools for the Leading Powerful Conversations Website Build Scripts
+
+Helpers shared by the scripts that process the files in site/js/:
+- tokenize: split a script into comments, whitespace, strings, template
+  literals, regular expressions, words and punctuators
+- minify_js: strip comments and whitespace without changing what the
+  script does
+
+The minifier does not rename or rewrite anything. A line break is only
+removed when the tokens on either side show that automatic semicolon
+insertion cannot apply there, so scripts that leave out semicolons keep
+working.
+"""
+
+import re
+
+WHITESPACE_RE = re.compile(r'[ \t\n\r\f\v\u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000\ufeff]+')
+LINE_TERMINATORS = '\n\r\u2028\u2029'
+WORD_RE = re.compile(r'[A-Za-z_$\\\u0080-\uffff][\w$\\\u0080-\uffff]*')
+NUMBER_RE = re.compile(r'0[xXoObB][\da-fA-F_]+n?|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?n?')
+PUNCTUATORS = sorted([
+    '>>>=', '...', '===', '!==', '**=', '<<=', '>>=', '>>>', '&&=', '||=', '??=',
+    '=>', '==', '!=', '<=', '>=', '&&', '||', '??', '?.', '++', '--', '+=', '-=', '*=', '/=', '%=',
+    '&=', '|=', '^=', '**', '<<', '>>',
+    '{', '}', '(', ')', '[', ']', ';', ',', '<', '>', '+', '-', '*', '/', '%', '&', '|', '^',
+    '!', '~', '?', ':', '=', '.', '@', '#',
+], key=len, reverse=True)
+
+# After these words a '/' starts a regular expression rather than a division
+REGEX_KEYWORDS = {
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+    'case', 'do', 'else', 'yield', 'await',
+}
+# Tokens after which a statement cannot end, so a following line break is insignificant
+CONTINUING_PUNCTUATORS = set(PUNCTUATORS) - {')', ']', '}', '++', '--'}
+# Tokens that cannot start a statement, so a preceding line break is insignificant
+JOINING_PUNCTUATORS = set(PUNCTUATORS) - {'(', '[', '{', '+', '-', '/', '/=', '++', '--', '!', '~', '...', '@', '#'}
+
+class Token:
+    def __init__(self, kind, text):
+        self.kind = kind
+        self.text = text
+
+    def __repr__(self):
+        return f"Token({self.kind!r}, {self.text!r})"
+
+def scan_string(text, start):
+    """End offset of the string literal starting at start"""
+    quote = text[start]
+    index = start + 1
+    while index < len(text):
+        char = text[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == quote:
+            return index + 1
+        if char in '\n\r':
+            break
+        index += 1
+    raise ValueError(f"unterminated string at offset {start}")
+
+def scan_template(text, start):
+    """End offset of the template literal starting at start, including any ${...} expressions"""
+    index = start + 1
+    while index < len(text):
+        char = text[index]
+        if char == '\\':
+            index += 2
+        elif char == '`':
+            return index + 1
+        elif text.startswith('${', index):
+            index = scan_expression(text, index + 2)
+        else:
+            index += 1
+    raise ValueError(f"unterminated template literal at offset {start}")
+
+def scan_expression(text, start):
+    """Offset just past the '}' closing a template ${...} expression"""
+    depth = 0
+    index = start
+    while index < len(text):
+        char = text[index]
+        if char in '"\'':
+            index = scan_string(text, index)
+        elif char == '`':
+            index = scan_template(text, index)
+        elif char == '{':
+            depth += 1
+            index += 1
+        elif char == '}':
+            if depth == 0:
+                return index + 1
+            depth -= 1
+            index += 1
+        else:
+            index += 1
+    raise ValueError(f"unterminated template expression at offset {start}")
+
+def scan_regex(text, start):
+    """End offset (including flags) of the regular expression literal starting at start"""
+    index = start + 1
+    in_class = False
+    while index < len(text):
+        char = text[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char in '\n\r':
+            break
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            index += 1
+            while index < len(text) and (text[index].isalnum() or text[index] in '_$'):
+                index += 1
+            return index
+        index += 1
+    raise ValueError(f"unterminated regular expression at offset {start}")
+
+def regex_allowed(previous):
+    """Whether a '/' after the previous significant token starts a regular expression"""
+    if previous is None:
+        return True
+    if previous.kind == 'punct':
+        return previous.text not in (')', ']', '++', '--')
+    if previous.kind == 'word':
+        return previous.text in REGEX_KEYWORDS
+    return False
+
+def tokenize(text):
+    """Split a script into Tokens; raises ValueError on unterminated literals"""
+    tokens = []
+    previous = None
+    index = 0
+    while index < len(text):
+        char = text[index]
+        match = WHITESPACE_RE.match(text, index)
+        if match:
+            end, kind = match.end(), 'ws'
+        elif text.startswith('//', index):
+            end = len(text)
+            for terminator in LINE_TERMINATORS:
+                found = text.find(terminator, index)
+                if found != -1:
+                    end = min(end, found)
+            kind = 'comment'
+        elif text.startswith('/*', index):
+            end = text.find('*/', index + 2)
+            if end == -1:
+                raise ValueError(f"unterminated comment at offset {index}")
+            end, kind = end + 2, 'comment'
+        elif char in '"\'':
+            end, kind = scan_string(text, index), 'string'
+        elif char == '`':
+            end, kind = scan_template(text, index), 'template'
+        elif char == '/' and regex_allowed(previous):
+            end, kind = scan_regex(text, index), 'regex'
+        elif (char.isdigit() or (char == '.' and text[index + 1:index + 2].isdigit())):
+            end, kind = NUMBER_RE.match(text, index).end(), 'number'
+        elif WORD_RE.match(text, index):
+            end, kind = WORD_RE.match(text, index).end(), 'word'
+        else:
+            punctuator = next((p for p in PUNCTUATORS if text.startswith(p, index)), char)
+            end, kind = index + len(punctuator), 'punct'
+
+        token = Token(kind, text[index:end])
+        tokens.append(token)
+        if kind not in ('ws', 'comment'):
+            previous = token
+        index = end
+    return tokens
+
+def is_word_char(char):
+    return char.isalnum() or char in '_$\\' or ord(char) > 127
+
+def needs_space(previous, token):
+    """Whether two tokens would run together (or change meaning) without a space"""
+    last, first = previous.text[-1], token.text[0]
+    if is_word_char(last) and is_word_char(first):
+        return True
+    if previous.kind == 'number' and first == '.' and previous.text.isdigit():
+        return True
+    if previous.kind == 'regex' and token.kind in ('word', 'number'):
+        return True
+    # a + +b, a - -b, and '/' followed by '/' or '*' (which would start a comment)
+    return (last in '+-' and first == last) or (last == '/' and first in '/*')
+
+def minify_js(text):
+    """Remove comments and redundant whitespace from a script
+
+    /*! ... */ comments (licence notices) are kept.
+    """
+    output = []
+    previous = None
+    newline = False
+    for token in tokenize(text):
+        if token.kind == 'ws':
+            newline = newline or any(terminator in token.text for terminator in LINE_TERMINATORS)
+            continue
+        if token.kind == 'comment' and not token.text.startswith('/*!'):
+            newline = newline or token.text.startswith('//') or any(
+                terminator in token.text for terminator in LINE_TERMINATORS)
+            continue
+
+        if previous is not None:
+            if newline and not (previous.kind == 'punct' and previous.text in CONTINUING_PUNCTUATORS
+                                or token.kind == 'punct' and token.text in JOINING_PUNCTUATORS):
+                output.append('\n')
+            elif needs_space(previous, token):
+                output.append(' ')
+        output.append(token.text)
+        if token.kind == 'comment':
+            # Keep a preserved comment on its own line
+            output.append('\n')
+            previous = None
+        else:
+            previous = token
+        newline = False
+    return ''.join(output).strip() + ('\n' if output else '')
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+HTML and JavaScript Minifier for Leading Powerful Conversations Website
+
+The pages in site/ are indented and commented for editing, and the scripts
+in site/js/ are shipped as written. This script copies the site to a
+separate output directory (dist/ by default) and, in the copy:
+1. Minifies every script under js/ (comments and redundant whitespace only;
+   nothing is renamed)
+2. Minifies every page: strips comments (keeping conditional comments),
+   collapses whitespace and drops it next to block-level tags, tidies the
+   whitespace inside tags, minifies inline scripts and styles, and re-encodes
+   JSON-LD compactly
+3. Drops <script src> tags for scripts with no code left after minifying
+4. Optionally merges each page's consecutive local scripts (common.js and
+   the page's own script) into one file under js/bundles/
+
+<pre> and <textarea> content is kept exactly as written. The sources in
+site/ are never modified.
+"""
+
+import os
+import re
+import json
+import shutil
+import argparse
+from html.parser import HTMLParser
+from pathlib import Path
+
+from css_tools import minify_css
+from html_tools import build_starttag
+from js_tools import minify_js
+
+# Configuration
+SITE_DIR = Path(__file__).resolve().parent / "site"
+OUTPUT_DIR = Path(__file__).resolve().parent / "dist"
+SCRIPT_BUNDLE_DIR = "js/bundles"
+# Precompressed copies would no longer match the minified files
+SKIPPED_PATTERNS = ("*.gz", "*.br")
+
+# Whitespace next to these tags is never rendered
+BLOCK_ELEMENTS = {
+    'html', 'head', 'body', 'title', 'meta', 'link', 'base', 'script', 'style', 'noscript', 'template',
+    'address', 'article', 'aside', 'blockquote', 'details', 'dialog', 'dd', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hgroup', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'summary', 'ul',
+    'table', 'caption', 'colgroup', 'col', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th',
+    'option', 'optgroup', 'source', 'track', 'legend',
+}
+# Elements whose text is shown exactly as written
+PREFORMATTED_ELEMENTS = ('pre', 'textarea')
+JS_TYPES = ('', 'text/javascript', 'application/javascript', 'module')
+JSON_TYPES = ('application/ld+json', 'application/json', 'importmap')
+
+WHITESPACE_RE = re.compile(r'[ \t\n\r\f]+')
+TAG_PART_RE = re.compile(r'"[^"]*"|\'[^\']*\'|[ \t\n\r\f]+|[^ \t\n\r\f"\']+')
+
+def compact_tag(raw):
+    """The original text of a tag with the whitespace between attributes collapsed"""
+    parts = TAG_PART_RE.findall(raw)
+    output = []
+    for index, part in enumerate(parts):
+        if not part.isspace():
+            output.append(part)
+            continue
+        following = parts[index + 1] if index + 1 < len(parts) else ''
+        if output and output[-1].endswith('=') or following.startswith(('=', '>', '/>')):
+            continue
+        output.append(' ')
+    return ''.join(output)
+
+def minify_json(text):
+    """Re-encode a JSON script body without whitespace, keeping it safe inside <script>"""
+    return json.dumps(json.loads(text), ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+class HtmlTokenizer(HTMLParser):
+    """Records the spans of a page's tags, comments and declarations; the gaps are text"""
+
+    def __init__(self, content):
+        super().__init__(convert_charrefs=True)
+        self.content = content
+        self.tokens = []
+        self.line_starts = [0] + [match.end() for match in re.finditer('\n', content)]
+
+    def _offset(self):
+        line, column = self.getpos()
+        return self.line_starts[line - 1] + column
+
+    def _end(self, start, marker):
+        return self.content.index(marker, start) + len(marker)
+
+    def handle_starttag(self, tag, attrs):
+        start = self._offset()
+        self.tokens.append(('start', start, start + len(self.get_starttag_text()), tag, attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        start = self._offset()
+        self.tokens.append(('end', start, self._end(start, '>'), tag, None))
+
+    def handle_comment(self, data):
+        start = self._offset()
+        marker = '-->' if self.content.startswith('<!--', start) else '>'
+        self.tokens.append(('comment', start, self._end(start + 2, marker), None, None))
+
+    def handle_decl(self, decl):
+        start = self._offset()
+        self.tokens.append(('decl', start, self._end(start, '>'), None, None))
+
+    def unknown_decl(self, data):
+        start = self._offset()
+        self.tokens.append(('decl', start, self._end(start, ']>'), None, None))
+
+    def handle_pi(self, data):
+        start = self._offset()
+        self.tokens.append(('decl', start, self._end(start, '>'), None, None))
+
+def is_plain_script(tag, attrs):
+    """A classic script loaded from a local file, with no other attributes"""
+    values = dict(attrs)
+    src = values.get('src') or ''
+    return (tag == 'script' and set(values) == {'src'} and src
+            and '://' not in src and not src.startswith(('//', 'data:')))
+
+def minify_html(content, rewrite_scripts=None, warnings=None):
+    """Minify a page
+
+    rewrite_scripts, if given, is called with the srcs of each run of
+    consecutive plain local scripts and returns the srcs to load instead.
+    Problems with inline scripts (which are then kept as written) are
+    appended to warnings.
+    """
+    tokenizer = HtmlTokenizer(content)
+    tokenizer.feed(content)
+    tokenizer.close()
+
+    # Items are ('text', text, preformatted) or ('tag', text, tag, is_block, attrs, is_end)
+    items = []
+    preformatted = 0
+    raw_element = None
+    position = 0
+
+    def add_text(text):
+        if items and items[-1][0] == 'text' and not items[-1][2] and not preformatted:
+            items[-1] = ('text', items[-1][1] + text, False)
+        else:
+            items.append(('text', text, bool(preformatted)))
+
+    for kind, start, end, tag, attrs in tokenizer.tokens + [('eof', len(content), len(content), None, None)]:
+        text = content[position:start]
+        position = end
+        if text and raw_element is not None:
+            items.append(('tag', minify_raw_text(raw_element, text, warnings), None, False, None, False))
+        elif text:
+            add_text(text)
+
+        raw = content[start:end]
+        if kind == 'comment':
+            if raw.startswith(('<!--[if', '<![endif]')) or preformatted:
+                items.append(('tag', raw, None, False, None, False))
+        elif kind == 'decl':
+            items.append(('tag', raw, None, True, None, False))
+        elif kind == 'start':
+            items.append(('tag', raw if preformatted else compact_tag(raw), tag, tag in BLOCK_ELEMENTS, attrs, False))
+            if tag in PREFORMATTED_ELEMENTS:
+                preformatted += 1
+            elif tag in ('script', 'style') and not raw.endswith('/>'):
+                raw_element = (tag, dict(attrs))
+        elif kind == 'end':
+            if tag in PREFORMATTED_ELEMENTS and preformatted:
+                preformatted -= 1
+            if raw_element is not None and tag == raw_element[0]:
+                raw_element = None
+            items.append(('tag', compact_tag(raw), tag, tag in BLOCK_ELEMENTS, None, True))
+
+    if rewrite_scripts is not None:
+        items = rewrite_script_runs(items, rewrite_scripts)
+
+    output = []
+    for index, item in enumerate(items):
+        if item[0] == 'tag':
+            output.append(item[1])
+            continue
+        text, is_preformatted = item[1], item[2]
+        if is_preformatted:
+            output.append(text)
+            continue
+        text = WHITESPACE_RE.sub(' ', text)
+        before = items[index - 1] if index > 0 else None
+        after = items[index + 1] if index + 1 < len(items) else None
+        if before is None or before[0] == 'tag' and before[3]:
+            text = text.lstrip(' ')
+        if after is None or after[0] == 'tag' and after[3]:
+            text = text.rstrip(' ')
+        output.append(text)
+    return ''.join(output).strip() + '\n'
+
+def minify_raw_text(element, text, warnings=None):
+    """Minify the content of a <script> or <style> element, or return it unchanged"""
+    tag, attrs = element
+    if tag == 'style':
+        return minify_css(text)
+    script_type = (attrs.get('type') or '').strip().lower()
+    if 'src' in attrs and not text.strip():
+        return ''
+    try:
+        if script_type in JS_TYPES:
+            return minify_js(text).strip()
+        if script_type in JSON_TYPES:
+            return minify_json(text)
+    except ValueError as error:
+        if warnings is not None:
+            warnings.append(f"inline {script_type or 'script'} kept as written: {error}")
+    return text
+
+def rewrite_script_runs(items, rewrite_scripts):
+    """Pass each run of consecutive plain scripts through rewrite_scripts"""
+    result = []
+    index = 0
+    while index < len(items):
+        run = []
+        scan = index
+        # A plain script is its start tag, its (empty) content and its end tag, then optional whitespace
+        while (scan + 1 < len(items) and items[scan][0] == 'tag' and items[scan][2] == 'script'
+               and not items[scan][5] and is_plain_script('script', items[scan][4])
+               and items[scan + 1][0] == 'tag' and items[scan + 1][2] == 'script' and items[scan + 1][5]):
+            run.append(dict(items[scan][4])['src'])
+            scan += 2
+            if scan < len(items) and items[scan][0] == 'text' and not items[scan][1].strip():
+                scan += 1
+        if not run:
+            result.append(items[index])
+            index += 1
+            continue
+
+        srcs = rewrite_scripts(run)
+        if srcs == run:
+            result.extend(items[index:scan])
+        else:
+            for src in srcs:
+                tag = build_starttag('script', [('src', src)])
+                result.append(('tag', tag, 'script', True, [('src', src)], False))
+                result.append(('tag', '</script>', 'script', True, None, True))
+        index = scan
+    return result
+
+class ScriptPlanner:
+    """Decides what each page loads: drops empty scripts and optionally merges the rest"""
+
+    def __init__(self, output_dir, merge=False):
+        self.output_dir = Path(output_dir).resolve()
+        self.merge = merge
+        self.bundles = {}
+
+    def __call__(self, page_dir, srcs):
+        paths = [(page_dir / src.split('?')[0]).resolve() for src in srcs]
+        if not all(path.is_file() and self.output_dir in path.parents for path in paths):
+            return srcs
+        kept = [(src, path) for src, path in zip(srcs, paths) if path.read_text(encoding='utf-8').strip()]
+        if not self.merge or len(kept) < 2:
+            return [src for src, _ in kept]
+
+        name = '-'.join(path.stem for _, path in kept) + '.js'
+        bundle_path = self.output_dir / SCRIPT_BUNDLE_DIR / name
+        if bundle_path not in self.bundles:
+            # The leading ';' keeps a script without a final semicolon from running into the next
+            code = '\n;'.join(path.read_text(encoding='utf-8').strip() for _, path in kept) + '\n'
+            bundle_path.parent.mkdir(parents=True, exist_ok=True)
+            bundle_path.write_text(code, encoding='utf-8')
+            self.bundles[bundle_path] = [path for _, path in kept]
+        return [os.path.relpath(bundle_path, page_dir.resolve()).replace(os.sep, '/')]
+
+def copy_site(site_dir, output_dir):
+    """Replace output_dir with a fresh copy of the site"""
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    shutil.copytree(site_dir, output_dir, ignore=shutil.ignore_patterns(*SKIPPED_PATTERNS))
+
+def report_line(name, before, after):
+    saved = 1 - after / before if before else 0
+    return f"  ✅ {name:<40} {before / 1024:6.1f} KB → {after / 1024:6.1f} KB ({saved:.0%} smaller)"
+
+def minify_site(site_dir=SITE_DIR, output_dir=OUTPUT_DIR, merge_scripts=False, in_place=False):
+    """Write a minified copy of the site (or minify a build directory in place); returns True on success"""
+    site_dir = Path(site_dir).resolve()
+    if in_place:
+        if site_dir == SITE_DIR:
+            print(f"❌ Refusing to minify the sources in {SITE_DIR} in place")
+            return False
+        output_dir = site_dir
+        print(f"🗜️  Minifying {site_dir.name}/ in place...")
+    else:
+        output_dir = Path(output_dir).resolve()
+        if output_dir == site_dir or output_dir in site_dir.parents or site_dir in output_dir.parents:
+            print(f"❌ The output directory must be outside {site_dir} (and not contain it)")
+            return False
+        print(f"🗜️  Minifying {site_dir.name}/ into {output_dir.name}/...")
+        copy_site(site_dir, output_dir)
+    totals = [0, 0]
+
+    print("\n📜 Scripts:")
+    for path in sorted(output_dir.rglob("*.js")):
+        source = path.read_text(encoding='utf-8')
+        try:
+            minified = minify_js(source)
+        except ValueError as error:
+            print(f"  ❌ {path.relative_to(output_dir)}: {error}")
+            return False
+        path.write_text(minified, encoding='utf-8')
+        before, after = len(source.encode('utf-8')), len(minified.encode('utf-8'))
+        totals[0] += before
+        totals[1] += after
+        print(report_line(str(path.relative_to(output_dir)), before, after))
+
+    print("\n📄 Pages:")
+    planner = ScriptPlanner(output_dir, merge_scripts)
+    for path in sorted(output_dir.rglob("*.html")):
+        source = path.read_text(encoding='utf-8')
+        warnings = []
+        minified = minify_html(source, lambda srcs: planner(path.parent, srcs), warnings)
+        path.write_text(minified, encoding='utf-8')
+        before, after = len(source.encode('utf-8')), len(minified.encode('utf-8'))
+        totals[0] += before
+        totals[1] += after
+        print(report_line(str(path.relative_to(output_dir)), before, after))
+        for warning in warnings:
+            print(f"     ⚠️  {warning}")
+
+    for bundle_path, parts in planner.bundles.items():
+        names = ' + '.join(part.name for part in parts)
+        print(f"  🔗 {bundle_path.relative_to(output_dir)}: {names} (one request instead of {len(parts)})")
+
+    print(f"\n📉 {totals[0] / 1024:.1f} KB → {totals[1] / 1024:.1f} KB "
+          f"({(totals[0] - totals[1]) / 1024:.1f} KB saved)")
+    print("\n✅ Minification complete!")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a copy of the site with minified HTML and JavaScript")
+    parser.add_argument("--site-dir", type=Path, default=SITE_DIR,
+                        help="site directory to read (default: site/)")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR,
+                        help="directory to write the minified copy to, replacing it (default: dist/)")
+    parser.add_argument("--merge-scripts", action="store_true",
+                        help=f"merge each page's consecutive local scripts into one file under {SCRIPT_BUNDLE_DIR}/")
+    parser.add_argument("--in-place", action="store_true",
+                        help="minify --site-dir itself (a build directory such as dist/, never site/)")
+    args = parser.parse_args()
+
+    if not minify_site(args.site_dir, args.output_dir, merge_scripts=args.merge_scripts, in_place=args.in_place):
+        exit(1)
@@ -6,19 +6,151 @@ This script optimizes all images in the website by:
 1. Creating WebP versions of all major images
 2. Compressing original images (JPEG and PNG)
 3. Generating responsive image sets
-4. Updating HTML files to use optimized images with fallbacks
+4. Generating blurred placeholders for content images from the same decode
+5. Updating HTML files to use optimized images with fallbacks
 """
 
+import io
 import os
+import base64
+import sys
+import json
+import time
+import tempfile
+import hashlib
+import argparse
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
 from pathlib import Path
 import re
+import glob
+import struct
+from urllib.parse import unquote
+
+from html_tools import TagRewriter, add_attributes, replace_attributes, parse_srcset
+from build_profile import span, record, run_profiled, file_bytes
+
+try:
+    import PIL
+    from PIL import Image, ImageFilter, features
+except ImportError:  # Pillow is optional; the external tools are used instead
+    PIL = None
+    Image = None
+    ImageFilter = None
+    features = None
+
+SITE_DIR = Path(__file__).resolve().parent / "site"
+IMAGES_DIR = SITE_DIR / "images"
+
+# Manifest of up-to-date pipeline outputs, kept next to the site directory
+CACHE_PATH = SITE_DIR.parent / ".image-cache.json"
+
+# Source formats that generated WebP files may be derived from
+SOURCE_EXTENSIONS = ['.png', '.jpg', '.jpeg']
+
+# Encoding backends: Pillow in-process, or the external command-line tools
+BACKENDS = ['pillow', 'tools']
+
+# How responsive widths are derived: each from the previous (largest first),
+# or each from the full-size original
+RESIZE_MODES = ['cascade', 'independent']
+
+# Pillow format names for the extensions the pipeline writes
+PILLOW_FORMATS = {'.jpg': 'JPEG', '.jpeg': 'JPEG', '.png': 'PNG', '.webp': 'WEBP', '.avif': 'AVIF'}
+
+# Formats generated next to each source image (AVIF only when enabled)
+GENERATED_EXTENSIONS = ['.webp', '.avif']
+
+# AVIF quality (0-100, as for avifenc -q); AVIF holds up at lower settings than WebP
+AVIF_QUALITY = 60
+
+# Quality bounds for the per-image quality search, by Pillow format name
+QUALITY_SEARCH_RANGE = {'JPEG': (40, 95), 'WEBP': (40, 95), 'AVIF': (20, 90)}
+
+# JPEG segments kept when an original's metadata is stripped: JFIF (APP0),
+# the ICC colour profile (APP2) and the Adobe colour transform (APP14)
+JPEG_KEPT_SEGMENTS = {0xE0, 0xE2, 0xEE}
+
+# Longest side images are downscaled to before SSIM scoring
+SSIM_MAX_SIDE = 384
+
+# Image replacements with responsive and WebP support, used when updating HTML
+IMAGE_UPDATES = {
+    'steve-ellis-photo.png': {
+        'responsive': True,
+        'alt': 'Steve Ellis - Leadership coach and author',
+        'sizes': '(max-width: 768px) 100vw, 400px'
+    },
+    'FrameworkFull.png': {
+        'responsive': True, 
+        'alt': 'Leading Powerful Conversations Framework',
+        'sizes': '(max-width: 768px) 100vw, 600px'
+    },
+    'Leading-Powerful-Convesations-Front-Cover.jpg': {
+        'responsive': True,
+        'alt': 'Leading Powerful Conversations book cover',
+        'sizes': '(max-width: 768px) 100vw, 300px'
+    },
+    'Leading-Powerful-Convesations-Back-Cover.jpg': {
+        'responsive': True,
+        'alt': 'Leading Powerful Conversations book back cover', 
+        'sizes': '(max-width: 768px) 100vw, 300px'
+    },
+    'seven-principles.png': {
+        'responsive': True,
+        'alt': 'Seven Principles of Leading Powerful Conversations',
+        'sizes': '(max-width: 768px) 100vw, 500px'
+    },
+    'Amazon-buy-now-button-300x113.png': {
+        'responsive': False,
+        'alt': 'Buy now on Amazon',
+        'webp_only': True
+    }
+}
+
+# Widths generated for responsive images
+RESPONSIVE_SIZES = [300, 600, 1200]
+
+# Images that should get responsive variants (main content images)
+RESPONSIVE_IMAGES = [
+    "steve-ellis-photo.png",
+    "FrameworkFull.png", 
+    "Leading-Powerful-Convesations-Front-Cover.jpg",
+    "Leading-Powerful-Convesations-Back-Cover.jpg",
+    "seven-principles.png"
+]
+
+# Low-quality placeholders for content images (RESPONSIVE_IMAGES): the width
+# of the blurred thumbnail, its blur radius in thumbnail pixels and its WebP quality
+PLACEHOLDER_WIDTH = 20
+PLACEHOLDER_BLUR = 1
+PLACEHOLDER_QUALITY = 40
+
+# Content images with a placeholder get PLACEHOLDER_CLASS, which common.js
+# removes once the image has loaded, plus PLACEHOLDER_CLASS-<image stem>;
+# PLACEHOLDER_CSS (imported by main.css) gives each pair its background
+PLACEHOLDER_CLASS = "img-placeholder"
+PLACEHOLDER_CSS = "css/placeholders.css"
+# The inline background earlier versions put on the <img>, removed when found
+PLACEHOLDER_STYLE_RE = re.compile(
+    r'background:\s*#[0-9a-f]{6}(?: url\(data:image/webp;base64,[A-Za-z0-9+/=]*\))? center / cover no-repeat;?\s*')
+
+# Images to skip (favicons and small icons)
+SKIP_IMAGES = [
+    "favicon.ico",
+    "favicon.svg", 
+    "favicon-96x96.png",
+    "apple-touch-icon.png",
+    "web-app-manifest-192x192.png",
+    "web-app-manifest-512x512.png"
+]
 
 def run_command(command, cwd=None):
     """Run a shell command and return the result"""
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True, cwd=cwd)
+        result = run_profiled(command, category='image-tool', shell=True, capture_output=True, text=True, cwd=cwd)
         if result.returncode != 0:
             print(f"Error running command '{command}': {result.stderr}")
             return False
@@ -27,11 +159,14 @@ def run_command(command, cwd=None):
         print(f"Exception running command '{command}': {e}")
         return False
 
-def optimize_png(input_path, output_path=None):
-    """Optimize PNG files using optipng"""
+def optimize_png(input_path, output_path=None, backend='tools'):
+    """Optimize PNG files using optipng (or Pillow in-process)"""
     if output_path is None:
         output_path = input_path
     
+    if backend == 'pillow':
+        return pillow_optimize(input_path, output_path)
+    
     # Copy first if different paths
     if input_path != output_path:
         shutil.copy2(input_path, output_path)
@@ -40,11 +175,14 @@ def optimize_png(input_path, output_path=None):
     command = f"optipng -o2 -strip all '{output_path}'"
     return run_command(command)
 
-def optimize_jpeg(input_path, output_path=None, quality=85):
-    """Optimize JPEG files using jpegoptim"""
+def optimize_jpeg(input_path, output_path=None, quality=85, backend='tools'):
+    """Optimize JPEG files using jpegoptim (or Pillow in-process)"""
     if output_path is None:
         output_path = input_path
     
+    if backend == 'pillow':
+        return pillow_optimize(input_path, output_path)
+    
     # Copy first if different paths
     if input_path != output_path:
         shutil.copy2(input_path, output_path)
@@ -53,128 +191,1267 @@ def optimize_jpeg(input_path, output_path=None, quality=85):
     command = f"jpegoptim --max={quality} --strip-all '{output_path}'"
     return run_command(command)
 
-def create_webp(input_path, output_path=None, quality=80):
+def create_webp(input_path, output_path=None, quality=80, backend='tools'):
     """Create WebP version of an image"""
     if output_path is None:
         output_path = str(Path(input_path).with_suffix('.webp'))
     
+    if backend == 'pillow':
+        return pillow_convert(input_path, output_path, quality)
+    
     command = f"cwebp -q {quality} '{input_path}' -o '{output_path}'"
     return run_command(command)
 
-def create_responsive_variants(input_path, base_name, sizes=[300, 600, 1200]):
-    """Create responsive image variants at different sizes"""
+def create_avif(input_path, output_path=None, quality=AVIF_QUALITY, backend='tools'):
+    """Create AVIF version of an image"""
+    if output_path is None:
+        output_path = str(Path(input_path).with_suffix('.avif'))
+    
+    if backend == 'pillow':
+        return pillow_convert(input_path, output_path, quality)
+    
+    command = f"avifenc -q {quality} '{input_path}' '{output_path}'"
+    return run_command(command)
+
+def resize_image(input_path, output_path, width, quality=85):
+    """Resize an image to the given width using ImageMagick"""
+    command = f"convert '{input_path}' -resize {width}x -quality {quality} '{output_path}'"
+    return run_command(command)
+
+def create_resized_images(input_path, variants, quality=85):
+    """Create several widths with one ImageMagick pass, largest first
+
+    The source is decoded once and each width is resized from the previous,
+    smaller-than-original result, then all outputs are compressed together.
+    `variants` is a list of (output_path, width) pairs, largest first.
+    """
+    steps = [f"-resize {width}x -write '{output_path}'" for output_path, width in variants[:-1]]
+    last_path, last_width = variants[-1]
+    steps.append(f"-resize {last_width}x '{last_path}'")
+    command = f"convert '{input_path}' -quality {quality} " + ' '.join(steps)
+    if not run_command(command):
+        return False
+    
+    outputs = ' '.join(f"'{output_path}'" for output_path, _ in variants)
+    ext = Path(last_path).suffix.lower()
+    if ext in ['.jpg', '.jpeg']:
+        compressed = run_command(f"jpegoptim --max={quality} --strip-all {outputs}")
+    elif ext in ['.png']:
+        compressed = run_command(f"optipng -o2 -strip all {outputs}")
+    else:
+        compressed = True
+    if compressed:
+        for output_path, _ in variants:
+            keep_source_if_smaller(output_path, input_path)
+    return compressed
+
+def keep_source_if_smaller(variant_path, source_path):
+    """Replace a resized variant with a copy of its source when the variant is not smaller
+
+    Re-encoding a width close to the source's can cost more bytes than the
+    source itself; the copy's real width then goes into the srcset.
+    """
+    if os.path.getsize(variant_path) >= os.path.getsize(source_path):
+        shutil.copy2(source_path, variant_path)
+
+def read_image_size(path):
+    """Read the pixel dimensions of a PNG, GIF, WebP or JPEG from its header
+
+    Only the header (for JPEG, the markers up to the first frame header) is
+    read; the image data is never decoded. Returns (width, height), or None
+    if the format is not recognised.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(30)
+        if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+            return struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            chunk = head[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', head[26:30])
+                return width & 0x3fff, height & 0x3fff
+            if chunk == b'VP8L':
+                bits = int.from_bytes(head[21:25], 'little')
+                return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+            if chunk == b'VP8X':
+                return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+            return None
+        if head[:2] == b'\xff\xd8':
+            f.seek(2)
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    return None
+                while marker[1] == 0xFF:
+                    # Markers may be preceded by any number of fill bytes
+                    marker = marker[1:] + f.read(1)
+                code = marker[1]
+                if code == 0x01 or 0xD0 <= code <= 0xD8:
+                    continue
+                length = struct.unpack('>H', f.read(2))[0]
+                if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+                    height, width = struct.unpack('>xHH', f.read(5))
+                    return width, height
+                f.seek(length - 2, 1)
+    return None
+
+def usable_widths(input_path, sizes):
+    """Responsive widths worth generating for an image, largest first
+
+    Widths larger than the source are dropped rather than upscaled.
+    """
+    dimensions = read_image_size(input_path)
+    widths = sorted(set(sizes), reverse=True)
+    if dimensions is None:
+        return widths
+    return [width for width in widths if width <= dimensions[0]]
+
+def upscaled_variants(input_path):
+    """Responsive variant files on disk that are wider than their source
+
+    Such variants are left over from before widths were capped at the
+    source width; they only add bytes and blur.
+    """
     input_path = Path(input_path)
-    variants = []
+    dimensions = read_image_size(input_path)
+    if dimensions is None:
+        return []
+    pattern = re.compile(rf'{re.escape(input_path.stem)}-(\d+)w\.\w+')
+    return sorted(
+        variant for variant in input_path.parent.glob(f"{glob.escape(input_path.stem)}-*w.*")
+        if (match := pattern.fullmatch(variant.name)) and int(match.group(1)) > dimensions[0]
+        and variant.suffix.lower() in SOURCE_EXTENSIONS + GENERATED_EXTENSIONS
+    )
+
+def remove_upscaled_variants(input_path):
+    """Delete the variants of an image that are wider than it; returns their names"""
+    removed = []
+    for variant in upscaled_variants(input_path):
+        variant.unlink()
+        removed.append(variant.name)
+    return removed
+
+def create_resized_image(input_path, output_path, width):
+    """Resize an image and compress the result like an original"""
+    if not resize_image(input_path, output_path, width):
+        return False
+    
+    ext = Path(output_path).suffix.lower()
+    if ext in ['.jpg', '.jpeg']:
+        compressed = optimize_jpeg(str(output_path), quality=85)
+    elif ext in ['.png']:
+        compressed = optimize_png(str(output_path))
+    else:
+        compressed = True
+    if compressed:
+        keep_source_if_smaller(output_path, input_path)
+    return compressed
+
+def pillow_encode(image, fmt, quality=None):
+    """Encode an in-memory image to bytes with settings matching the external tools"""
+    buffer = io.BytesIO()
+    if fmt == 'JPEG':
+        image.convert('RGB').save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    elif fmt == 'PNG':
+        image.save(buffer, 'PNG', optimize=True)
+    elif fmt == 'WEBP':
+        image.save(buffer, 'WEBP', quality=quality, method=4)
+    elif fmt == 'AVIF':
+        image.save(buffer, 'AVIF', quality=quality)
+    else:
+        raise ValueError(f"Unsupported output format: {fmt}")
+    return buffer.getvalue()
+
+def ssim_luma(image):
+    """Greyscale version of an image for SSIM scoring
+
+    Transparent areas are flattened onto white so hidden colour values do not
+    affect the score, and large images are downscaled to keep scoring cheap.
+    """
+    if 'A' in image.getbands():
+        background = Image.new('RGBA', image.size, 'white')
+        background.alpha_composite(image.convert('RGBA'))
+        image = background
+    gray = image.convert('L')
+    scale = SSIM_MAX_SIDE / max(gray.size)
+    if scale < 1:
+        gray = gray.resize((max(8, round(gray.width * scale)), max(8, round(gray.height * scale))), Image.BILINEAR)
+    return gray
+
+def ssim(reference, candidate):
+    """Mean structural similarity of two same-sized greyscale images over 8x8 windows"""
+    width, height = reference.size
+    ref_pixels = list(reference.getdata())
+    cand_pixels = list(candidate.getdata())
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    scores = []
+    
+    for top in range(0, height - 7, 8):
+        for left in range(0, width - 7, 8):
+            xs = []
+            ys = []
+            for row in range(top, top + 8):
+                start = row * width + left
+                xs.extend(ref_pixels[start:start + 8])
+                ys.extend(cand_pixels[start:start + 8])
+            mean_x = sum(xs) / 64
+            mean_y = sum(ys) / 64
+            var_x = sum((x - mean_x) ** 2 for x in xs) / 63
+            var_y = sum((y - mean_y) ** 2 for y in ys) / 63
+            covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / 63
+            scores.append(((2 * mean_x * mean_y + c1) * (2 * covariance + c2))
+                          / ((mean_x ** 2 + mean_y ** 2 + c1) * (var_x + var_y + c2)))
+    
+    return sum(scores) / len(scores) if scores else 1.0
+
+def search_quality(image, fmt, target_ssim):
+    """Bisect encoder quality for the smallest encoding that meets a target SSIM
+
+    Returns (quality, data). If even the highest quality in range misses the
+    target, that encoding is returned.
+    """
+    low, high = QUALITY_SEARCH_RANGE[fmt]
+    reference = ssim_luma(image)
+    best = None
+    
+    while low <= high:
+        quality = (low + high) // 2
+        data = pillow_encode(image, fmt, quality)
+        with Image.open(io.BytesIO(data)) as decoded:
+            score = ssim(reference, ssim_luma(decoded))
+        if score >= target_ssim:
+            if best is None or len(data) < len(best[1]):
+                best = (quality, data)
+            high = quality - 1
+        else:
+            low = quality + 1
+    
+    if best is None:
+        quality = QUALITY_SEARCH_RANGE[fmt][1]
+        best = (quality, pillow_encode(image, fmt, quality))
+    return best
+
+def pillow_save(image, output_path, quality=85, keep_smaller_of=None, target_ssim=None):
+    """Encode an image into the format implied by the output extension
+
+    When `keep_smaller_of` names an existing file, it is only replaced if the
+    new encoding is smaller, mirroring jpegoptim/optipng which never grow a file.
+    With `target_ssim`, lossy formats use the lowest quality that still
+    reaches that score instead of the fixed `quality`.
+    """
+    output_path = Path(output_path)
+    fmt = PILLOW_FORMATS[output_path.suffix.lower()]
+    if target_ssim is not None and fmt in QUALITY_SEARCH_RANGE:
+        quality, data = search_quality(image, fmt, target_ssim)
+    else:
+        data = pillow_encode(image, fmt, quality)
+    if keep_smaller_of is not None and len(data) >= os.path.getsize(keep_smaller_of):
+        if Path(keep_smaller_of) != output_path:
+            shutil.copy2(keep_smaller_of, output_path)
+        return
+    with open(output_path, 'wb') as f:
+        f.write(data)
+
+def pillow_open(input_path):
+    """Decode an image fully into memory so the file can be rewritten afterwards"""
+    with Image.open(input_path) as image:
+        image.load()
+    return image
+
+def pillow_resize(image, width):
+    """Resize an in-memory image to the given width, keeping its aspect ratio"""
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+def pillow_placeholder(image):
+    """Low-quality placeholder of an in-memory image as {'color': ..., 'uri': ...}
+
+    `uri` is a blurred PLACEHOLDER_WIDTH-pixel WebP thumbnail as a data URI
+    and `color` its dominant colour, shown where WebP is not supported.
+    Images with an alpha channel get an empty dict, since the placeholder
+    would show through any transparent pixels.
+    """
+    if image.mode in ('RGBA', 'RGBa', 'LA', 'La', 'PA') or 'transparency' in image.info:
+        return {}
+    thumbnail = pillow_resize(image.convert('RGB'), PLACEHOLDER_WIDTH)
+    
+    # The most common of a handful of colours, rather than a muddy average
+    quantized = thumbnail.quantize(colors=4)
+    _, index = max(quantized.getcolors())
+    red, green, blue = quantized.getpalette()[index * 3:index * 3 + 3]
+    
+    buffer = io.BytesIO()
+    thumbnail.filter(ImageFilter.GaussianBlur(PLACEHOLDER_BLUR)).save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY)
+    return {
+        'color': f"#{red:02x}{green:02x}{blue:02x}",
+        'uri': "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode('ascii'),
+    }
+
+def placeholder_css(placeholder):
+    """The background declaration that shows a placeholder behind its <img> until it loads"""
+    return f"background: {placeholder['color']} url({placeholder['uri']}) center / cover no-repeat"
+
+def placeholder_class(image_name):
+    """The class naming the placeholder rule of an image, e.g. img-placeholder-seven-principles"""
+    return f"{PLACEHOLDER_CLASS}-" + re.sub(r'[^a-z0-9-]+', '-', Path(image_name).stem.lower())
+
+def placeholder_stylesheet(placeholders):
+    """PLACEHOLDER_CSS for {image name: placeholder}, one rule per image"""
+    lines = ["/* Generated by optimize_images.py - blurred placeholders shown until each image loads */"]
+    for image_name, placeholder in sorted(placeholders.items()):
+        lines.append(f".{PLACEHOLDER_CLASS}.{placeholder_class(image_name)} {{ {placeholder_css(placeholder)}; }}")
+    return '\n'.join(lines) + '\n'
+
+def write_placeholder_stylesheet(site_dir, placeholders):
+    """Write PLACEHOLDER_CSS when its content changes; returns True if it was written"""
+    path = Path(site_dir) / PLACEHOLDER_CSS
+    content = placeholder_stylesheet(placeholders)
+    if path.exists() and path.read_text(encoding='utf-8') == content:
+        return False
+    path.write_text(content, encoding='utf-8')
+    return True
+
+def strip_jpeg_metadata(data):
+    """JPEG bytes without EXIF, XMP and comment segments
+
+    Only the marker segments before the image data are filtered; the
+    compressed image data is copied as is, so no quality is lost.
+    """
+    if data[:2] != b'\xff\xd8':
+        raise ValueError("not a JPEG file")
+    kept = [data[:2]]
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            raise ValueError("corrupt JPEG marker")
+        code = data[position + 1]
+        if code == 0xFF:
+            # Fill byte before a marker
+            position += 1
+            continue
+        if code == 0xDA:
+            # Start of scan: everything from here on is image data
+            kept.append(data[position:])
+            return b''.join(kept)
+        length = struct.unpack('>H', data[position + 2:position + 4])[0]
+        segment = data[position:position + 2 + length]
+        if not ((0xE0 <= code <= 0xEF and code not in JPEG_KEPT_SEGMENTS) or code == 0xFE):
+            kept.append(segment)
+        position += 2 + length
+    raise ValueError("JPEG has no image data")
+
+def pillow_optimize_original(image, image_path):
+    """Recompress an original in place without losing quality
+
+    PNGs are re-encoded losslessly. JPEGs only have their metadata stripped:
+    re-encoding them would lose quality every time the cache is missed.
+    Either way the file is only replaced when the result is smaller.
+    """
+    image_path = Path(image_path)
+    if PILLOW_FORMATS[image_path.suffix.lower()] != 'JPEG':
+        pillow_save(image, image_path, keep_smaller_of=image_path)
+        return
+    data = image_path.read_bytes()
+    stripped = strip_jpeg_metadata(data)
+    if len(stripped) < len(data):
+        with open(image_path, 'wb') as f:
+            f.write(stripped)
+
+def pillow_optimize(input_path, output_path):
+    """Recompress a JPEG or PNG in-process with Pillow, without losing quality"""
+    try:
+        if Path(input_path) != Path(output_path):
+            shutil.copy2(input_path, output_path)
+        pillow_optimize_original(pillow_open(output_path), output_path)
+        return True
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error optimizing '{input_path}' with Pillow: {e}")
+        return False
+
+def pillow_convert(input_path, output_path, quality=80, target_ssim=None):
+    """Create a WebP or AVIF version of an image in-process with Pillow"""
+    try:
+        pillow_save(pillow_open(input_path), output_path, quality, target_ssim=target_ssim)
+        return True
+    except (OSError, ValueError) as e:
+        print(f"Error creating '{output_path}' with Pillow: {e}")
+        return False
+
+def variant_paths(input_path, base_name, size):
+    """Paths of the resized image and its WebP version for one width"""
+    input_path = Path(input_path)
+    return (input_path.parent / f"{base_name}-{size}w{input_path.suffix}",
+            input_path.parent / f"{base_name}-{size}w.webp")
+
+def pillow_write_formats(image, image_path, avif=False, target_ssim=None, original=False, source=None):
+    """Write an in-memory image in its own format plus WebP (and AVIF)
+
+    With `original`, image_path is the source itself and is only recompressed
+    losslessly (see pillow_optimize_original()). For a responsive variant,
+    `source` is the full-size image it was made from: each format that does
+    not come out smaller than the source's file in that format is written as
+    a copy of that file instead, so a variant never costs more bytes.
+    """
+    image_path = Path(image_path)
+
+    def source_file(suffix):
+        candidate = Path(source).with_suffix(suffix) if source else None
+        return candidate if candidate is not None and candidate.is_file() else None
+
+    if original:
+        pillow_optimize_original(image, image_path)
+    else:
+        pillow_save(image, image_path, 85, keep_smaller_of=source_file(image_path.suffix), target_ssim=target_ssim)
+    pillow_save(image, image_path.with_suffix('.webp'), 80, keep_smaller_of=source_file('.webp'),
+                target_ssim=target_ssim)
+    if avif:
+        pillow_save(image, image_path.with_suffix('.avif'), AVIF_QUALITY, keep_smaller_of=source_file('.avif'),
+                    target_ssim=target_ssim)
+
+def pillow_write_variants(image, input_path, base_name, sizes, resize_mode='cascade', avif=False,
+                          target_ssim=None):
+    """Write every responsive width, and its WebP (and AVIF) version, from in-memory pixels
+
+    In cascade mode widths are produced largest first, each resampled from
+    the previous one, so only the first step touches the full-size pixels.
+    """
+    resized = image
+    for size in sorted(sizes, reverse=True):
+        resized = pillow_resize(resized if resize_mode == 'cascade' else image, size)
+        resized_path, _ = variant_paths(input_path, base_name, size)
+        pillow_write_formats(resized, resized_path, avif, target_ssim, source=input_path)
+
+def pillow_create_variants(input_path, base_name, sizes, resize_mode='cascade', avif=False, target_ssim=None):
+    """Create all responsive variants of an image from a single decode"""
+    try:
+        pillow_write_variants(pillow_open(input_path), input_path, base_name, sizes, resize_mode, avif,
+                              target_ssim)
+        return True
+    except (OSError, ValueError) as e:
+        print(f"Error creating variants of '{input_path}' with Pillow: {e}")
+        return False
+
+def pillow_process_image(input_path, sizes=(), resize_mode='cascade', avif=False, target_ssim=None,
+                         placeholder=False):
+    """Run the whole pipeline for one image from a single decode
+
+    The original is recompressed losslessly, then its WebP (and AVIF)
+    version and every responsive width are derived from the same in-memory
+    pixels. With
+    `placeholder`, the image's placeholder (see pillow_placeholder()) is
+    returned instead of True.
+    """
+    input_path = Path(input_path)
+    try:
+        image = pillow_open(input_path)
+        pillow_write_formats(image, input_path, avif, target_ssim, original=True)
+        pillow_write_variants(image, input_path, input_path.stem, sizes, resize_mode, avif, target_ssim)
+        return pillow_placeholder(image) if placeholder else True
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error processing '{input_path}' with Pillow: {e}")
+        return False
+
+@lru_cache(maxsize=None)
+def tool_version(tool):
+    """Return the version banner of an external tool, or None if it is missing"""
+    if tool == 'pillow':
+        return f"Pillow {PIL.__version__}" if Image is not None else None
+    
+    flags = {'optipng': '-v', 'cwebp': '-version'}
+    try:
+        result = subprocess.run([tool, flags.get(tool, '--version')], capture_output=True, text=True)
+    except OSError:
+        return None
+    output = (result.stdout or result.stderr).strip()
+    return output.splitlines()[0] if output else None
+
+class ImageCache:
+    """Persistent manifest of pipeline tasks whose outputs are up to date
+
+    Each task is recorded under a fingerprint of its source content hash,
+    its encoder settings and the version of the tool that ran it, together
+    with the sizes of the files it produced. A task is only run again when
+    one of those changes or an output goes missing. The placeholders of
+    content images are kept alongside, under the hash of the image they
+    were made from.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.hashes = {}
+        self.tasks = {}
+        self.placeholders = {}
+        
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Ignoring unreadable image cache {self.path}: {e}")
+                data = {}
+            if data.get('version') == self.VERSION:
+                self.hashes = data.get('hashes', {})
+                self.tasks = data.get('tasks', {})
+                self.placeholders = data.get('placeholders', {})
+    
+    def _key(self, path):
+        """Store paths relative to the manifest so it survives checkouts elsewhere"""
+        return os.path.relpath(path, self.path.parent)
+    
+    def file_hash(self, path):
+        """Content hash of a file, reusing the stored hash while size and mtime match"""
+        stat = os.stat(path)
+        key = self._key(path)
+        entry = self.hashes.get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+        
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+        self.hashes[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+        return digest.hexdigest()
+    
+    def fingerprint(self, task):
+        """Fingerprint of everything that determines a task's outputs"""
+        settings = dict(task.settings)
+        settings['tool_version'] = tool_version(settings['tool'])
+        payload = json.dumps([self.file_hash(task.source), settings], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def is_fresh(self, key, task):
+        """Whether a task already produced its outputs from the current source"""
+        entry = self.tasks.get(key)
+        if not entry or not os.path.exists(task.source):
+            return False
+        for output, size in entry['outputs'].items():
+            output_path = self.path.parent / output
+            if not output_path.is_file() or output_path.stat().st_size != size:
+                return False
+        return entry['fingerprint'] == self.fingerprint(task)
+    
+    def record(self, key, task):
+        """Remember a task that just succeeded
+
+        The fingerprint is taken after the task ran, so an original that was
+        compressed in place is recognised as already optimized next time.
+        """
+        self.tasks[key] = {
+            'fingerprint': self.fingerprint(task),
+            'outputs': {self._key(output): os.path.getsize(output) for output in task.outputs},
+        }
+    
+    def placeholder_fingerprint(self, path):
+        """Fingerprint of an image's content and the placeholder settings"""
+        # 'opaque': images with an alpha channel no longer get one
+        settings = [PLACEHOLDER_WIDTH, PLACEHOLDER_BLUR, PLACEHOLDER_QUALITY, 'opaque']
+        return hashlib.sha256(json.dumps([self.file_hash(path), settings]).encode('utf-8')).hexdigest()
+    
+    def placeholder(self, path):
+        """Recorded placeholder of an image, or None when it is missing or stale"""
+        entry = self.placeholders.get(self._key(path))
+        if not entry or entry['fingerprint'] != self.placeholder_fingerprint(path):
+            return None
+        return entry['placeholder']
+    
+    def record_placeholder(self, path, placeholder):
+        self.placeholders[self._key(path)] = {
+            'fingerprint': self.placeholder_fingerprint(path),
+            'placeholder': placeholder,
+        }
+    
+    def save(self):
+        """Write the manifest atomically, dropping entries of deleted files"""
+        self.hashes = {
+            key: entry for key, entry in self.hashes.items()
+            if (self.path.parent / key).exists()
+        }
+        self.placeholders = {
+            key: entry for key, entry in self.placeholders.items()
+            if (self.path.parent / key).exists()
+        }
+        data = {'version': self.VERSION, 'hashes': self.hashes, 'tasks': self.tasks,
+                'placeholders': self.placeholders}
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp_path, self.path)
+
+class ImageTask:
+    """A single step of the image pipeline and the steps it depends on
+
+    `source` is the file the step reads, `outputs` the files it writes and
+    `settings` the encoder options that, together with the source content,
+    determine those outputs (used by the build cache).
+    """
+
+    def __init__(self, key, label, func, args, source, outputs, settings, deps=()):
+        self.key = key
+        self.label = label
+        self.func = func
+        self.args = args
+        self.source = str(source)
+        self.outputs = [str(output) for output in outputs]
+        self.settings = settings
+        self.deps = tuple(deps)
+
+def plan_variant_tasks(input_path, base_name, sizes=RESPONSIVE_SIZES, deps=(), backend='tools',
+                       resize_mode='cascade', avif=False, target_ssim=None):
+    """Build the tasks that create the responsive widths of an image
+
+    Pillow creates every width from one decode in a single task. With the
+    external tools, cascade mode resizes all widths in one ImageMagick pass
+    and then converts each to WebP (and AVIF); independent mode runs a
+    resize -> WebP chain per width from the original. `sizes` should
+    already be filtered with usable_widths().
+    """
+    input_path = Path(input_path)
+    sizes = sorted(sizes, reverse=True)
+    if not sizes:
+        return []
+    
+    if backend == 'pillow':
+        outputs = [path for size in sizes for path in variant_paths(input_path, base_name, size)]
+        if avif:
+            outputs += [variant_paths(input_path, base_name, size)[1].with_suffix('.avif') for size in sizes]
+        return [ImageTask("variants", "📱 Create responsive variants", pillow_create_variants,
+                          (str(input_path), base_name, sizes, resize_mode, avif, target_ssim), input_path, outputs,
+                          {'tool': 'pillow', 'sizes': sizes, 'resize_mode': resize_mode, 'quality': 85,
+                           'webp_quality': 80, 'avif_quality': AVIF_QUALITY if avif else None,
+                           'target_ssim': target_ssim}, deps)]
+    
+    tasks = []
+    if resize_mode == 'cascade':
+        resized = [(variant_paths(input_path, base_name, size)[0], size) for size in sizes]
+        tasks.append(ImageTask("resize", "📱 Resize to " + " → ".join(f"{size}w" for size in sizes),
+                               create_resized_images, (str(input_path), [(str(path), size) for path, size in resized]),
+                               input_path, [path for path, _ in resized],
+                               {'tool': 'convert', 'sizes': sizes, 'resize_mode': resize_mode, 'quality': 85}, deps))
+        resize_keys = {size: "resize" for size in sizes}
+    else:
+        resize_keys = {}
+        for size in sizes:
+            resized_path = variant_paths(input_path, base_name, size)[0]
+            tasks.append(ImageTask(f"resize-{size}", f"📱 Resize to {size}w", create_resized_image,
+                                   (str(input_path), str(resized_path), size),
+                                   input_path, [resized_path],
+                                   {'tool': 'convert', 'width': size, 'quality': 85}, deps))
+            resize_keys[size] = f"resize-{size}"
     
     for size in sizes:
-        # Create resized version
-        resized_name = f"{base_name}-{size}w{input_path.suffix}"
-        resized_path = input_path.parent / resized_name
+        resized_path, resized_webp_path = variant_paths(input_path, base_name, size)
+        tasks.append(ImageTask(f"webp-{size}", f"🌐 Create {size}w WebP", create_webp,
+                               (str(resized_path), str(resized_webp_path), 80),
+                               resized_path, [resized_webp_path],
+                               {'tool': 'cwebp', 'quality': 80}, [resize_keys[size]]))
+        if avif:
+            resized_avif_path = resized_webp_path.with_suffix('.avif')
+            tasks.append(ImageTask(f"avif-{size}", f"🌌 Create {size}w AVIF", create_avif,
+                                   (str(resized_path), str(resized_avif_path), AVIF_QUALITY),
+                                   resized_path, [resized_avif_path],
+                                   {'tool': 'avifenc', 'quality': AVIF_QUALITY}, [resize_keys[size]]))
+    
+    return tasks
+
+def create_responsive_variants(input_path, base_name, sizes=RESPONSIVE_SIZES, cache=None, backend='tools',
+                               resize_mode='cascade', avif=False, target_ssim=None):
+    """Create responsive image variants at different sizes
+
+    Widths larger than the source are skipped instead of upscaled, and
+    variants left at such widths are deleted. With a cache, variants whose
+    outputs are already up to date are kept.
+    """
+    input_path = Path(input_path)
+    variants = []
+    failed = set()
+    sizes = usable_widths(input_path, sizes)
+    remove_upscaled_variants(input_path)
+    
+    for task in plan_variant_tasks(input_path, base_name, sizes, backend=backend, resize_mode=resize_mode,
+                                   avif=avif, target_ssim=target_ssim):
+        if any(dep in failed for dep in task.deps):
+            failed.add(task.key)
+            continue
         
-        # Resize using ImageMagick
-        command = f"convert '{input_path}' -resize {size}x -quality 85 '{resized_path}'"
-        if run_command(command):
-            variants.append((resized_path, size))
-            
-            # Create WebP version
-            webp_name = f"{base_name}-{size}w.webp"
-            webp_path = input_path.parent / webp_name
-            create_webp(resized_path, webp_path, 80)
-            variants.append((webp_path, size))
+        cache_key = f"{input_path.name}:{task.key}"
+        if cache is None or not cache.is_fresh(cache_key, task):
+            if not task.func(*task.args):
+                failed.add(task.key)
+                continue
+            if cache is not None:
+                cache.record(cache_key, task)
+        for output in task.outputs:
+            size = int(re.search(r'-(\d+)w\.[^.]+$', output).group(1))
+            variants.append((Path(output), size))
     
     return variants
 
-def optimize_images():
-    """Main function to optimize all images"""
-    images_dir = Path("/workspaces/leading-powerful-conversations-website/site/images")
-    
-    # Images that should get responsive variants (main content images)
-    responsive_images = [
-        "steve-ellis-photo.png",
-        "FrameworkFull.png", 
-        "Leading-Powerful-Convesations-Front-Cover.jpg",
-        "Leading-Powerful-Convesations-Back-Cover.jpg",
-        "seven-principles.png"
-    ]
-    
-    # Images to skip (favicons and small icons)
-    skip_images = [
-        "favicon.ico",
-        "favicon.svg", 
-        "favicon-96x96.png",
-        "apple-touch-icon.png",
-        "web-app-manifest-192x192.png",
-        "web-app-manifest-512x512.png"
-    ]
-    
-    print("🖼️  Starting image optimization...")
-    
-    for image_file in images_dir.glob("*"):
-        if image_file.is_file() and image_file.name not in skip_images:
-            print(f"\n📸 Processing: {image_file.name}")
-            
-            # Get file extension
-            ext = image_file.suffix.lower()
-            base_name = image_file.stem
-            
-            # Optimize original image
-            if ext in ['.jpg', '.jpeg']:
-                print(f"  🗜️  Optimizing JPEG...")
-                optimize_jpeg(str(image_file), quality=85)
-            elif ext in ['.png']:
-                print(f"  🗜️  Optimizing PNG...")
-                optimize_png(str(image_file))
+def plan_image_tasks(image_file, backend='tools', resize_mode='cascade', avif=False, target_ssim=None):
+    """Build the dependency graph of pipeline tasks for a single image
+
+    The original is optimized in place first; its WebP (and AVIF) version
+    and the responsive resizes only read the optimized file, so they can
+    run concurrently once it is done. Each resized WebP waits on its resize.
+    With Pillow the whole graph collapses into one task per image, which
+    decodes the source once and derives every output, including the
+    placeholder of a content image, from memory.
+    """
+    ext = image_file.suffix.lower()
+    sizes = usable_widths(image_file, RESPONSIVE_SIZES) if image_file.name in RESPONSIVE_IMAGES else []
+    webp_path = image_file.with_suffix('.webp')
+    avif_path = image_file.with_suffix('.avif')
+    
+    if backend == 'pillow':
+        outputs = [image_file, webp_path] + ([avif_path] if avif else [])
+        outputs += [path for size in sizes for path in variant_paths(image_file, image_file.stem, size)]
+        if avif:
+            outputs += [variant_paths(image_file, image_file.stem, size)[1].with_suffix('.avif') for size in sizes]
+        return [ImageTask("process", "⚡ Optimize, convert and resize in-process", pillow_process_image,
+                          (str(image_file), sizes, resize_mode, avif, target_ssim,
+                           image_file.name in RESPONSIVE_IMAGES), image_file, outputs,
+                          {'tool': 'pillow', 'sizes': sizes, 'resize_mode': resize_mode, 'quality': 85,
+                           'original': 'lossless', 'webp_quality': 80, 'avif_quality': AVIF_QUALITY if avif else None,
+                           'target_ssim': target_ssim})]
+    
+    tasks = []
+    
+    # Optimize original image
+    optimize_deps = []
+    if ext in ['.jpg', '.jpeg']:
+        tasks.append(ImageTask("optimize", "🗜️  Optimize JPEG", optimize_jpeg, (str(image_file), None, 85),
+                               image_file, [image_file], {'tool': 'jpegoptim', 'quality': 85}))
+        optimize_deps = ["optimize"]
+    elif ext in ['.png']:
+        tasks.append(ImageTask("optimize", "🗜️  Optimize PNG", optimize_png, (str(image_file),),
+                               image_file, [image_file], {'tool': 'optipng', 'level': 2}))
+        optimize_deps = ["optimize"]
+    
+    # Create WebP version
+    tasks.append(ImageTask("webp", "🌐 Create WebP", create_webp, (str(image_file), str(webp_path), 80),
+                           image_file, [webp_path], {'tool': 'cwebp', 'quality': 80}, optimize_deps))
+    
+    # Create AVIF version
+    if avif:
+        tasks.append(ImageTask("avif", "🌌 Create AVIF", create_avif, (str(image_file), str(avif_path), AVIF_QUALITY),
+                               image_file, [avif_path], {'tool': 'avifenc', 'quality': AVIF_QUALITY}, optimize_deps))
+    
+    # Create responsive variants for main images
+    if sizes:
+        tasks.extend(plan_variant_tasks(image_file, image_file.stem, sizes, optimize_deps,
+                                        resize_mode=resize_mode, avif=avif))
+    
+    return tasks
+
+def is_generated_image(image_file):
+    """Whether a file is an output of the pipeline rather than a source image"""
+    if image_file.suffix.lower() in GENERATED_EXTENSIONS:
+        siblings = [image_file.with_suffix(ext) for ext in SOURCE_EXTENSIONS]
+        if any(sibling.exists() for sibling in siblings):
+            return True
+    
+    match = re.match(r'(.+)-(\d+)w$', image_file.stem)
+    if match and int(match.group(2)) in RESPONSIVE_SIZES:
+        return any(Path(name).stem == match.group(1) for name in RESPONSIVE_IMAGES)
+    return False
+
+def describe_variants(image_file, tasks):
+    """Report the size of each responsive variant against its full-size source"""
+    source_size = os.path.getsize(image_file)
+    lines = []
+    variants = []
+    for output in {output for task in tasks for output in task.outputs}:
+        match = re.search(r'-(\d+)w\.[^.]+$', output)
+        if match and os.path.exists(output):
+            variants.append((-int(match.group(1)), output))
+    
+    for _, output in sorted(variants):
+        size = os.path.getsize(output)
+        saved = source_size - size
+        if saved >= 0:
+            change = f"{saved / 1024:.1f} KB / {saved / source_size:.0%} saved vs source"
+        else:
+            change = f"{-saved / 1024:.1f} KB larger than source"
+        lines.append(f"     {Path(output).name}: {size / 1024:.1f} KB ({change})")
+    return lines
+
+def run_image_pipeline(image_files, jobs=None, cache=None, backend='tools', resize_mode='cascade', avif=False,
+                       target_ssim=None):
+    """Run the task graphs of all images on a worker pool
+
+    Tasks run as soon as their dependencies succeed; the work itself happens
+    in external processes or inside Pillow, which releases the GIL while
+    decoding, resizing and encoding, so a thread pool is enough to keep every
+    core busy. Tasks the cache reports as up to date are not run at all,
+    and placeholders returned by a task are recorded in the cache.
+    Progress is reported per image, in the order the images were given,
+    once all of that image's tasks have finished. Returns the number of
+    tasks that failed.
+    """
+    graphs = [plan_image_tasks(image_file, backend, resize_mode, avif, target_ssim) for image_file in image_files]
+    waiting = [list(tasks) for tasks in graphs]
+    results = [{} for _ in graphs]
+    running = {}
+    in_flight = [0] * len(graphs)
+    failures = 0
+    next_report = 0
+    
+    def cache_key(index, task):
+        return f"{image_files[index].name}:{task.key}"
+    
+    def run_task(index, task):
+        with span(f"{image_files[index].name}: {task.label}", 'image', cache='miss' if cache else None) as fields:
+            fields['bytes_in'] = file_bytes([task.source])
+            result = task.func(*task.args)
+            fields['bytes_out'] = file_bytes(task.outputs)
+        return result
+    
+    def schedule(executor):
+        """Submit every task whose dependencies have all finished"""
+        progress = True
+        while progress:
+            progress = False
+            for index, tasks in enumerate(waiting):
+                for task in list(tasks):
+                    if any(dep not in results[index] for dep in task.deps):
+                        continue
+                    tasks.remove(task)
+                    progress = True
+                    if not all(results[index][dep] in ('done', 'cached') for dep in task.deps):
+                        # A dependency failed, so this task cannot produce anything useful
+                        results[index][task.key] = 'skipped'
+                    elif cache is not None and cache.is_fresh(cache_key(index, task), task):
+                        results[index][task.key] = 'cached'
+                        record(f"{image_files[index].name}: {task.label}", 'image', cache='hit',
+                               bytes_out=file_bytes(task.outputs))
+                    else:
+                        running[executor.submit(run_task, index, task)] = (index, task)
+                        in_flight[index] += 1
+    
+    def report(index):
+        """Print the finished tasks of one image in plan order"""
+        outcomes = [results[index][task.key] for task in graphs[index]]
+        if cache is not None and all(outcome == 'cached' for outcome in outcomes):
+            print(f"♻️  [{index + 1}/{len(graphs)}] {image_files[index].name} is up to date")
+            return
+        
+        print(f"\n📸 [{index + 1}/{len(graphs)}] Processing: {image_files[index].name}")
+        for task, outcome in zip(graphs[index], outcomes):
+            if outcome == 'done':
+                print(f"  ✅ {task.label}")
+            elif outcome == 'cached':
+                print(f"  ♻️  {task.label} (up to date)")
+            elif outcome == 'failed':
+                print(f"  ❌ {task.label} failed")
+            else:
+                print(f"  ⏭️  {task.label} skipped (dependency failed)")
+        for line in describe_variants(image_files[index], graphs[index]):
+            print(line)
+    
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        schedule(executor)
+        while True:
+            while next_report < len(graphs) and not waiting[next_report] and not in_flight[next_report]:
+                report(next_report)
+                next_report += 1
             
-            # Create WebP version
-            print(f"  🌐 Creating WebP...")
-            webp_path = image_file.with_suffix('.webp')
-            create_webp(str(image_file), str(webp_path), 80)
+            if not running:
+                break
             
-            # Create responsive variants for main images
-            if image_file.name in responsive_images:
-                print(f"  📱 Creating responsive variants...")
-                variants = create_responsive_variants(str(image_file), base_name)
-                print(f"     Created {len(variants)} variants")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, task = running.pop(future)
+                in_flight[index] -= 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Exception in {task.label} for {image_files[index].name}: {e}")
+                    result = False
+                if result is not False:
+                    results[index][task.key] = 'done'
+                    if cache is not None:
+                        cache.record(cache_key(index, task), task)
+                        if isinstance(result, dict):
+                            cache.record_placeholder(image_files[index], result)
+                else:
+                    results[index][task.key] = 'failed'
+                    failures += 1
+            schedule(executor)
+    
+    return failures
+
+def list_source_images(images_dir=IMAGES_DIR):
+    """Source images the pipeline should process, in a stable order"""
+    return sorted(
+        image_file for image_file in Path(images_dir).glob("*")
+        if image_file.is_file()
+        and image_file.name not in SKIP_IMAGES
+        and not is_generated_image(image_file)
+    )
+
+def optimize_images(images_dir=IMAGES_DIR, jobs=None, cache_path=CACHE_PATH, backend=None, resize_mode='cascade',
+                    avif=False, target_ssim=None):
+    """Main function to optimize all images
+
+    Pass `cache_path=None` to ignore the build cache and redo all work, and
+    `backend='pillow'` to encode in-process instead of with the external
+    tools. `resize_mode` chooses how responsive widths are derived (see
+    RESIZE_MODES). `avif` also writes AVIF versions, and `target_ssim`
+    (Pillow only) replaces the fixed lossy qualities with a per-image search
+    for the smallest encoding that reaches that SSIM score. Returns True
+    when every pipeline task succeeded.
+    """
+    backend = backend or 'tools'
+    if backend == 'pillow' and Image is None:
+        print("❌ The pillow backend needs Pillow installed (pip install Pillow)")
+        return False
+    if backend == 'pillow' and avif and not features.check('avif'):
+        print("❌ This Pillow build cannot encode AVIF (upgrade to Pillow 11.3+ or use --backend tools)")
+        return False
+    if target_ssim is not None and backend != 'pillow':
+        print("❌ Quality search decodes candidates in-process and needs the pillow backend")
+        return False
+    
+    cache = ImageCache(cache_path) if cache_path else None
+    
+    print(f"🖼️  Starting image optimization with {jobs or os.cpu_count() or 1} worker(s) using the {backend} backend...")
+    
+    image_files = list_source_images(images_dir)
+    for image_file in image_files:
+        for name in remove_upscaled_variants(image_file):
+            print(f"🗑️  Removed {name}: wider than its source {image_file.name}")
+    
+    try:
+        failures = run_image_pipeline(image_files, jobs, cache, backend, resize_mode, avif, target_ssim)
+    finally:
+        if cache is not None:
+            cache.save()
+    
+    if failures:
+        print(f"\n❌ Image optimization finished with {failures} failed task(s)")
+        return False
     
     print("\n✅ Image optimization complete!")
+    return True
 
-def update_html_for_optimized_images():
-    """Update HTML files to use optimized images with fallbacks"""
-    site_dir = Path("/workspaces/leading-powerful-conversations-website/site")
-    
-    # Image replacements with responsive and WebP support
-    image_updates = {
-        'steve-ellis-photo.png': {
-            'responsive': True,
-            'alt': 'Steve Ellis - Leadership coach and author',
-            'sizes': '(max-width: 768px) 100vw, 400px'
-        },
-        'FrameworkFull.png': {
-            'responsive': True, 
-            'alt': 'Leading Powerful Conversations Framework',
-            'sizes': '(max-width: 768px) 100vw, 600px'
-        },
-        'Leading-Powerful-Convesations-Front-Cover.jpg': {
-            'responsive': True,
-            'alt': 'Leading Powerful Conversations book cover',
-            'sizes': '(max-width: 768px) 100vw, 300px'
-        },
-        'Leading-Powerful-Convesations-Back-Cover.jpg': {
-            'responsive': True,
-            'alt': 'Leading Powerful Conversations book back cover', 
-            'sizes': '(max-width: 768px) 100vw, 300px'
-        },
-        'seven-principles.png': {
-            'responsive': True,
-            'alt': 'Seven Principles of Leading Powerful Conversations',
-            'sizes': '(max-width: 768px) 100vw, 500px'
-        },
-        'Amazon-buy-now-button-300x113.png': {
-            'responsive': False,
-            'alt': 'Buy now on Amazon',
-            'webp_only': True
-        }
+def benchmark_backends(images_dir=IMAGES_DIR, backends=BACKENDS):
+    """Time the full per-image pipeline of each available backend
+
+    Every image is copied into a scratch directory per backend so the site
+    is left untouched, and tasks run one after another so the numbers are
+    the wall-clock cost of a single image rather than of the worker pool.
+    """
+    available = []
+    for backend in backends:
+        if backend == 'pillow' and Image is None:
+            print("⚠️  Skipping pillow backend: Pillow is not installed")
+        elif backend == 'tools' and not all(shutil.which(tool) for tool in ['optipng', 'jpegoptim', 'cwebp', 'convert']):
+            print("⚠️  Skipping tools backend: optipng, jpegoptim, cwebp and convert are required")
+        else:
+            available.append(backend)
+    
+    if not available:
+        return False
+    
+    print(f"\n⏱️  Per-image pipeline wall-clock time")
+    print(f"{'Image':<50}" + ''.join(f"{backend:>12}" for backend in available))
+    totals = {backend: 0.0 for backend in available}
+    
+    for image_file in list_source_images(images_dir):
+        timings = {}
+        for backend in available:
+            with tempfile.TemporaryDirectory() as scratch_dir:
+                scratch_image = Path(shutil.copy2(image_file, scratch_dir))
+                start = time.perf_counter()
+                for task in plan_image_tasks(scratch_image, backend):
+                    task.func(*task.args)
+                timings[backend] = time.perf_counter() - start
+                totals[backend] += timings[backend]
+        print(f"{image_file.name:<50}" + ''.join(f"{timings[backend]:>11.3f}s" for backend in available))
+    
+    print(f"{'Total':<50}" + ''.join(f"{totals[backend]:>11.3f}s" for backend in available))
+    if len(available) == 2 and totals['pillow'] > 0:
+        print(f"\n🚀 pillow is {totals['tools'] / totals['pillow']:.1f}x the speed of tools")
+    return True
+
+def existing_variants(directory, stem, extension):
+    """Responsive variants of an image that exist on disk, narrowest first
+
+    Returns (file name, width) for every <stem>-<N>w<extension> file in the
+    directory. Widths are read from the file header where the format allows,
+    so the srcset descriptors match the real pixels. Variants wider than
+    their source image are left out.
+    """
+    pattern = re.compile(rf'{re.escape(stem)}-(\d+)w{re.escape(extension)}')
+    upscaled = {
+        variant for source_extension in SOURCE_EXTENSIONS
+        if (Path(directory) / f"{stem}{source_extension}").is_file()
+        for variant in upscaled_variants(Path(directory) / f"{stem}{source_extension}")
     }
+    variants = []
+    for variant in Path(directory).glob(f"{glob.escape(stem)}-*w{extension}"):
+        match = pattern.fullmatch(variant.name)
+        if match and variant not in upscaled:
+            dimensions = read_image_size(variant)
+            variants.append((variant.name, dimensions[0] if dimensions else int(match.group(1))))
+    return sorted(variants, key=lambda variant: variant[1])
+
+def image_placeholder(path, cache=None):
+    """Placeholder of an image file, from the cache or decoded now (and recorded)
+
+    Images processed by the pillow backend already have theirs in the cache;
+    others (the tools backend, --no-cache) are decoded here. Returns an
+    empty dict when there is no placeholder, e.g. without Pillow.
+    """
+    if cache is not None:
+        placeholder = cache.placeholder(path)
+        if placeholder is not None:
+            return placeholder
+    if Image is None:
+        return {}
+    try:
+        placeholder = pillow_placeholder(pillow_open(path))
+    except (OSError, ValueError) as e:
+        print(f"Error creating placeholder for '{path}' with Pillow: {e}")
+        return {}
+    if cache is not None:
+        cache.record_placeholder(path, placeholder)
+    return placeholder
+
+def build_picture_html(image_name, config, site_dir=SITE_DIR, placeholder=None):
+    """Build the <picture> element that replaces a plain <img> for an optimized image"""
+    base_name = Path(image_name).stem
+    suffix = Path(image_name).suffix
+    images_dir = Path(site_dir) / "images"
+    
+    # Intrinsic size lets the browser reserve space before the image loads
+    dimensions = (images_dir / image_name).exists() and read_image_size(images_dir / image_name)
+    size_attrs = f' width="{dimensions[0]}" height="{dimensions[1]}"' if dimensions else ''
+    class_attr = f' class="{PLACEHOLDER_CLASS} {placeholder_class(image_name)}"' if placeholder else ''
+    img_html = f'<img src="images/{image_name}" alt="{config["alt"]}" loading="lazy"{size_attrs}{class_attr}>'
+    
+    if config['responsive']:
+        # One source per format, listing only the variants that were generated
+        sources = ''
+        for extension, mime_type in (('.avif', 'avif'), ('.webp', 'webp'), (suffix, suffix[1:])):
+            variants = existing_variants(images_dir, base_name, extension)
+            if not variants:
+                continue
+            srcset = ',\n                    '.join(f"images/{name} {width}w" for name, width in variants)
+            sources += f'''
+    <source type="image/{mime_type}"
+            sizes="{config['sizes']}"
+            srcset="{srcset}">'''
+        
+        # Create picture element with responsive sources and fallback
+        return f'''<picture>{sources}
+    {img_html}
+</picture>'''
+    
+    avif_source = ''
+    if (images_dir / f"{base_name}.avif").exists():
+        avif_source = f'''
+    <source type="image/avif" srcset="images/{base_name}.avif">'''
+    
+    # Simple WebP with fallback
+    return f'''<picture>{avif_source}
+    <source type="image/webp" srcset="images/{base_name}.webp">
+    {img_html}
+</picture>'''
+
+class ImageMarkupRewriter(TagRewriter):
+    """Brings the <img> and <source> tags of a page in line with the images on disk
+
+    In a single pass over the page:
+    - bare <img> tags for images in IMAGE_UPDATES are wrapped in <picture>
+      elements (images already inside a <picture> are left alone, which makes
+      the rewrite idempotent)
+    - <img> tags without width/height get the intrinsic size of the file,
+      read from its header, so the browser can reserve space for it
+    - srcset lists of responsive variants are rebuilt from the variants that
+      actually exist, with their real widths, and given a sizes attribute
+      from IMAGE_UPDATES when they have none
+    - with a `placeholder_for(path)` lookup (e.g. image_placeholder()),
+      <img> tags of content images get the placeholder classes, and the
+      placeholders in use are collected in self.placeholder_rules for
+      PLACEHOLDER_CSS; inline placeholders from earlier versions are removed
+    Referenced images that do not exist are collected in self.missing.
+    """
+
+    def __init__(self, content, site_dir=SITE_DIR, page_dir=None, image_updates=IMAGE_UPDATES,
+                 placeholder_for=None):
+        super().__init__(content)
+        self.site_dir = Path(site_dir)
+        self.page_dir = Path(page_dir) if page_dir else self.site_dir
+        self.image_updates = image_updates
+        self.placeholder_for = placeholder_for
+        self.pictures = {}
+        self.missing = []
+        self.wrapped = 0
+        self.sized = 0
+        self.srcsets = 0
+        self.placeholders = 0
+        self.placeholder_rules = {}
+
+    def resolve(self, url):
+        """Local file a URL on the page refers to, or None for external URLs"""
+        if not url or url.startswith(('http:', 'https:', '//', 'data:', '#')):
+            return None
+        path = unquote(url.split('#')[0].split('?')[0])
+        if path.startswith('/'):
+            return self.site_dir / path.lstrip('/')
+        return self.page_dir / path
+
+    def report_missing(self, url):
+        if url not in self.missing:
+            self.missing.append(url)
+
+    def intrinsic_size(self, attrs):
+        """width/height attributes to add to an <img>, as (name, value) pairs"""
+        values = dict(attrs)
+        if 'width' in values and 'height' in values:
+            return []
+        
+        path = self.resolve(values.get('src'))
+        if path is None:
+            return []
+        if not path.is_file():
+            self.report_missing(values['src'])
+            return []
+        dimensions = read_image_size(path)
+        if dimensions is None:
+            return []
+        
+        width, height = dimensions
+        if 'width' in values or 'height' in values:
+            # Keep the given dimension and scale the other to the image's aspect ratio
+            given = values.get('width') or values.get('height')
+            if not given.isdigit():
+                return []
+            if 'width' in values:
+                return [('height', str(round(int(given) * height / width)))]
+            return [('width', str(round(int(given) * width / height)))]
+        return [('width', str(width)), ('height', str(height))]
+
+    def updated_srcset(self, srcset):
+        """srcset rebuilt from the responsive variants on disk, or None to keep it"""
+        candidates = parse_srcset(srcset)
+        variants = self.rebuilt_candidates(candidates)
+        for url, _ in variants or candidates:
+            path = self.resolve(url)
+            if path is not None and not path.is_file():
+                self.report_missing(url)
+        if not variants or variants == candidates:
+            return None
+        return ', '.join(f"{url} {descriptor}" for url, descriptor in variants)
+
+    def rebuilt_candidates(self, candidates):
+        """srcset candidates for the variants on disk, or None when the set cannot be rebuilt"""
+        # Only width-described variant sets of a single image can be rebuilt
+        matches = [re.fullmatch(r'(.*?)([^/]+)-\d+w(\.\w+)', url) for url, _ in candidates]
+        if not candidates or not all(matches) or not all(d.endswith('w') for _, d in candidates):
+            return None
+        if len({match.groups() for match in matches}) != 1:
+            return None
+        prefix, stem, extension = matches[0].groups()
+        directory = self.resolve(prefix or './')
+        if directory is None:
+            return None
+        return [(prefix + name, f"{width}w") for name, width in existing_variants(directory, stem, extension)]
+
+    def default_sizes(self, srcset):
+        """sizes from IMAGE_UPDATES for the image a srcset belongs to"""
+        match = re.search(r'([^/\s]+)-\d+w\.\w+', srcset)
+        if match:
+            for image_name, config in self.image_updates.items():
+                if Path(image_name).stem == match.group(1) and config.get('sizes'):
+                    return config['sizes']
+        return None
+
+    def placeholder(self, path):
+        """Placeholder of a content image file, or an empty dict"""
+        if self.placeholder_for is None or path is None or path.name not in RESPONSIVE_IMAGES or not path.is_file():
+            return {}
+        return self.placeholder_for(path)
+
+    def placeholder_classes(self, values):
+        """class attribute with the image's current placeholder classes, or None to keep it"""
+        path = self.resolve(values.get('src'))
+        placeholder = self.placeholder(path)
+        classes = [name for name in (values.get('class') or '').split()
+                   if name != PLACEHOLDER_CLASS and not name.startswith(f"{PLACEHOLDER_CLASS}-")]
+        if placeholder:
+            self.placeholder_rules[path.name] = placeholder
+            classes += [PLACEHOLDER_CLASS, placeholder_class(path.name)]
+        updated = ' '.join(classes)
+        return updated if updated != ' '.join((values.get('class') or '').split()) else None
+
+    def on_starttag(self, tag, attrs, raw, self_closing):
+        if tag not in ('img', 'source'):
+            return None
+        values = dict(attrs)
+        
+        if tag == 'img' and not self.inside('picture'):
+            src = values.get('src') or ''
+            image_name = src[len('images/'):] if src.startswith('images/') else None
+            if image_name in self.image_updates:
+                placeholder = self.placeholder(self.site_dir / "images" / image_name)
+                if placeholder:
+                    self.placeholder_rules[image_name] = placeholder
+                if image_name not in self.pictures:
+                    self.pictures[image_name] = build_picture_html(image_name, self.image_updates[image_name],
+                                                                   self.site_dir, placeholder)
+                self.wrapped += 1
+                return self.pictures[image_name]
+        
+        updates = {}
+        added = []
+        if values.get('srcset'):
+            srcset = self.updated_srcset(values['srcset'])
+            if srcset is not None:
+                updates['srcset'] = srcset
+                self.srcsets += 1
+            if 'sizes' not in values and parse_srcset(values['srcset'])[0][1].endswith('w'):
+                sizes = self.default_sizes(values['srcset'])
+                if sizes:
+                    added.append(('sizes', sizes))
+        if tag == 'img':
+            size_attrs = self.intrinsic_size(attrs)
+            if size_attrs:
+                added.extend(size_attrs)
+                self.sized += 1
+            if self.placeholder_for is not None:
+                classes = self.placeholder_classes(values)
+                if values.get('style') and PLACEHOLDER_STYLE_RE.search(values['style']):
+                    updates['style'] = PLACEHOLDER_STYLE_RE.sub('', values['style']).strip() or None
+                if classes is not None:
+                    if 'class' not in values:
+                        added.append(('class', classes))
+                    else:
+                        updates['class'] = classes or None
+                if classes is not None or 'style' in updates:
+                    self.placeholders += 1
+        
+        if updates or added:
+            return add_attributes(replace_attributes(raw, updates), added)
+        return None
+
+def update_html_for_optimized_images(site_dir=SITE_DIR, cache_path=CACHE_PATH):
+    """Update HTML files to use optimized images with fallbacks
+
+    Placeholders come from the image manifest at `cache_path`; pass None to
+    decode every content image again instead.
+    """
+    site_dir = Path(site_dir)
+    cache = ImageCache(cache_path) if cache_path else None
+    missing = 0
+    placeholders = {}
     
     print("\n🔄 Updating HTML files...")
     
@@ -184,50 +1461,67 @@ def update_html_for_optimized_images():
         with open(html_file, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        original_content = content
+        rewriter = ImageMarkupRewriter(content, site_dir, html_file.parent,
+                                       placeholder_for=lambda path: image_placeholder(path, cache))
+        updated_content = rewriter.rewrite()
         
-        for image_name, config in image_updates.items():
-            base_name = Path(image_name).stem
-            
-            if config['responsive']:
-                # Create picture element with responsive WebP and fallback
-                picture_html = f'''<picture>
-    <source type="image/webp" 
-            sizes="{config['sizes']}"
-            srcset="images/{base_name}-300w.webp 300w,
-                    images/{base_name}-600w.webp 600w,
-                    images/{base_name}-1200w.webp 1200w">
-    <source type="image/{Path(image_name).suffix[1:]}"
-            sizes="{config['sizes']}"
-            srcset="images/{base_name}-300w{Path(image_name).suffix} 300w,
-                    images/{base_name}-600w{Path(image_name).suffix} 600w,
-                    images/{base_name}-1200w{Path(image_name).suffix} 1200w">
-    <img src="images/{image_name}" alt="{config['alt']}" loading="lazy">
-</picture>'''
-            else:
-                # Simple WebP with fallback
-                picture_html = f'''<picture>
-    <source type="image/webp" srcset="images/{base_name}.webp">
-    <img src="images/{image_name}" alt="{config['alt']}" loading="lazy">
-</picture>'''
-            
-            # Replace img tags that reference this image
-            img_pattern = rf'<img[^>]*src=["\']images/{re.escape(image_name)}["\'][^>]*>'
-            content = re.sub(img_pattern, picture_html, content)
+        for url in rewriter.missing:
+            print(f"    ⚠️  Missing image: {url}")
+        missing += len(rewriter.missing)
+        placeholders.update(rewriter.placeholder_rules)
         
         # Write back if content changed
-        if content != original_content:
+        if updated_content != content:
             with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"    ✅ Updated {html_file.name}")
+                f.write(updated_content)
+            print(f"    ✅ Updated {html_file.name} ({rewriter.wrapped} picture(s), "
+                  f"{rewriter.sized} image size(s), {rewriter.srcsets} srcset(s), "
+                  f"{rewriter.placeholders} placeholder(s))")
         else:
             print(f"    ℹ️  No changes needed for {html_file.name}")
     
+    if write_placeholder_stylesheet(site_dir, placeholders):
+        print(f"  🎨 Wrote {PLACEHOLDER_CSS} ({len(placeholders)} placeholder(s))")
+    if cache is not None:
+        cache.save()
+    if missing:
+        print(f"\n⚠️  {missing} referenced image(s) are missing - run the optimizer or fix the markup")
     print("\n✅ HTML updates complete!")
 
 if __name__ == "__main__":
-    optimize_images()
-    update_html_for_optimized_images()
+    parser = argparse.ArgumentParser(description="Optimize website images and update HTML to use them")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="number of pipeline tasks to run in parallel (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"ignore {CACHE_PATH.name} and redo all work")
+    parser.add_argument("--backend", choices=BACKENDS, default='tools',
+                        help="encode with the external tools (default) or in-process with Pillow")
+    parser.add_argument("--resize-mode", choices=RESIZE_MODES, default='cascade',
+                        help="derive each width from the previous one in a single pass (cascade), "
+                             "or each from the original (independent)")
+    parser.add_argument("--avif", action="store_true",
+                        help="also create AVIF versions and offer them first in <picture> sources")
+    parser.add_argument("--target-ssim", type=float, metavar="SCORE",
+                        help="pick the lowest JPEG/WebP/AVIF quality per image that still reaches "
+                             "this SSIM score, e.g. 0.98 (pillow backend only)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="time each backend per image on scratch copies and exit")
+    args = parser.parse_args()
+    
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.target_ssim is not None and not 0 < args.target_ssim <= 1:
+        parser.error("--target-ssim must be between 0 and 1")
+    
+    if args.benchmark:
+        sys.exit(0 if benchmark_backends() else 1)
+    
+    cache_path = None if args.no_cache else CACHE_PATH
+    if not optimize_images(jobs=args.jobs, cache_path=cache_path, backend=args.backend,
+                           resize_mode=args.resize_mode, avif=args.avif, target_ssim=args.target_ssim):
+        sys.exit(1)
+    with span("update pages", 'html'):
+        update_html_for_optimized_images(cache_path=cache_path)
     
     print("\n📊 Final Results:")
     print("• Original images optimized (PNG/JPEG compression)")
@@ -235,4 +1529,5 @@ if __name__ == "__main__":
     print("• Responsive image variants created for main content images")
     print("• HTML files updated with picture elements and responsive images")
     print("• Lazy loading added to all images")
+    print(f"• Blurred placeholders for content images in {PLACEHOLDER_CSS}")
     print("\nYour website images are now optimized for web performance! 🚀")
\ No newline at end of file
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Preview Server for Leading Powerful Conversations Website
+
+python3 -m http.server sends every file uncompressed, with no caching
+headers and at full local speed, so it says nothing about how the site
+loads for a visitor. This server behaves like the production host instead:
+1. Serves the precompressed .br/.gz siblings when the browser accepts them,
+   and compresses other text files on the fly (Vary: Accept-Encoding)
+2. Sends Cache-Control from the site's _headers file, or GitHub Pages'
+   default, with ETag and Last-Modified; conditional requests get a 304
+3. Answers Range requests (206/416), so PDFs and presentations in
+   resources/ can be read in parts
+4. Resolves /, /page and missing files the way GitHub Pages does
+   (index.html, page.html, 404.html)
+5. Optionally throttles every response to a network profile: a round trip
+   of latency before the response, and the body paced through one shared
+   link of the profile's bandwidth
+6. Logs each request with its start time relative to the latest page
+   request, time to first byte, total time and bytes sent, as a waterfall
+
+Preview the built site with --site-dir dist.
+"""
+
+import re
+import json
+import time
+import email.utils
+import hashlib
+import argparse
+import mimetypes
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, unquote
+
+from compress_assets import COMPRESSIBLE_SUFFIXES, MIN_SIZE, brotli_backend, compress_bytes
+
+# Configuration
+SITE_DIR = Path(__file__).resolve().parent / "site"
+DEFAULT_PORT = 8000
+HEADERS_NAME = "_headers"
+# What GitHub Pages sends for every file
+DEFAULT_CACHE_CONTROL = "max-age=600"
+# Round-trip latency in ms and download bandwidth in kbit/s, as in Chrome DevTools and Lighthouse
+NETWORK_PROFILES = {
+    'slow-3g': {'latency_ms': 2000, 'kbps': 400},
+    'fast-3g': {'latency_ms': 563, 'kbps': 1600},
+    'lighthouse-mobile': {'latency_ms': 150, 'kbps': 1600},
+    '4g': {'latency_ms': 170, 'kbps': 9000},
+    'cable': {'latency_ms': 28, 'kbps': 5000},
+}
+CHUNK_SIZE = 16 * 1024
+# Content codings served, and the suffix of their precompressed siblings
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+mimetypes.add_type('application/manifest+json', '.webmanifest')
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('image/avif', '.avif')
+mimetypes.add_type('text/javascript', '.js')
+
+def parse_headers_file(path):
+    """Rules from a Netlify/Cloudflare _headers file as (pattern regex, {header: value})"""
+    rules = []
+    if not path.exists():
+        return rules
+    for line in path.read_text(encoding='utf-8').splitlines():
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        if not line[0].isspace():
+            pattern = re.escape(line.strip()).replace(r'\*', '.*')
+            pattern = re.sub(r':\w+', '[^/]+', pattern)
+            rules.append((re.compile(pattern + '$'), {}))
+        elif rules and ':' in line:
+            name, value = line.split(':', 1)
+            rules[-1][1][name.strip()] = value.strip()
+    return rules
+
+def accepted_encodings(header):
+    """Content codings the client accepts, most preferred first"""
+    accepted = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        match = re.search(r'q=([\d.]+)', params)
+        if match:
+            quality = float(match.group(1))
+        if coding and quality > 0:
+            accepted[coding.strip().lower()] = quality
+    # br is cheaper on the wire, so it wins ties
+    return sorted((coding for coding in accepted if coding in ENCODINGS),
+                  key=lambda coding: (-accepted[coding], coding != 'br'))
+
+def parse_range(header, size):
+    """(start, end) of a single 'bytes=' range, None to ignore the header, or 'invalid' for 416"""
+    match = re.fullmatch(r'\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*', header or '')
+    if not match or not (match.group(1) or match.group(2)):
+        # Multiple ranges or another unit: send the whole file
+        return None
+    first, last = match.groups()
+    if not first:
+        length = int(last)
+        if length == 0:
+            return 'invalid'
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return 'invalid'
+    return start, end
+
+def etag_matches(header, etag):
+    if header is None:
+        return False
+    if header.strip() == '*':
+        return True
+    # Weak comparison, as for If-None-Match
+    candidates = [candidate.strip().removeprefix('W/') for candidate in header.split(',')]
+    return etag.removeprefix('W/') in candidates
+
+class Throttle:
+    """One shared link of a given bandwidth; every response body queues on it"""
+
+    def __init__(self, latency_ms, kbps):
+        self.latency = latency_ms / 1000
+        self.bytes_per_second = kbps * 1000 / 8
+        self.free_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait_latency(self):
+        time.sleep(self.latency)
+
+    def send(self, write, data):
+        for offset in range(0, len(data), CHUNK_SIZE):
+            chunk = data[offset:offset + CHUNK_SIZE]
+            with self.lock:
+                start = max(time.perf_counter(), self.free_at)
+                self.free_at = start + len(chunk) / self.bytes_per_second
+                done = self.free_at
+            delay = done - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            write(chunk)
+
+class Representation:
+    """The bytes sent for one file in one content coding"""
+
+    def __init__(self, data, encoding, mtime):
+        self.data = data
+        self.encoding = encoding
+        self.mtime = mtime
+        suffix = f"-{encoding}" if encoding else ''
+        self.etag = f'"{hashlib.sha1(data).hexdigest()[:16]}{suffix}"'
+
+class PreviewServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, site_dir, throttle=None, cache_control=DEFAULT_CACHE_CONTROL,
+                 compress=True, log_path=None):
+        super().__init__(address, PreviewRequestHandler)
+        self.site_dir = Path(site_dir).resolve()
+        self.throttle = throttle
+        self.cache_control = cache_control
+        self.compress = compress
+        self.brotli = brotli_backend()
+        self.header_rules = parse_headers_file(self.site_dir / HEADERS_NAME)
+        self.log_file = open(log_path, 'a', encoding='utf-8') if log_path else None
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.page_start = None
+
+    def representation(self, path, encodings):
+        """The best Representation of a file for the accepted encodings"""
+        stat = path.stat()
+        for encoding in encodings + [None]:
+            key = (path, stat.st_mtime_ns, encoding)
+            with self.lock:
+                if key in self.cache:
+                    return self.cache[key]
+            if encoding is None:
+                data = path.read_bytes()
+            else:
+                sibling = path.with_name(path.name + ENCODINGS[encoding])
+                if sibling.exists() and sibling.stat().st_mtime >= stat.st_mtime:
+                    data = sibling.read_bytes()
+                elif (self.compress and path.suffix.lower() in COMPRESSIBLE_SUFFIXES
+                      and stat.st_size >= MIN_SIZE and (encoding == 'gzip' or self.brotli)):
+                    data = compress_bytes(path.read_bytes(), 'gz' if encoding == 'gzip' else 'br', self.brotli)
+                    if len(data) >= stat.st_size:
+                        continue
+                else:
+                    continue
+            representation = Representation(data, encoding, stat.st_mtime)
+            with self.lock:
+                self.cache[key] = representation
+            return representation
+
+    def headers_for(self, url_path):
+        headers = {'Cache-Control': self.cache_control}
+        for pattern, values in self.header_rules:
+            if pattern.match(url_path):
+                headers.update(values)
+        return headers
+
+    def log_request_timing(self, entry):
+        with self.lock:
+            if entry['type'] == 'text/html' or self.page_start is None:
+                self.page_start = entry['started']
+            entry['offset_ms'] = round((entry.pop('started') - self.page_start) * 1000, 1)
+            encoding = entry['encoding'] or '-'
+            print(f"  +{entry['offset_ms']:8.1f}ms {entry['status']} {entry['method']:<4} {entry['path'][:60]:<60} "
+                  f"{encoding:<5} {entry['bytes'] / 1024:7.1f} KB  TTFB {entry['ttfb_ms']:6.1f}ms  "
+                  f"total {entry['total_ms']:7.1f}ms")
+            if self.log_file:
+                self.log_file.write(json.dumps(entry) + '\n')
+                self.log_file.flush()
+
+class PreviewRequestHandler(BaseHTTPRequestHandler):
+    server_version = "PreviewServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Requests are logged with their timings instead
+        pass
+
+    def resolve(self, url_path):
+        """(file, status) for a URL path, falling back like GitHub Pages"""
+        site_dir = self.server.site_dir
+        relative = unquote(url_path).lstrip('/')
+        target = (site_dir / relative).resolve()
+        if target != site_dir and site_dir not in target.parents:
+            return None, HTTPStatus.NOT_FOUND
+        candidates = [target / 'index.html'] if target.is_dir() else [target, target.with_name(target.name + '.html')]
+        for candidate in candidates:
+            if candidate.is_file() and not candidate.name == HEADERS_NAME:
+                return candidate, HTTPStatus.OK
+        not_found = site_dir / '404.html'
+        return (not_found if not_found.is_file() else None), HTTPStatus.NOT_FOUND
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body):
+        started = time.perf_counter()
+        url_path = urlsplit(self.path).path
+        self.sent_bytes = 0
+        self.first_byte = None
+        throttle = self.server.throttle
+        if throttle:
+            throttle.wait_latency()
+
+        if not url_path.endswith('/') and (self.server.site_dir / unquote(url_path).lstrip('/')).is_dir():
+            # /resources -> /resources/, as GitHub Pages does
+            self.send_status(HTTPStatus.MOVED_PERMANENTLY, {'Location': url_path + '/'})
+            return self.finish_log(started, url_path, HTTPStatus.MOVED_PERMANENTLY, None, 'text/html')
+
+        path, status = self.resolve(url_path)
+        if path is None:
+            self.send_status(status, {})
+            return self.finish_log(started, url_path, status, None, 'text/plain')
+
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        range_header = self.headers.get('Range') if status == HTTPStatus.OK else None
+        # A byte range refers to the uncompressed file
+        encodings = [] if range_header else accepted_encodings(self.headers.get('Accept-Encoding'))
+        representation = self.server.representation(path, encodings)
+
+        headers = {'Content-Type': content_type + ('; charset=utf-8' if content_type.startswith('text/')
+                                                    or content_type.endswith(('json', 'javascript', 'xml')) else ''),
+                   'ETag': representation.etag,
+                   'Last-Modified': email.utils.formatdate(representation.mtime, usegmt=True),
+                   'Accept-Ranges': 'bytes'}
+        if path.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+            headers['Vary'] = 'Accept-Encoding'
+        if representation.encoding:
+            headers['Content-Encoding'] = representation.encoding
+        headers.update(self.server.headers_for('/' + path.relative_to(self.server.site_dir).as_posix()))
+
+        if status == HTTPStatus.OK and self.not_modified(representation):
+            self.send_status(HTTPStatus.NOT_MODIFIED, {key: value for key, value in headers.items()
+                                                       if key in ('ETag', 'Cache-Control', 'Vary', 'Last-Modified')})
+            return self.finish_log(started, url_path, HTTPStatus.NOT_MODIFIED, representation.encoding, content_type)
+
+        data = representation.data
+        if range_header and (self.headers.get('If-Range') in (None, representation.etag)):
+            byte_range = parse_range(range_header, len(data))
+            if byte_range == 'invalid':
+                self.send_status(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, {'Content-Range': f"bytes */{len(data)}"})
+                return self.finish_log(started, url_path, HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, None, content_type)
+            if byte_range:
+                start, end = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+                headers['Content-Range'] = f"bytes {start}-{end}/{len(data)}"
+                data = data[start:end + 1]
+
+        headers['Content-Length'] = str(len(data))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.first_byte = time.perf_counter()
+        if send_body:
+            try:
+                if throttle:
+                    throttle.send(self.wfile.write, data)
+                else:
+                    self.wfile.write(data)
+                self.sent_bytes = len(data)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        self.finish_log(started, url_path, status, representation.encoding, content_type)
+
+    def not_modified(self, representation):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag_matches(if_none_match, representation.etag)
+        since = self.headers.get('If-Modified-Since')
+        if since:
+            try:
+                return int(representation.mtime) <= email.utils.parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def send_status(self, status, headers):
+        """A response without a body (redirect, 304, 404 without a page, 416)"""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Length', '0')
+        self.end_headers()
+        self.first_byte = time.perf_counter()
+
+    def finish_log(self, started, url_path, status, encoding, content_type):
+        finished = time.perf_counter()
+        self.server.log_request_timing({
+            'started': started, 'method': self.command, 'path': url_path, 'status': int(status),
+            'type': content_type, 'encoding': encoding, 'bytes': self.sent_bytes,
+            'ttfb_ms': round(((self.first_byte or finished) - started) * 1000, 1),
+            'total_ms': round((finished - started) * 1000, 1),
+        })
+
+def serve(site_dir=SITE_DIR, port=DEFAULT_PORT, bind='127.0.0.1', network=None, cache_control=DEFAULT_CACHE_CONTROL,
+          compress=True, log_path=None):
+    site_dir = Path(site_dir)
+    if not site_dir.is_dir():
+        print(f"❌ {site_dir} is not a directory")
+        return False
+    throttle = Throttle(**NETWORK_PROFILES[network]) if network else None
+    server = PreviewServer((bind, port), site_dir, throttle, cache_control, compress, log_path)
+
+    print(f"🌐 Serving {site_dir} at http://{bind}:{port}/")
+    if throttle:
+        profile = NETWORK_PROFILES[network]
+        print(f"  🐢 Throttled to {network}: {profile['latency_ms']} ms latency, {profile['kbps']} kbit/s")
+    if server.header_rules:
+        print(f"  📋 {len(server.header_rules)} rule(s) from {HEADERS_NAME}")
+    print(f"  🗜️  Compression: {'gzip and brotli' if compress and server.brotli else 'gzip' if compress else 'precompressed files only'}")
+    print("  Press Ctrl+C to stop\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    finally:
+        server.server_close()
+        if server.log_file:
+            server.log_file.close()
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preview the site with production-like compression, caching and network speed")
+    parser.add_argument("--site-dir", type=Path, default=SITE_DIR,
+                        help="site directory to serve (default: site/; use dist for the built site)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--bind", default='127.0.0.1',
+                        help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--network", choices=list(NETWORK_PROFILES),
+                        help="throttle responses to a network profile")
+    parser.add_argument("--cache-control", default=DEFAULT_CACHE_CONTROL,
+                        help=f"Cache-Control for files without a {HEADERS_NAME} rule (default: {DEFAULT_CACHE_CONTROL})")
+    parser.add_argument("--no-compress", action="store_true",
+                        help="only send precompressed .br/.gz files, never compress on the fly")
+    parser.add_argument("--log", metavar="PATH",
+                        help="also append each request's timings to a JSON Lines file")
+    args = parser.parse_args()
+
+    if not serve(args.site_dir, args.port, args.bind, args.network, args.cache_control,
+                 not args.no_compress, args.log):
+        exit(1)
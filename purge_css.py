@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Unused CSS Analyzer for Leading Powerful Conversations Website
+
+Every page loads every CSS module, although error.css only matters to
+404.html and the carousel rules only to pages with carousels. This script:
+1. Indexes the selectors of every stylesheet under site/css/
+2. Indexes the elements, classes and ids of every page, plus the class names
+   and attributes the page's scripts in site/js/ toggle at runtime
+3. Reports selectors no page can match, and how much of its stylesheet each
+   page actually uses
+4. Optionally writes a purged stylesheet per page (css/pages/<page>.css)
+   and points the page at it
+
+Selectors are kept whenever they could match: :hover, :focus, :checked and
+similar states, script-toggled classes and anything not understood count as
+used.
+"""
+
+import re
+import json
+import argparse
+from pathlib import Path
+
+from css_tools import (flatten_stylesheet, parse_stylesheet, serialize_rules, select_rules,
+                       ElementIndex, SelectorMatcher)
+from html_tools import parse_document
+from bundle_css import BUNDLE_STYLESHEET, update_page_links
+
+# Configuration
+SITE_DIR = Path(__file__).resolve().parent / "site"
+# Per-page purged stylesheets are written here
+PURGED_DIR = "css/pages"
+
+# Class names and attributes scripts add at runtime
+CLASS_LIST_RE = re.compile(r'classList\.(?:add|remove|toggle|replace|contains)\(([^)]*)\)')
+CLASS_NAME_RE = re.compile(r'''className\s*\+?=\s*(["'`])(.*?)\1''')
+CLASS_ATTRIBUTE_RE = re.compile(r'''class(?:Name)?\s*[=,]\s*\\?(["'])([^"'`]*)\\?\1''')
+SET_ATTRIBUTE_RE = re.compile(r'''(?:set|toggle)Attribute\(\s*(["'])([\w-]+)\1''')
+DATASET_RE = re.compile(r'dataset\.(\w+)')
+STRING_RE = re.compile(r'''(["'`])((?:(?!\1).)*)\1''')
+
+def script_names(script):
+    """Class names and attribute names a script may set: (classes, attributes)"""
+    classes = set()
+    for match in CLASS_LIST_RE.finditer(script):
+        classes.update(value for _, value in STRING_RE.findall(match.group(1)))
+    for match in CLASS_NAME_RE.finditer(script):
+        classes.update(match.group(2).split())
+    for match in CLASS_ATTRIBUTE_RE.finditer(script):
+        classes.update(match.group(2).split())
+
+    attributes = {match.group(2).lower() for match in SET_ATTRIBUTE_RE.finditer(script)}
+    for match in DATASET_RE.finditer(script):
+        attributes.add('data-' + re.sub(r'([A-Z])', lambda upper: '-' + upper.group(1).lower(), match.group(1)))
+    classes.discard('class')
+    return classes, attributes
+
+def page_matcher(document, html_file):
+    """A SelectorMatcher that knows what the page's local scripts toggle"""
+    classes, attributes = set(), set()
+    for element in document.iter():
+        src = element.attrs.get('src') if element.tag == 'script' else None
+        if not src or '://' in src or src.startswith('//'):
+            continue
+        script_path = html_file.parent / src.split('?')[0]
+        if script_path.is_file():
+            script_classes, script_attributes = script_names(script_path.read_text(encoding='utf-8'))
+            classes |= script_classes
+            attributes |= script_attributes
+    return SelectorMatcher(classes, attributes)
+
+def page_stylesheet(document, html_file):
+    """Path of the local stylesheet the page links, or None"""
+    for element in document.iter():
+        rel = element.attrs.get('rel', '').lower().split() if element.tag == 'link' else []
+        href = element.attrs.get('href', '')
+        if 'stylesheet' in rel and href and '://' not in href and not href.startswith('//'):
+            return html_file.parent / href.split('?')[0]
+    return None
+
+def stylesheet_files(site_dir):
+    """Source stylesheets under site/css/, leaving out generated ones"""
+    site_dir = Path(site_dir)
+    generated = {(site_dir / BUNDLE_STYLESHEET).resolve()}
+    purged_dir = (site_dir / PURGED_DIR).resolve()
+    return [path for path in sorted((site_dir / "css").rglob("*.css"))
+            if path.resolve() not in generated and purged_dir not in path.resolve().parents]
+
+def analyze(site_dir=SITE_DIR):
+    """Match every stylesheet against every page
+
+    Returns (pages, dead) where pages maps each page to its index, stylesheet
+    path and rules, and dead lists (file, line, selector) for selectors no
+    page can match.
+    """
+    site_dir = Path(site_dir)
+    pages = {}
+    for html_file in sorted(site_dir.rglob("*.html")):
+        document = parse_document(html_file.read_text(encoding='utf-8'))
+        stylesheet = page_stylesheet(document, html_file)
+        index = ElementIndex(document, page_matcher(document, html_file))
+        rules = []
+        if stylesheet is not None and stylesheet.is_file():
+            css, _ = flatten_stylesheet(stylesheet, (site_dir / PURGED_DIR))
+            rules = parse_stylesheet(css)
+        pages[html_file] = {'index': index, 'stylesheet': stylesheet, 'rules': rules}
+
+    dead = []
+    for css_file in stylesheet_files(site_dir):
+        for rule in parse_stylesheet(css_file.read_text(encoding='utf-8')):
+            for selector in rule.selectors:
+                if not any(page['index'].matches(selector) for page in pages.values()):
+                    dead.append((css_file, rule.line, selector))
+    return pages, dead
+
+def page_usage(page):
+    """(used rules, total rules, used bytes, total bytes) for one page"""
+    rules = page['rules']
+    used = select_rules(rules, page['index'].matches, prune_selectors=True)
+    return (sum(1 for rule in used if rule.is_style), sum(1 for rule in rules if rule.is_style),
+            len(serialize_rules(used).encode('utf-8')), len(serialize_rules(rules).encode('utf-8')))
+
+def write_purged_stylesheets(site_dir, pages):
+    """Write css/pages/<page>.css for each page and link it instead of the shared stylesheet"""
+    site_dir = Path(site_dir)
+    output_dir = site_dir / PURGED_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    for html_file, page in pages.items():
+        if not page['rules']:
+            continue
+        name = str(html_file.relative_to(site_dir).with_suffix('.css')).replace('/', '-')
+        css = serialize_rules(select_rules(page['rules'], page['index'].matches, prune_selectors=True))
+        purged_path = output_dir / name
+        if not purged_path.exists() or purged_path.read_text(encoding='utf-8') != css:
+            purged_path.write_text(css, encoding='utf-8')
+        update_page_links(site_dir, page['stylesheet'], purged_path, pages=[html_file])
+
+def purge_css(site_dir=SITE_DIR, write=False, json_path=None):
+    """Report unused CSS and optionally write purged per-page stylesheets"""
+    site_dir = Path(site_dir)
+    print("🧹 Analyzing CSS usage...")
+
+    pages, dead = analyze(site_dir)
+
+    print(f"\n💀 {len(dead)} selector(s) match no page:")
+    for css_file, line, selector in dead:
+        print(f"  {css_file.relative_to(site_dir)}:{line}  {selector}")
+
+    print("\n📊 Stylesheet usage per page:")
+    report = {'dead_selectors': [{'file': str(css_file.relative_to(site_dir)), 'line': line, 'selector': selector}
+                                 for css_file, line, selector in dead],
+              'pages': {}}
+    for html_file, page in pages.items():
+        name = str(html_file.relative_to(site_dir))
+        if not page['rules']:
+            print(f"  ℹ️  {name}: no local stylesheet")
+            continue
+        used_rules, total_rules, used_bytes, total_bytes = page_usage(page)
+        print(f"  {name:<40} {used_rules:>4}/{total_rules} rules  "
+              f"{used_bytes / 1024:6.1f}/{total_bytes / 1024:.1f} KB ({used_bytes / total_bytes:.0%} used)")
+        report['pages'][name] = {'used_rules': used_rules, 'total_rules': total_rules,
+                                 'used_bytes': used_bytes, 'total_bytes': total_bytes}
+
+    if json_path:
+        Path(json_path).write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+        print(f"\n📝 Report written to {json_path}")
+
+    if write:
+        print(f"\n✂️  Writing purged stylesheets to {PURGED_DIR}/...")
+        write_purged_stylesheets(site_dir, pages)
+
+    print("\n✅ CSS analysis complete!")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report unused CSS and optionally write purged per-page stylesheets")
+    parser.add_argument("--site-dir", type=Path, default=SITE_DIR,
+                        help="site directory to analyze (default: site/)")
+    parser.add_argument("--write", action="store_true",
+                        help=f"write a purged stylesheet per page to {PURGED_DIR}/ and link it from the page")
+    parser.add_argument("--json", metavar="PATH",
+                        help="also write the report as JSON")
+    args = parser.parse_args()
+
+    purge_css(args.site_dir, write=args.write, json_path=args.json)
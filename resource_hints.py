@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Resource Hints for Leading Powerful Conversations Website
+
+optimize_images.py marks every image loading="lazy", including the hero
+image at the top of a page, which is usually its largest contentful paint
+(LCP). A lazy image is only requested once layout shows it is visible, so
+the LCP waits for the stylesheet. For each page this script:
+1. Picks the likely LCP image: the largest image (by its width and height
+   attributes) in the part of the page visible without scrolling, leaving
+   out small images and anything in the header, navigation or footer; an
+   image already marked fetchpriority="high" is kept as the choice
+2. Removes loading="lazy" from it and adds fetchpriority="high"
+3. Adds a <link rel="preload" as="image"> in <head> matching what the
+   browser will pick: the first <picture> source's srcset, sizes, type and
+   media, or the image's own srcset or src
+4. Adds <link rel="preconnect"> for the other sites the page loads
+   resources from (e.g. Google Tag Manager), so their connections are set
+   up before the resources are discovered
+
+Running it again leaves a page unchanged. Run it on the build directory
+(dist/ by default; the sources in site/ are refused) after
+fingerprint_assets.py, so the preload points at the fingerprinted images.
+"""
+
+import argparse
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from critical_css import above_the_fold
+from html_tools import TagRewriter, parse_document, parse_srcset, build_starttag
+
+# Configuration
+SITE_DIR = Path(__file__).resolve().parent / "site"
+DIST_DIR = Path(__file__).resolve().parent / "dist"
+# Images smaller than this in both dimensions (icons, buttons) are never the LCP
+MIN_LCP_SIZE = 150
+# Containers whose images are logos or decoration rather than content
+EXCLUDED_CONTAINERS = ('header', 'nav', 'footer', 'aside')
+# Origins a third-party resource goes on to contact once it has loaded
+FOLLOW_UP_ORIGINS = {
+    'https://www.googletagmanager.com': ['https://www.google-analytics.com'],
+}
+# More preconnects than this compete with the page's own requests
+MAX_PRECONNECTS = 4
+# Tags whose URL attributes load a subresource of the page (rather than link to another page)
+SUBRESOURCE_ATTRIBUTES = {
+    'script': 'src', 'img': 'src', 'iframe': 'src', 'video': 'poster', 'audio': 'src', 'link': 'href',
+}
+
+def image_area(element):
+    """Area from the width and height attributes, or 0 when they are missing or small"""
+    try:
+        width, height = int(element.attrs.get('width', 0)), int(element.attrs.get('height', 0))
+    except ValueError:
+        return 0
+    if width < MIN_LCP_SIZE and height < MIN_LCP_SIZE:
+        return 0
+    return width * height
+
+def is_hidden(element):
+    return any('hidden' in ancestor.attrs or ancestor.attrs.get('aria-hidden') == 'true'
+               for ancestor in [element, *element.ancestors()])
+
+def find_lcp_image(document):
+    """(ordinal among the page's <img> tags, element) of the likely LCP image, or None"""
+    images = [element for element in document.iter() if element.tag == 'img']
+    for ordinal, image in enumerate(images):
+        if image.attrs.get('fetchpriority') == 'high':
+            return ordinal, image
+
+    fold = {id(element) for element in above_the_fold(document)}
+    best = None
+    for ordinal, image in enumerate(images):
+        if (id(image) not in fold or is_hidden(image)
+                or any(image.inside(container) for container in EXCLUDED_CONTAINERS)):
+            continue
+        area = image_area(image)
+        # Document order breaks ties: the first of two equal images paints first
+        if area and (best is None or area > best[0]):
+            best = (area, ordinal, image)
+    return best[1:] if best else None
+
+def preload_attributes(image):
+    """Attributes of the <link rel="preload"> matching what the browser downloads for an image"""
+    source = None
+    if image.parent is not None and image.parent.tag == 'picture':
+        source = next((child for child in image.parent.children if child.tag == 'source'), None)
+    attrs = [('rel', 'preload'), ('as', 'image')]
+    element = source if source is not None else image
+    srcset = element.attrs.get('srcset')
+    if srcset:
+        candidates = ', '.join(f"{url} {descriptor}".strip() for url, descriptor in parse_srcset(srcset))
+        if source is None and image.attrs.get('src'):
+            # Browsers without imagesrcset support fall back to href
+            attrs.append(('href', image.attrs['src']))
+        attrs.append(('imagesrcset', candidates))
+        if element.attrs.get('sizes'):
+            attrs.append(('imagesizes', ' '.join(element.attrs['sizes'].split())))
+    elif element.attrs.get('src'):
+        attrs.append(('href', element.attrs['src']))
+    else:
+        return None
+    for name in ('type', 'media'):
+        if source is not None and source.attrs.get(name):
+            attrs.append((name, source.attrs[name]))
+    attrs.append(('fetchpriority', 'high'))
+    return attrs
+
+def origin_of(url):
+    parts = urlsplit(url)
+    if parts.scheme in ('http', 'https') and parts.netloc:
+        return f"{parts.scheme}://{parts.netloc}"
+    if url.startswith('//') and parts.netloc:
+        return f"https://{parts.netloc}"
+    return None
+
+def third_party_origins(document):
+    """Other origins the page loads resources from, in document order, plus their follow-ups"""
+    origins = []
+    for element in document.iter():
+        attribute = SUBRESOURCE_ATTRIBUTES.get(element.tag)
+        if attribute is None:
+            continue
+        if element.tag == 'link':
+            rel = element.attrs.get('rel', '').lower().split()
+            if not ({'stylesheet', 'preload', 'modulepreload', 'icon'} & set(rel)):
+                continue
+        origin = origin_of(element.attrs.get(attribute, ''))
+        if origin:
+            origins.extend([origin] + FOLLOW_UP_ORIGINS.get(origin, []))
+    return list(dict.fromkeys(origins))
+
+def existing_hints(document):
+    """(preconnect origins, preload attribute sets) already in the page"""
+    preconnects, preloads = set(), []
+    for element in document.iter():
+        if element.tag != 'link':
+            continue
+        rel = element.attrs.get('rel', '').lower().split()
+        if 'preconnect' in rel:
+            preconnects.add(origin_of(element.attrs.get('href', '')))
+        if 'preload' in rel and element.attrs.get('as') == 'image':
+            preloads.append(element.attrs)
+    return preconnects, preloads
+
+class ResourceHintRewriter(TagRewriter):
+    """Adds the hints before the first <link> or <script> in <head> and updates the LCP <img>"""
+
+    def __init__(self, content, hints, lcp_ordinal):
+        super().__init__(content)
+        self.hints = hints
+        self.lcp_ordinal = lcp_ordinal
+        self.images = 0
+        self.inserted = not hints
+
+    def indent(self):
+        """Whitespace before the current tag on its line"""
+        start = self.line_starts[self.getpos()[0] - 1]
+        prefix = self.content[start:start + self.getpos()[1]]
+        return prefix if not prefix.strip() else ''
+
+    def insert_hints(self, raw):
+        self.inserted = True
+        indent = self.indent()
+        return ''.join(f"{build_starttag('link', attrs, True)}\n{indent}" for attrs in self.hints) + raw
+
+    def on_starttag(self, tag, attrs, raw, self_closing):
+        if tag in ('link', 'script') and not self.inserted and self.inside('head'):
+            return self.insert_hints(raw)
+        if tag != 'img':
+            return None
+        ordinal = self.images
+        self.images += 1
+        if ordinal != self.lcp_ordinal:
+            return None
+        values = dict(attrs)
+        if values.get('loading') != 'lazy' and values.get('fetchpriority') == 'high':
+            return None
+        updated = [(name, value) for name, value in attrs if name not in ('loading', 'fetchpriority')]
+        updated.append(('fetchpriority', 'high'))
+        return build_starttag(tag, updated, self_closing)
+
+    def on_endtag(self, tag, raw):
+        if tag == 'head' and not self.inserted:
+            return self.insert_hints(raw)
+        return None
+
+def add_resource_hints(html_file, write=True):
+    """Add the hints to one page; returns a report dict"""
+    content = html_file.read_text(encoding='utf-8')
+    document = parse_document(content)
+    preconnected, preloads = existing_hints(document)
+
+    hints = []
+    origins = [origin for origin in third_party_origins(document) if origin not in preconnected]
+    origins = origins[:max(MAX_PRECONNECTS - len(preconnected), 0)]
+    hints.extend([('rel', 'preconnect'), ('href', origin)] for origin in origins)
+
+    lcp = find_lcp_image(document)
+    preload = None
+    if lcp is not None:
+        preload = preload_attributes(lcp[1])
+        if preload is not None and dict(preload) not in [dict(attrs, rel='preload') for attrs in preloads]:
+            hints.append(preload)
+
+    updated = ResourceHintRewriter(content, hints, lcp[0] if lcp else None).rewrite()
+    if write and updated != content:
+        html_file.write_text(updated, encoding='utf-8')
+    return {
+        'lcp': lcp[1].attrs.get('src') if lcp else None,
+        'preconnects': origins,
+        'changed': updated != content,
+    }
+
+def add_site_resource_hints(site_dir=DIST_DIR, write=True):
+    """Add resource hints to every page of a built site; returns False if a page fails"""
+    site_dir = Path(site_dir).resolve()
+    if write and site_dir == SITE_DIR:
+        print(f"❌ Refusing to add resource hints to the sources in {SITE_DIR} - run it on a build directory")
+        return False
+    if not site_dir.is_dir():
+        print(f"❌ {site_dir} does not exist - run build.py first")
+        return False
+    print("🎯 Adding resource hints...")
+    ok = True
+
+    for html_file in sorted(site_dir.rglob("*.html")):
+        name = html_file.relative_to(site_dir)
+        try:
+            report = add_resource_hints(html_file, write)
+        except (OSError, ValueError) as error:
+            print(f"  ❌ {name}: {error}")
+            ok = False
+            continue
+        lcp = f"LCP image {report['lcp']}" if report['lcp'] else "no LCP image above the fold"
+        preconnects = f", preconnect {', '.join(report['preconnects'])}" if report['preconnects'] else ''
+        status = '✅' if report['changed'] else '✔️ '
+        print(f"  {status} {name}: {lcp}{preconnects}{'' if report['changed'] else ' (unchanged)'}")
+
+    print("\n✅ Resource hints complete!" if ok else "\n❌ Resource hints failed for some pages")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preload each page's LCP image and preconnect to third-party origins")
+    parser.add_argument("--site-dir", type=Path, default=DIST_DIR,
+                        help="built site directory to process (default: dist/; site/ only with --dry-run)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report the LCP image and hints of each page without changing it")
+    args = parser.parse_args()
+
+    if not add_site_resource_hints(args.site_dir, write=not args.dry_run):
+        exit(1)
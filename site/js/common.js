@@ -6,6 +6,26 @@ function gtag() {
 gtag("js", new Date());
 gtag("config", "G-XXXXXXXXXX");
 
+// Service worker for fast repeat visits and offline reading; sw.js only
+// exists in the built site, so registration quietly fails elsewhere
+if ("serviceWorker" in navigator) {
+  window.addEventListener("load", function () {
+    navigator.serviceWorker.register("sw.js").catch(function () {});
+  });
+}
+
+// Blurred image placeholders (css/placeholders.css) are cleared once the
+// image has loaded or failed, so they never show around or through it
+document.querySelectorAll("img.img-placeholder").forEach((image) => {
+  const clear = () => image.classList.remove("img-placeholder");
+  if (image.complete) {
+    clear();
+    return;
+  }
+  image.addEventListener("load", clear, { once: true });
+  image.addEventListener("error", clear, { once: true });
+});
+
 // Mobile navigation toggle functionality
 document.addEventListener("DOMContentLoaded", function () {
   const navToggle = document.querySelector(".nav-toggle");
@@ -0,0 +1,64 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import build
+
+
+def copy_ok():
+    pass
+
+
+def copy_broken():
+    raise ValueError("site/ is missing index.html")
+
+
+@pytest.fixture
+def saved_states(monkeypatch):
+    """Run build() against callable tasks, capturing every saved state"""
+    tasks = [build.Task('ok', copy_ok), build.Task('broken', copy_broken),
+             build.Task('after', copy_ok, deps=['broken'])]
+    monkeypatch.setattr(build, 'TASKS', tasks)
+    monkeypatch.setattr(build, 'TASKS_BY_NAME', {task.name: task for task in tasks})
+    monkeypatch.setattr(build, 'load_state', lambda: {'files': {}, 'tasks': {}})
+    states = []
+    monkeypatch.setattr(build, 'save_state', lambda state: states.append(dict(state['tasks'])))
+    return states
+
+
+def test_callable_task_error_is_a_task_failure():
+    succeeded, output, _ = build.run_command(build.Task('broken', copy_broken))
+    assert not succeeded
+    assert 'ValueError' in output and 'index.html' in output
+
+
+def test_failing_callable_does_not_abort_the_build(saved_states, capsys):
+    assert build.build(jobs=1) is False
+    printed = capsys.readouterr().out
+    assert '❌ broken: failed' in printed
+    assert 'after: not run' in printed
+    # The task that succeeded is still recorded, so the next build skips it
+    assert 'ok' in saved_states[-1]
+    assert 'broken' not in saved_states[-1]
+
+
+def test_second_build_without_changes_runs_nothing(tmp_path):
+    """The whole pipeline on a copy of the project; nothing is stale the second time"""
+    root = Path(build.ROOT_DIR)
+    for path in root.glob("*.py"):
+        shutil.copy2(path, tmp_path / path.name)
+    shutil.copytree(root / "site", tmp_path / "site")
+
+    def run():
+        result = subprocess.run([sys.executable, "build.py", "--skip", "images"], cwd=tmp_path,
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout + result.stderr
+        return result.stdout
+
+    run()
+    second = run()
+    assert "0 task(s) run" in second, second
+    assert "▶️" not in second
@@ -0,0 +1,36 @@
+import bundle_css
+
+
+def make_site(root):
+    (root / "css").mkdir(parents=True)
+    (root / "css" / "main.css").write_text('@import url("./base.css");\n@import url("./print.css") print;\n',
+                                           encoding='utf-8')
+    (root / "css" / "base.css").write_text('body { margin: 0; }\n', encoding='utf-8')
+    (root / "css" / "print.css").write_text('nav { display: none; }\n', encoding='utf-8')
+    (root / "index.html").write_text('<link rel="stylesheet" href="css/main.css">\n', encoding='utf-8')
+    return root
+
+
+def test_bundled_modules_are_removed_from_the_build(tmp_path):
+    site = make_site(tmp_path / "dist")
+    assert bundle_css.bundle_css(site)
+    assert sorted(path.name for path in (site / "css").iterdir()) == ["bundle.css"]
+    assert 'href="css/bundle.css"' in (site / "index.html").read_text(encoding='utf-8')
+
+
+def test_modules_still_linked_are_kept(tmp_path):
+    site = make_site(tmp_path / "dist")
+    (site / "print.html").write_text('<link rel="stylesheet" href="css/print.css">\n', encoding='utf-8')
+    assert bundle_css.bundle_css(site)
+    assert sorted(path.name for path in (site / "css").iterdir()) == ["bundle.css", "print.css"]
+
+
+def test_without_html_updates_nothing_is_removed(tmp_path):
+    site = make_site(tmp_path / "dist")
+    assert bundle_css.bundle_css(site, update_html=False)
+    assert (site / "css" / "main.css").exists() and (site / "css" / "base.css").exists()
+
+
+def test_refuses_the_source_tree(capsys):
+    assert bundle_css.bundle_css(bundle_css.SITE_DIR) is False
+    assert 'Refusing' in capsys.readouterr().out
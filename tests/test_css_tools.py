@@ -0,0 +1,60 @@
+"""Tests for the CSS tokenizer, URL rewriting and minifier in css_tools.py"""
+
+from css_tools import iter_tokens, tokenize, rewrite_urls, minify_css
+
+
+def kinds(css):
+    return [kind for kind, _ in tokenize(css)]
+
+
+def test_iter_tokens_reports_offsets():
+    css = 'a {\n  color: red;\n}'
+    tokens = list(iter_tokens(css))
+    assert ''.join(text for _, text, _ in tokens) == css
+    for kind, text, offset in tokens:
+        assert css[offset:offset + len(text)] == text
+    assert ('word', 'color', 6) in tokens
+
+
+def test_strings_hide_braces_and_semicolons():
+    tokens = tokenize('a{content:"x;}"}')
+    assert ('string', '"x;}"') in tokens
+    assert [text for kind, text in tokens if kind == 'punct'] == ['{', ':', '}']
+
+
+def test_escaped_quote_stays_inside_string():
+    assert tokenize(r'"a\"b"') == [('string', r'"a\"b"')]
+
+
+def test_unclosed_string_becomes_error_token():
+    tokens = tokenize('a{content:"oops\n}')
+    assert ('error', '"') in tokens
+    assert tokens[-1] == ('punct', '}')
+
+
+def test_unclosed_comment_runs_to_end():
+    assert tokenize('a{} /* open { b') == [('word', 'a'), ('punct', '{'), ('punct', '}'), ('ws', ' '),
+                                          ('comment', '/* open { b')]
+
+
+def test_comment_markers_inside_strings_are_not_comments():
+    assert kinds('"/* not a comment */"') == ['string']
+
+
+def test_unquoted_url_is_one_token():
+    assert ('url', 'url( img.png )') in tokenize('a{background:url( img.png )}')
+
+
+def test_rewrite_urls_skips_comments_and_keeps_quotes():
+    css = '/* url(old.png) */ a{background:url("old.png")} @import "base.css";'
+    rewritten = rewrite_urls(css, lambda url: url.replace('old', 'new') if url == 'old.png' else None)
+    assert rewritten == '/* url(old.png) */ a{background:url("new.png")} @import "base.css";'
+
+
+def test_minify_css_keeps_meaning():
+    css = '/* note */\na > b ,\nc:hover {\n  content: " a  b ";\n  margin: 0 auto ;\n}\n'
+    assert minify_css(css) == 'a>b,c:hover{content:" a  b ";margin:0 auto}'
+
+
+def test_minify_css_keeps_descendant_space_before_pseudo_class():
+    assert minify_css('a :hover{color:red}') == 'a :hover{color:red}'
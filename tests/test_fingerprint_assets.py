@@ -0,0 +1,46 @@
+import json
+
+import fingerprint_assets
+
+
+def make_site(root):
+    (root / "css").mkdir(parents=True)
+    (root / "images").mkdir()
+    (root / "css" / "main.css").write_text('/* main.css imports base.css */\n@import "base.css";\n', encoding='utf-8')
+    (root / "css" / "base.css").write_text('body { background: url(../images/bg.png); }\n', encoding='utf-8')
+    (root / "images" / "bg.png").write_bytes(b'\x89PNG background')
+    (root / "images" / "cover.jpg").write_bytes(b'\xff\xd8 cover')
+    (root / "index.html").write_text(
+        '<link rel="stylesheet" href="css/main.css">\n'
+        '<meta property="og:image" content="https://example.com/images/cover.jpg">\n'
+        '<img src="images/cover.jpg" alt="">\n', encoding='utf-8')
+    return root
+
+
+def test_refuses_the_source_tree(capsys):
+    assert fingerprint_assets.fingerprint_assets(fingerprint_assets.SITE_DIR) is False
+    assert 'Refusing' in capsys.readouterr().out
+
+
+def test_removes_originals_once_rewritten(tmp_path):
+    site = make_site(tmp_path / "dist")
+    assert fingerprint_assets.fingerprint_assets(site)
+    manifest = json.loads((site / "asset-manifest.json").read_text(encoding='utf-8'))
+
+    # Only referenced through rewritten URLs, even though comments name them
+    for original in ("css/main.css", "css/base.css", "images/bg.png"):
+        assert not (site / original).exists()
+        assert (site / manifest[original]).exists()
+    # The og:image tag still names the original
+    assert (site / "images/cover.jpg").exists()
+    assert manifest["css/main.css"] in (site / "index.html").read_text(encoding='utf-8')
+
+
+def test_rerun_keeps_fingerprinted_copies(tmp_path):
+    site = make_site(tmp_path / "dist")
+    assert fingerprint_assets.fingerprint_assets(site)
+    first = (site / "asset-manifest.json").read_text(encoding='utf-8')
+    assert fingerprint_assets.fingerprint_assets(site)
+    assert (site / "asset-manifest.json").read_text(encoding='utf-8') == first
+    for fingerprinted in json.loads(first).values():
+        assert (site / fingerprinted).exists()
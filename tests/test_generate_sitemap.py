@@ -0,0 +1,122 @@
+"""Tests for the streaming sitemap writer and the image sitemap in generate_sitemap.py"""
+
+import gzip
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import generate_sitemap
+from generate_sitemap import SITEMAP_NS, SitemapWriter
+
+
+@pytest.fixture
+def site_dir(tmp_path, monkeypatch):
+    site = tmp_path / "site"
+    site.mkdir()
+    monkeypatch.setattr(generate_sitemap, 'SITE_DIR', str(site))
+    monkeypatch.setattr(generate_sitemap, 'BASE_URL', 'https://example.com')
+    return site
+
+
+def locs(path):
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        return [element.text for element in ET.parse(f).iter(f'{{{SITEMAP_NS}}}loc')]
+
+
+def write(count, compress=False):
+    writer = SitemapWriter(compress)
+    for number in range(count):
+        writer.add(f"https://example.com/page-{number}.html", f"2026-01-{number + 1:02d}", 'monthly', '0.5')
+    return writer, writer.finish()
+
+
+def test_single_part_becomes_sitemap_xml(site_dir):
+    writer, entry_point = write(3)
+    assert entry_point == os.path.join(str(site_dir), 'sitemap.xml')
+    assert locs(entry_point) == [f"https://example.com/page-{number}.html" for number in range(3)]
+    assert sorted(os.listdir(site_dir)) == ['sitemap.xml']
+
+
+def test_split_at_url_limit(site_dir, monkeypatch):
+    monkeypatch.setattr(generate_sitemap, 'MAX_URLS_PER_SITEMAP', 2)
+    writer, entry_point = write(5)
+    assert entry_point == os.path.join(str(site_dir), 'sitemap-index.xml')
+    assert sorted(os.listdir(site_dir)) == ['sitemap-1.xml', 'sitemap-2.xml', 'sitemap-3.xml', 'sitemap-index.xml']
+    assert locs(entry_point) == [f"https://example.com/sitemap-{number}.xml" for number in (1, 2, 3)]
+    assert [len(locs(site_dir / f"sitemap-{number}.xml")) for number in (1, 2, 3)] == [2, 2, 1]
+    # Each part's lastmod in the index is the latest of its entries
+    lastmods = [element.text for element in ET.parse(entry_point).iter(f'{{{SITEMAP_NS}}}lastmod')]
+    assert lastmods == ['2026-01-02', '2026-01-04', '2026-01-05']
+
+
+def test_split_at_byte_limit(site_dir, monkeypatch):
+    entry = ('  <url>\n    <loc>https://example.com/page-0.html</loc>\n    <lastmod>2026-01-01</lastmod>\n'
+             '    <changefreq>monthly</changefreq>\n    <priority>0.5</priority>\n  </url>\n')
+    # Room for exactly two entries per part
+    limit = len(SitemapWriter().header) + 2 * len(entry) + len(SitemapWriter.FOOTER)
+    monkeypatch.setattr(generate_sitemap, 'MAX_SITEMAP_BYTES', limit)
+    writer, entry_point = write(5)
+    assert [len(locs(site_dir / f"sitemap-{number}.xml")) for number in (1, 2, 3)] == [2, 2, 1]
+    assert all(os.path.getsize(site_dir / f"sitemap-{number}.xml") <= limit for number in (1, 2, 3))
+
+
+def test_gzip_keeps_plain_sitemaps(site_dir, monkeypatch):
+    monkeypatch.setattr(generate_sitemap, 'MAX_URLS_PER_SITEMAP', 2)
+    writer, entry_point = write(3, compress=True)
+    assert sorted(os.listdir(site_dir)) == ['sitemap-1.xml', 'sitemap-1.xml.gz', 'sitemap-2.xml',
+                                            'sitemap-2.xml.gz', 'sitemap-index.xml']
+    assert locs(entry_point) == ['https://example.com/sitemap-1.xml.gz', 'https://example.com/sitemap-2.xml.gz']
+    assert locs(site_dir / 'sitemap-1.xml.gz') == locs(site_dir / 'sitemap-1.xml')
+
+
+def test_leftover_parts_are_removed(site_dir, monkeypatch):
+    monkeypatch.setattr(generate_sitemap, 'MAX_URLS_PER_SITEMAP', 2)
+    write(5)
+    monkeypatch.setattr(generate_sitemap, 'MAX_URLS_PER_SITEMAP', 50000)
+    write(5)
+    assert sorted(os.listdir(site_dir)) == ['sitemap.xml']
+
+
+def test_part_files_stay_outside_the_site(site_dir):
+    writer = SitemapWriter()
+    writer.add("https://example.com/", "2026-01-01", 'weekly', '1.0')
+    part_path = writer.path
+    assert os.path.dirname(part_path) == os.path.dirname(str(site_dir))
+    writer.abort()
+    assert not os.path.exists(part_path)
+    assert os.listdir(site_dir) == []
+
+
+def test_unchanged_sitemap_is_not_rewritten(site_dir):
+    _, entry_point = write(2)
+    os.utime(entry_point, (0, 0))
+    write(2)
+    assert os.path.getmtime(entry_point) == 0
+
+
+def parse(html):
+    parser = generate_sitemap.PageParser()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+def test_page_images_include_srcset_candidates_once():
+    parser = parse('<picture><source srcset="images/a-300w.webp 300w, images/a-600w.webp 600w">'
+                   '<img src="images/a.png" srcset="images/a-300w.png 300w, images/a.png 688w"></picture>'
+                   '<img src="data:image/gif;base64,R0lGOD">')
+    assert parser.images == ['images/a-300w.webp', 'images/a-600w.webp', 'images/a.png', 'images/a-300w.png']
+    assert not parser.noindex
+
+
+def test_noindex_page_is_flagged():
+    assert parse('<meta name="Robots" content="NOINDEX, follow">').noindex
+
+
+def test_image_urls_resolve_against_the_page(site_dir):
+    assert generate_sitemap.get_image_url('resources/index.html', '../images/a.png') == \
+        'https://example.com/images/a.png'
+    assert generate_sitemap.get_image_url('index.html', 'https://cdn.example.net/a.png') == \
+        'https://cdn.example.net/a.png'
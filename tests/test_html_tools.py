@@ -0,0 +1,115 @@
+"""Tests for the markup helpers in html_tools.py"""
+
+from html_tools import (TagRewriter, add_attributes, build_starttag, parse_document, parse_srcset,
+                        replace_attributes)
+
+PAGE = '''<!DOCTYPE html>
+<html>
+<head>
+  <!-- <img src="commented.png"> -->
+  <script>if (a < b) { document.write('<img src="x.png">'); }</script>
+</head>
+<body>
+  <picture>
+    <source
+      type="image/webp"
+      srcset="a-300w.webp 300w, a-600w.webp 600w"
+    />
+    <img src="a.png" alt='Say "hi"'  loading="lazy">
+  </picture>
+  <p>Text &amp; more<br>
+  <img src="b.png" alt="b">
+</body>
+</html>
+'''
+
+
+class LazyRemover(TagRewriter):
+    """Drops loading="lazy" from images outside <picture>, adds decoding elsewhere"""
+
+    def on_starttag(self, tag, attrs, raw, self_closing):
+        if tag != 'img':
+            return None
+        if self.inside('picture'):
+            return add_attributes(raw, [('decoding', 'async')])
+        return replace_attributes(raw, {'alt': 'B'})
+
+
+def test_rewrite_without_changes_is_identical():
+    assert TagRewriter(PAGE).rewrite() == PAGE
+
+
+def test_attribute_edits_leave_surrounding_markup_alone():
+    rewritten = LazyRemover(PAGE).rewrite()
+    expected = (PAGE
+                .replace('''<img src="a.png" alt='Say "hi"'  loading="lazy">''',
+                         '''<img src="a.png" alt='Say "hi"'  loading="lazy" decoding="async">''')
+                .replace('<img src="b.png" alt="b">', '<img src="b.png" alt="B">'))
+    assert rewritten == expected
+
+
+def test_tags_in_comments_and_scripts_are_not_visited():
+    seen = []
+
+    class Collector(TagRewriter):
+        def on_starttag(self, tag, attrs, raw, self_closing):
+            if tag == 'img':
+                seen.append(dict(attrs)['src'])
+
+    Collector(PAGE).rewrite()
+    assert seen == ['a.png', 'b.png']
+
+
+def test_end_tag_replacement():
+    class Closer(TagRewriter):
+        def on_endtag(self, tag, raw):
+            return '<!-- end -->' + raw if tag == 'head' else None
+
+    assert '<!-- end --></head>' in Closer(PAGE).rewrite()
+
+
+def test_drop_content_removes_element():
+    class Dropper(TagRewriter):
+        def on_starttag(self, tag, attrs, raw, self_closing):
+            if tag == 'picture':
+                self.drop_content()
+                return ''
+
+    rewritten = Dropper(PAGE).rewrite()
+    assert '<picture>' not in rewritten and 'a.png' not in rewritten and '</picture>' not in rewritten
+    assert '<img src="b.png" alt="b">' in rewritten
+
+
+def test_add_attributes_keeps_self_closing_slash():
+    assert add_attributes('<img src="a.png" />', [('width', '10')]) == '<img src="a.png" width="10" />'
+    assert add_attributes('<img\n  src="a.png">', [('alt', '')]) == '<img\n  src="a.png" alt="">'
+
+
+def test_replace_attributes_keeps_formatting():
+    raw = '<source\n  type="image/webp"\n  srcset="old 300w"\n/>'
+    assert replace_attributes(raw, {'srcset': 'new 300w'}) == '<source\n  type="image/webp"\n  srcset="new 300w"\n/>'
+
+
+def test_replace_attributes_removes_and_ignores_missing():
+    raw = "<img src=a.png ALT='x' hidden data-x=\"1\">"
+    assert replace_attributes(raw, {'alt': None, 'hidden': None, 'title': 'ignored'}) == '<img src=a.png data-x="1">'
+
+
+def test_build_starttag_escapes_values():
+    assert build_starttag('img', [('alt', 'a "b" & <c>'), ('hidden', None)], True) == \
+        '<img alt="a &quot;b&quot; &amp; &lt;c&gt;" hidden />'
+
+
+def test_parse_srcset():
+    assert parse_srcset(' a-300w.webp 300w,\n  a-600w.webp   600w ,b.png') == [
+        ('a-300w.webp', '300w'), ('a-600w.webp', '600w'), ('b.png', '')]
+    assert parse_srcset('icon.png 1x, icon@2x.png 2x') == [('icon.png', '1x'), ('icon@2x.png', '2x')]
+    assert parse_srcset('') == []
+
+
+def test_parse_document_tree():
+    document = parse_document(PAGE)
+    images = [element for element in document.iter() if element.tag == 'img']
+    assert [image.attrs['src'] for image in images] == ['a.png', 'b.png']
+    assert images[0].inside('picture') and not images[1].inside('picture')
+    assert images[1].parent.tag == 'p'
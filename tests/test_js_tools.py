@@ -0,0 +1,89 @@
+"""Tests for the JavaScript minifier in js_tools.py"""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from js_tools import minify_js, tokenize
+
+NODE = shutil.which('node')
+
+
+def evaluate(script):
+    """Run a script with node and return the value it leaves in `result`"""
+    program = f"{script}\n;process.stdout.write(JSON.stringify(result))"
+    output = subprocess.run([NODE, '-e', program], capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def test_regex_literal_is_one_token():
+    tokens = [(token.kind, token.text) for token in tokenize('x = /[/]+\\/*/g.test(y)') if token.kind != 'ws']
+    assert ('regex', '/[/]+\\/*/g') in tokens
+
+
+def test_division_is_not_a_regex():
+    tokens = [token.kind for token in tokenize('a / b / c')]
+    assert 'regex' not in tokens
+
+
+def test_regex_after_keyword():
+    assert [token.kind for token in tokenize('return /a/')][-1] == 'regex'
+
+
+def test_regex_with_comment_like_content_survives():
+    assert minify_js('let r = /\\/\\/x/; // comment\nlet s = 1;') == 'let r=/\\/\\/x/;let s=1;\n'
+
+
+def test_unterminated_regex_raises():
+    with pytest.raises(ValueError):
+        minify_js('x = /abc')
+
+
+def test_comments_and_whitespace_are_removed():
+    assert minify_js('/* header */\nfunction  add ( a , b ) {\n  // sum\n  return a + b;\n}\n') == \
+        'function add(a,b){return a+b;}\n'
+
+
+def test_licence_comment_is_kept():
+    assert '/*! keep */' in minify_js('/*! keep */\nvar a = 1;')
+
+
+def test_line_break_kept_where_asi_applies():
+    # Without the line break, `return x` would return x instead of undefined
+    assert minify_js('function f() {\n  return\n  x\n}') == 'function f(){return\nx}\n'
+    assert minify_js('a = b\n++c') == 'a=b\n++c\n'
+    assert minify_js('a = b\n(c)') == 'a=b\n(c)\n'
+
+
+def test_line_break_dropped_where_asi_cannot_apply():
+    assert minify_js('const total = a +\n  b') == 'const total=a+b\n'
+    assert minify_js('foo(1,\n2)') == 'foo(1,2)\n'
+
+
+def test_adjacent_operators_keep_their_space():
+    assert minify_js('a = b + +c; d = e - -f;') == 'a=b+ +c;d=e- -f;\n'
+
+
+def test_template_literal_is_left_alone():
+    script = 'let t = `a  ${ b + `c ${ d }` }  /* not a comment */ e`;'
+    assert minify_js(script) == 'let t=`a  ${ b + `c ${ d }` }  /* not a comment */ e`;\n'
+
+
+def test_strings_are_left_alone():
+    assert minify_js("var s = 'a  // b';  var t = \"c /* d */\";") == "var s='a  // b';var t=\"c /* d */\";\n"
+
+
+@pytest.mark.skipif(NODE is None, reason="node is not installed")
+@pytest.mark.parametrize("script", [
+    'let a = 1\nlet b = 2\nlet result = [a, b]',
+    'function f() {\n  return\n  42\n}\nlet result = f() === undefined',
+    'let i = 1\nlet j = i\n++i\nlet result = [i, j]',
+    'let re = /\\d+\\/\\d+/g\nlet result = "1/2 3/4".match(re)',
+    'let x = 10, y = 2, g = 1\nlet result = x / y / g',
+    'let n = 5\nlet result = `${n} items ${ `nested ${n * 2}` } // kept`',
+    'let result = [1, 2, 3]\n  .map(v => v * 2)\n  .filter(v => v > 2)',
+])
+def test_minified_script_behaves_the_same(script):
+    assert evaluate(minify_js(script)) == evaluate(script)
@@ -0,0 +1,63 @@
+import shutil
+
+import pytest
+
+import optimize_images
+from optimize_images import ImageMarkupRewriter, PLACEHOLDER_CLASS
+
+PLACEHOLDER = {'color': '#ffffff', 'uri': 'data:image/webp;base64,AAAA'}
+
+
+@pytest.fixture
+def site_dir(tmp_path):
+    (tmp_path / "images").mkdir()
+    (tmp_path / "images" / "seven-principles.png").write_bytes(b'not decoded')
+    return tmp_path
+
+
+def rewrite(site_dir, html, placeholder=PLACEHOLDER):
+    rewriter = ImageMarkupRewriter(html, site_dir, image_updates={},
+                                   placeholder_for=lambda path: placeholder)
+    return rewriter.rewrite(), rewriter
+
+
+def test_placeholder_is_a_class_not_an_inline_style(site_dir):
+    html = '<img src="images/seven-principles.png" class="framed" width="1" height="1">'
+    output, rewriter = rewrite(site_dir, html)
+    assert output == ('<img src="images/seven-principles.png" class="framed img-placeholder '
+                      'img-placeholder-seven-principles" width="1" height="1">')
+    assert rewriter.placeholder_rules == {'seven-principles.png': PLACEHOLDER}
+    assert rewrite(site_dir, output)[0] == output
+
+
+def test_inline_placeholder_from_earlier_versions_is_removed(site_dir):
+    style = optimize_images.placeholder_css(PLACEHOLDER)
+    html = f'<img src="images/seven-principles.png" width="1" height="1" style="{style}" />'
+    output, _ = rewrite(site_dir, html, placeholder={})
+    assert output == '<img src="images/seven-principles.png" width="1" height="1" />'
+
+
+def test_stylesheet_has_one_rule_per_image():
+    css = optimize_images.placeholder_stylesheet({'seven-principles.png': PLACEHOLDER})
+    assert f".{PLACEHOLDER_CLASS}.img-placeholder-seven-principles {{ background: #ffffff" in css
+    assert css.count(PLACEHOLDER['uri']) == 1
+
+
+@pytest.mark.skipif(optimize_images.Image is None, reason="Pillow is not installed")
+@pytest.mark.parametrize("mode", ['RGBA', 'LA'])
+def test_images_with_an_alpha_channel_get_no_placeholder(mode):
+    # Fully opaque, but the alpha channel alone rules the placeholder out
+    image = optimize_images.Image.new(mode, (40, 40), 'white')
+    assert optimize_images.pillow_placeholder(image) == {}
+    assert optimize_images.pillow_placeholder(image.convert('RGB'))['color'] == '#ffffff'
+
+
+@pytest.mark.skipif(optimize_images.Image is None, reason="Pillow is not installed")
+def test_variant_is_never_larger_than_its_source(tmp_path):
+    # Re-encoded at 600px, this 688px drawing comes out larger than the source
+    source = tmp_path / "seven-principles.png"
+    shutil.copy2(optimize_images.SITE_DIR / "images" / "seven-principles.png", source)
+    image = optimize_images.Image.open(source)
+    image.load()
+    optimize_images.pillow_write_variants(image, source, "seven-principles", [600])
+    assert (tmp_path / "seven-principles-600w.png").stat().st_size <= source.stat().st_size
@@ -0,0 +1,103 @@
+"""Tests for the stylesheet validator in validate_css.py"""
+
+import pytest
+
+from validate_css import validate, validate_stylesheet
+
+
+def problems_in(tmp_path, css):
+    path = tmp_path / "style.css"
+    path.write_text(css, encoding='utf-8')
+    problems, _, _ = validate_stylesheet(path)
+    return [(problem.line, problem.column, problem.severity, problem.message) for problem in problems]
+
+
+def write_site(tmp_path, css):
+    css_dir = tmp_path / "css"
+    css_dir.mkdir()
+    (css_dir / "main.css").write_text(css, encoding='utf-8')
+    return tmp_path
+
+
+def test_valid_stylesheet_has_no_problems(tmp_path):
+    css = ('@import "base.css";\n:root { --gap: 1rem; }\n'
+           '@media (min-width: 768px) {\n  a[href^="http"]:hover { margin: var(--gap); }\n}\n')
+    assert problems_in(tmp_path, css) == []
+
+
+def test_unclosed_brace(tmp_path):
+    assert problems_in(tmp_path, 'a {\n  color: red;\n') == [(1, 3, 'error', "unclosed '{'")]
+
+
+def test_unexpected_closing_brace(tmp_path):
+    assert problems_in(tmp_path, 'a { color: red; }\n}') == [(2, 1, 'error', "unexpected '}'")]
+
+
+def test_unclosed_string(tmp_path):
+    problems = problems_in(tmp_path, 'a {\n  content: "oops;\n}\n')
+    assert (2, 12, 'error', 'unclosed string') in problems
+
+
+def test_unclosed_comment(tmp_path):
+    assert problems_in(tmp_path, 'a { color: red; }\n/* never closed') == [(2, 1, 'error', 'unclosed comment')]
+
+
+@pytest.mark.parametrize("declaration, message", [
+    ("color red", "expected ':' in declaration 'color red'"),
+    ("color:", "missing value for 'color'"),
+    (": red", "missing property name in ': red'"),
+])
+def test_malformed_declarations(tmp_path, declaration, message):
+    assert problems_in(tmp_path, f"a {{ {declaration}; }}") == [(1, 5, 'error', message)]
+
+
+def test_double_semicolon_is_a_warning(tmp_path):
+    assert problems_in(tmp_path, 'a { color: red;; }') == [(1, 16, 'warning', 'empty declaration (double semicolon)')]
+
+
+def test_import_after_rules_is_a_warning(tmp_path):
+    problems = problems_in(tmp_path, 'a { color: red; }\n@import "late.css";\n')
+    assert problems == [(2, 1, 'warning', '@import after other rules is ignored by browsers')]
+
+
+def test_var_references_record_fallbacks(tmp_path):
+    path = tmp_path / "style.css"
+    path.write_text(':root { --defined: 1px; }\na { margin: var(--defined); padding: var(--other, 2px); }\n',
+                    encoding='utf-8')
+    _, definitions, references = validate_stylesheet(path)
+    assert definitions == {'--defined'}
+    assert references == [('--defined', 2, 13, False), ('--other', 2, 38, True)]
+
+
+def test_var_in_comment_or_string_is_ignored(tmp_path):
+    path = tmp_path / "style.css"
+    path.write_text('/* var(--a) */ a { content: "var(--b)"; }\n', encoding='utf-8')
+    assert validate_stylesheet(path)[2] == []
+
+
+def test_undefined_var_without_fallback_is_an_error(tmp_path):
+    site_dir = write_site(tmp_path, 'a { margin: var(--missing); }\n')
+    _, problems = validate(site_dir, jobs=1)
+    assert [(problem.severity, problem.message) for problem in problems] == [
+        ('error', 'var(--missing) is never defined')]
+
+
+def test_undefined_var_with_fallback_is_allowed(tmp_path):
+    site_dir = write_site(tmp_path, 'a { margin: var(--missing, 0); }\n')
+    _, problems = validate(site_dir, jobs=1)
+    assert problems == []
+
+
+def test_custom_properties_are_shared_across_imports(tmp_path):
+    site_dir = write_site(tmp_path, '@import "tokens.css";\na { margin: var(--gap); }\n')
+    (site_dir / "css" / "tokens.css").write_text(':root { --gap: 1rem; }\n', encoding='utf-8')
+    files, problems = validate(site_dir, jobs=1)
+    assert [path.name for path in files] == ['main.css', 'tokens.css']
+    assert problems == []
+
+
+def test_missing_import_is_reported_where_it_is_imported(tmp_path):
+    site_dir = write_site(tmp_path, 'a { color: red; }\n')
+    (site_dir / "css" / "main.css").write_text('@import "gone.css";\n', encoding='utf-8')
+    _, problems = validate(site_dir, jobs=1)
+    assert [(problem.line, problem.message) for problem in problems] == [(1, 'imported file gone.css not found')]
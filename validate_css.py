@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+CSS Validator for Leading Powerful Conversations Website
+
+Validates the stylesheets reachable from site/css/main.css in one process:
+1. Discovers the files from the @import graph, so new modules are picked up
+   and missing ones are reported where they are imported
+2. Tokenizes each file once and checks its structure: unclosed comments and
+   strings, unbalanced braces, parentheses and brackets, declarations
+   without a ':' or a value, stray semicolons and misplaced @import rules
+3. Flags var(--...) references to custom properties that are never defined
+   (and have no fallback)
+4. Reports every problem with file, line and column, optionally as JSON
+
+Files are validated in parallel; the exit status is 1 if any error is found.
+"""
+
+import os
+import re
+import json
+import bisect
+import builtins
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from css_tools import IMPORT_RE, VAR_RE, GROUPING_AT_RULES, iter_tokens, is_external
+
+# Configuration
+SITE_DIR = Path(__file__).resolve().parent / "site"
+ENTRY_STYLESHEET = "css/main.css"
+# Generated stylesheets that are not part of the source tree
+GENERATED_STYLESHEETS = ("css/bundle.css", "css/pages/")
+
+# At-rules whose blocks hold rules rather than declarations
+RULE_BLOCK_AT_RULES = GROUPING_AT_RULES + ('@keyframes', '@-webkit-keyframes')
+
+class Problem:
+    """An error or warning at a position in a stylesheet"""
+
+    def __init__(self, path, line, column, severity, message):
+        self.path = path
+        self.line = line
+        self.column = column
+        self.severity = severity
+        self.message = message
+
+    def to_dict(self, site_dir):
+        return {'file': str(Path(self.path).relative_to(site_dir)), 'line': self.line, 'column': self.column,
+                'severity': self.severity, 'message': self.message}
+
+class Position:
+    """Turns offsets into 1-based (line, column)"""
+
+    def __init__(self, text):
+        self.line_starts = [0] + [match.end() for match in re.finditer('\n', text)]
+
+    def __call__(self, offset):
+        line = bisect.bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+def find_imports(path):
+    """Local @imports of a stylesheet as (url, target path, line, column)"""
+    text = path.read_text(encoding='utf-8')
+    position = Position(text)
+    imports = []
+    # Blank out comments (keeping offsets) so commented-out imports are ignored
+    code = ''.join(' ' * len(token) if kind == 'comment' else token for kind, token, _ in iter_tokens(text))
+    for match in IMPORT_RE.finditer(code):
+        url = match.group('url') or match.group('bare')
+        if not is_external(url):
+            imports.append((url, (path.parent / url).resolve(), *position(match.start())))
+    return imports
+
+def discover_stylesheets(entry_path):
+    """Stylesheets reachable from the entry, in import order, plus problems found on the way"""
+    entry_path = Path(entry_path).resolve()
+    order = []
+    problems = []
+    pending = [entry_path]
+    while pending:
+        path = pending.pop(0)
+        if path in order:
+            continue
+        order.append(path)
+        for url, target, line, column in find_imports(path):
+            if not target.is_file():
+                problems.append(Problem(path, line, column, 'error', f"imported file {url} not found"))
+            elif target not in order and target not in pending:
+                pending.append(target)
+    return order, problems
+
+def check_declaration(path, tokens, position, problems):
+    """Check one declaration, given its tokens (kind, text, offset) without the ';'"""
+    significant = [token for token in tokens if token[0] not in ('ws', 'comment')]
+    if not significant:
+        return
+    offset = significant[0][2]
+    text = ''.join(token[1] for token in tokens).strip()
+    colon = next((index for index, token in enumerate(significant) if token[1] == ':'), None)
+    if colon is None:
+        problems.append(Problem(path, *position(offset), 'error', f"expected ':' in declaration '{text}'"))
+    elif colon == 0:
+        problems.append(Problem(path, *position(offset), 'error', f"missing property name in '{text}'"))
+    elif colon == len(significant) - 1:
+        problems.append(Problem(path, *position(offset), 'error', f"missing value for '{significant[0][1]}'"))
+
+def validate_stylesheet(path):
+    """Validate one file; returns (problems, defined custom properties, var() references)"""
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    position = Position(text)
+    problems = []
+    definitions = set()
+    references = []
+
+    # Open blocks as (kind, offset), kind being 'rules' or 'declarations'
+    blocks = []
+    parentheses = []
+    brackets = []
+    pending = []          # tokens of the current prelude or declaration
+    seen_rule = False
+
+    def in_declarations():
+        return bool(blocks) and blocks[-1][0] == 'declarations'
+
+    def end_declaration():
+        check_declaration(path, pending, position, problems)
+        match = re.match(r'\s*(--[\w-]+)\s*:', ''.join(item[1] for item in pending))
+        if match:
+            definitions.add(match.group(1))
+
+    for kind, token, offset in iter_tokens(text):
+        if kind == 'comment':
+            if not token.endswith('*/') or len(token) < 4:
+                problems.append(Problem(path, *position(offset), 'error', "unclosed comment"))
+            continue
+        if kind == 'error':
+            message = "unclosed string" if token in '"\'' else f"unexpected character {token!r}"
+            problems.append(Problem(path, *position(offset), 'error', message))
+            continue
+        if kind == 'word':
+            for index, char in enumerate(token):
+                if char == '[':
+                    brackets.append(offset + index)
+                elif char == ']':
+                    if brackets:
+                        brackets.pop()
+                    else:
+                        problems.append(Problem(path, *position(offset + index), 'error', "unexpected ']'"))
+        if kind == 'punct' and token == '(':
+            parentheses.append(offset)
+        elif kind == 'punct' and token == ')':
+            if parentheses:
+                parentheses.pop()
+            else:
+                problems.append(Problem(path, *position(offset), 'error', "unexpected ')'"))
+
+        if parentheses or brackets or kind != 'punct' or token not in '{};':
+            pending.append((kind, token, offset))
+            continue
+
+        prelude = ' '.join(''.join(item[1] for item in pending).split())
+        start = next((item[2] for item in pending if item[0] != 'ws'), offset)
+
+        if token == '{':
+            if in_declarations():
+                problems.append(Problem(path, *position(offset), 'error', "unexpected '{' inside a declaration block"))
+            elif not prelude:
+                problems.append(Problem(path, *position(offset), 'error', "missing selector before '{'"))
+            lower = prelude.lower()
+            blocks.append(('rules' if lower.startswith(RULE_BLOCK_AT_RULES) else 'declarations', offset))
+            seen_rule = True
+        elif token == ';':
+            if in_declarations():
+                if prelude:
+                    end_declaration()
+                else:
+                    problems.append(Problem(path, *position(offset), 'warning', "empty declaration (double semicolon)"))
+            elif prelude.lower().startswith('@import'):
+                if seen_rule or blocks:
+                    problems.append(Problem(path, *position(start), 'warning',
+                                            "@import after other rules is ignored by browsers"))
+            elif prelude.startswith('@') and not prelude.lower().startswith(('@charset', '@layer')):
+                seen_rule = True
+            elif prelude:
+                problems.append(Problem(path, *position(start), 'error', f"unexpected ';' after '{prelude}'"))
+        else:  # '}'
+            if in_declarations() and prelude:
+                end_declaration()
+            elif prelude:
+                problems.append(Problem(path, *position(start), 'error', f"unterminated rule '{prelude}'"))
+            if blocks:
+                blocks.pop()
+            else:
+                problems.append(Problem(path, *position(offset), 'error', "unexpected '}'"))
+        pending = []
+
+    for _, offset in blocks:
+        problems.append(Problem(path, *position(offset), 'error', "unclosed '{'"))
+    for offset in parentheses:
+        problems.append(Problem(path, *position(offset), 'error', "unclosed '('"))
+    for offset in brackets:
+        problems.append(Problem(path, *position(offset), 'error', "unclosed '['"))
+
+    # var() references, outside comments and strings
+    code = ''.join(' ' * len(token) if kind in ('comment', 'string') else token
+                   for kind, token, _ in iter_tokens(text))
+    for match in VAR_RE.finditer(code):
+        has_fallback = ',' in match.group()
+        references.append((match.group(1), *position(match.start()), has_fallback))
+
+    problems.sort(key=lambda problem: (problem.line, problem.column))
+    return problems, definitions, references
+
+def validate(site_dir=SITE_DIR, jobs=None):
+    """Validate the stylesheet graph; returns (files, problems)"""
+    site_dir = Path(site_dir)
+    files, problems = discover_stylesheets(site_dir / ENTRY_STYLESHEET)
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as executor:
+            results = list(executor.map(validate_stylesheet, files))
+    else:
+        results = [validate_stylesheet(path) for path in files]
+
+    definitions = set()
+    for file_problems, file_definitions, _ in results:
+        problems.extend(file_problems)
+        definitions |= file_definitions
+
+    # Custom properties can be defined in any module, so check references across all of them
+    for path, (_, _, references) in zip(files, results):
+        for name, line, column, has_fallback in references:
+            if name not in definitions and not has_fallback:
+                problems.append(Problem(path, line, column, 'error', f"var({name}) is never defined"))
+
+    # Source stylesheets that nothing imports are never loaded
+    reachable = set(files)
+    for path in sorted((site_dir / "css").rglob("*.css")):
+        relative = path.relative_to(site_dir).as_posix()
+        if path.resolve() not in reachable and not relative.startswith(GENERATED_STYLESHEETS):
+            problems.append(Problem(path, 1, 1, 'warning', f"not imported from {ENTRY_STYLESHEET}"))
+
+    order = {path: index for index, path in enumerate(files)}
+    problems.sort(key=lambda problem: (order.get(Path(problem.path).resolve(), len(order)),
+                                       str(problem.path), problem.line, problem.column))
+    return files, problems
+
+def validate_css(site_dir=SITE_DIR, jobs=None, json_path=None):
+    """Validate and print a report; returns True when there are no errors"""
+    site_dir = Path(site_dir)
+    # With the JSON report on standard output, keep it the only output
+    print = builtins.print if json_path != '-' else (lambda *args, **kwargs: None)
+    print("🎨 Validating Modular CSS Architecture...")
+    print("==========================================")
+
+    files, problems = validate(site_dir, jobs)
+    errors = [problem for problem in problems if problem.severity == 'error']
+    warnings = [problem for problem in problems if problem.severity == 'warning']
+
+    print(f"📁 {len(files)} stylesheet(s) reached from {ENTRY_STYLESHEET}")
+    for path in files:
+        file_problems = [problem for problem in problems if Path(problem.path).resolve() == path]
+        print(f"{'❌' if any(p.severity == 'error' for p in file_problems) else '✅'} {path.relative_to(site_dir.resolve())}")
+        for problem in file_problems:
+            icon = '❌' if problem.severity == 'error' else '⚠️ '
+            print(f"   {icon} {problem.line}:{problem.column} {problem.message}")
+    for problem in problems:
+        if Path(problem.path).resolve() not in files:
+            print(f"⚠️  {Path(problem.path).relative_to(site_dir)} - {problem.message}")
+
+    if json_path:
+        report = {
+            'files': [str(path.relative_to(site_dir.resolve())) for path in files],
+            'errors': len(errors),
+            'warnings': len(warnings),
+            'problems': [problem.to_dict(site_dir) for problem in problems],
+        }
+        output = json.dumps(report, indent=2)
+        if json_path == '-':
+            builtins.print(output)
+        else:
+            Path(json_path).write_text(output + '\n', encoding='utf-8')
+            print(f"\n📝 Report written to {json_path}")
+
+    print("\n📊 Summary:")
+    print("===========")
+    if not errors:
+        print(f"🎉 All CSS files passed validation!{f' ({len(warnings)} warning(s))' if warnings else ''}")
+        return True
+    print(f"⚠️  Found {len(errors)} error(s) and {len(warnings)} warning(s)")
+    print("🔧 Please review and fix the issues above")
+    return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate the stylesheets imported from site/css/main.css")
+    parser.add_argument("--site-dir", type=Path, default=SITE_DIR,
+                        help="site directory to validate (default: site/)")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="number of files to validate in parallel (default: CPU count)")
+    parser.add_argument("--json", metavar="PATH",
+                        help="also write the report as JSON ('-' for standard output)")
+    args = parser.parse_args()
+
+    if not validate_css(args.site_dir, jobs=args.jobs, json_path=args.json):
+        exit(1)